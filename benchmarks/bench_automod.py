@@ -0,0 +1,64 @@
+"""
+Measures the throughput of the automod counters and how often members are muted by mistake.
+Run from the root of the repository: python benchmarks/bench_automod.py
+"""
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from system.moderation import automod  # noqa: E402
+
+# Count of simulated messages
+message_count = 200000
+
+# Count of members who send messages normally and of spamming members
+member_count = 50000
+spammer_count = 50
+
+# Simulated messages per second over all guilds
+messages_per_second = 2000
+
+# Count of guilds the members are spread over
+guild_count = 500
+
+
+def main() -> None:
+    rng = random.Random(0)
+    members = [(rng.randrange(guild_count), user_id) for user_id in range(member_count)]
+    spammers = members[:spammer_count]
+    words = ['hello', 'gg', 'lol', 'anyone here?', 'nice', 'what', 'ok', 'thanks', 'wow', 'brb']
+
+    # Build the traffic first, so only the counters are timed
+    traffic = []
+    for i in range(message_count):
+        now = i / messages_per_second
+        if i % 20 == 0:
+            # Spammers repeat the same message with mentions
+            guild_id, user_id = rng.choice(spammers)
+            traffic.append((guild_id, user_id, 'FREE NITRO', 3, now))
+        else:
+            guild_id, user_id = rng.choice(members)
+            traffic.append((guild_id, user_id, f'{rng.choice(words)} {rng.randrange(1000)}', 0, now))
+
+    flagged = set()
+    start = perf_counter()
+    for guild_id, user_id, content, mentions, now in traffic:
+        if automod.violation(guild_id, user_id, content, mentions, now):
+            flagged.add((guild_id, user_id))
+    seconds = perf_counter() - start
+
+    size = automod._messages.size + automod._duplicates.size + automod._mentions.size
+    false_positives = len(flagged - set(spammers))
+
+    print(f'{message_count / seconds:12.0f} messages per second')
+    print(f'{seconds / message_count * 1e6:12.2f} µs per message')
+    print(f'{size / 1024:12.0f} KiB of counters for {member_count} members')
+    print(f'{len(flagged & set(spammers)):12} of {spammer_count} spammers detected')
+    print(f'{false_positives:12} members flagged by mistake')
+
+
+if __name__ == '__main__':
+    main()
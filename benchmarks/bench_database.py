@@ -0,0 +1,360 @@
+"""
+Times every public function of database.select, insert, update and delete (and the entity constructors like
+PrivateRoom and Warn) on a scratch database with realistic volumes. The results are written to a JSON file, which can be
+compared with the results of another commit to find regressions.
+Run from the root of the repository: python benchmarks/bench_database.py [--scale 0.1] [--compare old.json]
+"""
+import argparse
+import inspect
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import select, insert, update, delete, manager  # noqa: E402
+
+# Rows at scale 1
+guild_count = 10000
+warn_count = 1000000
+private_room_count = 100000
+
+# Members of every guild that are warned, muted, banned and own the private rooms
+users_per_guild = 20
+
+# Snowflakes of the fake objects are built out of these bases and the numbers of the objects
+guild_base, user_base, role_base, channel_base, room_base = (i * 10 ** 17 for i in range(1, 6))
+
+# Warns are spread over the last year
+warn_period = timedelta(days=365)
+
+# Modules in the order they are timed (deletions last, since they remove the rows the other functions use)
+modules = (select, update, insert, delete)
+
+# Column that the functions of the update and delete factories select the entry by (as a key of sample)
+table_keys = {'guilds': 'guild_id', 'guild_settings': 'guild_id', 'default_pr_settings': 'guild_id',
+              'autorole_backfills': 'guild_id', 'roles': 'role_id', 'bans': 'ban_id', 'mutes': 'mute_id',
+              'reports': 'report_id', 'private_rooms': 'room_id', 'pr_settings': 'room_id', 'tickets': 'ticket_id',
+              'waiting_for_responses': 'response_id', 'pr_pool_channels': 'channel_id'}
+
+# Arguments of the entity constructors
+entities = {
+    'Ban': lambda s: {'ban_id': s['ban_id']},
+    'Mute': lambda s: {'mute_id': s['mute_id']},
+    'Warn': lambda s: {'warn_id': s['warn_id']},
+    'Report': lambda s: {'report_id': s['report_id']},
+    'PrivateRoom': lambda s: {'guild_id': s['guild_id'], 'room_channel_id': s['room_channel_id']},
+    'Ticket': lambda s: {'guild_id': s['guild_id'], 'ticket_id': s['ticket_id']},
+    'WaitingResponse': lambda s: {'id': s['response_id']},
+}
+
+# Arguments that differ from the sample for single functions
+overrides = {
+    'insert.guild': {'guild_id': lambda s: s['new_guild_id']},
+    'select.pending_expiries': {'table': lambda s: 'mutes'},
+    'select.warns_date': {'date': lambda s: s['date'] - timedelta(weeks=1)},
+    'delete.old_warns': {'date': lambda s: s['date'] - warn_period - timedelta(days=1)},
+    'delete.old_cache_invalidations': {'date': lambda s: s['date'] - timedelta(days=1)},
+}
+
+# Seconds every function is timed for (at least min_calls and at most max_calls times)
+time_budget = 0.25
+min_calls = 3
+max_calls = 500
+
+# Regressions below this many microseconds are noise
+min_regression = 20
+
+
+class Sizes:
+    """
+    Counts of the rows in the scratch database
+    Args:
+        scale  (float): Factor for the rows at scale 1
+    """
+
+    def __init__(self, scale: float):
+        self.guilds = max(int(guild_count * scale), 1)
+        self.warns = max(int(warn_count * scale), 1)
+        self.private_rooms = max(int(private_room_count * scale), 1)
+        self.bans = self.mutes = 2 * self.guilds
+        self.reports = 10 * self.guilds
+        self.responses = max(self.guilds // 10, 1)
+        self.cache_invalidations = 1000
+
+
+def user_id(guild: int, user: int) -> int:
+    return user_base + guild * users_per_guild + user
+
+
+def date(n: int, count: int, now: datetime) -> str:
+    """Date of the n-th of count entries spread over the warn period"""
+    return (now - warn_period * (1 - n / count)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def populate(sizes: Sizes, now: datetime) -> None:
+    """
+    Fill the scratch database in bulk (the insert functions would take too long for a million rows)
+    :param sizes: Counts of the rows
+    :param now: Time of the benchmark
+    """
+    conn = sqlite3.connect(manager.database_path)
+    g = sizes.guilds
+
+    with conn:
+        conn.executemany('INSERT INTO guilds VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+            (guild_base + i, *(channel_base + i * 8 + c for c in range(7)), role_base + g * 4 + i) for i in range(g)))
+        conn.executemany('INSERT INTO guild_settings VALUES (?, NULL, NULL, 1, 0, 1, NULL, 0, 1, 1, 1, 0, 0, 3, 4, 1, 0, ?)',
+                         ((f's{i}', guild_base + i) for i in range(g)))
+        conn.executemany('INSERT INTO default_pr_settings VALUES (?, NULL, 0, 0, 0, 0, ?)',
+                         ((f'd{i}', guild_base + i) for i in range(g)))
+        conn.executemany('INSERT INTO roles VALUES (?, ?, ?)', (
+            (role_base + i * 4 + t, type_, guild_base + i)
+            for i in range(g) for t, type_ in enumerate(('ADMIN', 'MODERATOR', 'SUPPORTER', 'AUTOROLE'))))
+
+        # Every member of a guild is warned equally often
+        conn.executemany('INSERT INTO warns VALUES (?, ?, ?, ?, ?, ?)', (
+            (f'w{n}', user_id(n % g, n // g % users_per_guild), user_id(n % g, 0), 'Spam', date(n, sizes.warns, now),
+             guild_base + n % g) for n in range(sizes.warns)))
+        conn.executemany('INSERT INTO reports VALUES (?, ?, ?, ?, ?, ?)', (
+            (f'p{n}', user_id(n % g, 1), user_id(n % g, n // g % users_per_guild), 'Rude',
+             date(n, sizes.reports, now), guild_base + n % g) for n in range(sizes.reports)))
+
+        # Half of the temporary mutes and bans expired
+        for table, prefix, count in (('mutes', 'm', sizes.mutes), ('bans', 'b', sizes.bans)):
+            conn.executemany(f'INSERT INTO {table} VALUES (?, 1, ?, ?, ?, ?, ?, ?)', (
+                (f'{prefix}{n}', user_id(n % g, n // g % users_per_guild), user_id(n % g, 0), 'Spam',
+                 date(n, count, now), (now + timedelta(hours=n % 2 * 2 - 1)).strftime('%Y-%m-%d %H:%M:%S'),
+                 guild_base + n % g) for n in range(count)))
+            # The history keeps every mute and ban
+            conn.execute(f'INSERT INTO {table[:-1]}_history SELECT * FROM {table}')
+
+        conn.executemany('INSERT INTO private_rooms VALUES (?, ?, NULL, NULL, ?, ?)', (
+            (f'r{n}', room_base + n, user_id(n % g, n // g % users_per_guild), guild_base + n % g)
+            for n in range(sizes.private_rooms)))
+        conn.executemany('INSERT INTO pr_settings VALUES (?, NULL, 0, 0, 0, 0, ?)',
+                         ((f'ps{n}', f'r{n}') for n in range(sizes.private_rooms)))
+
+        conn.executemany('INSERT INTO tickets VALUES (?, ?, ?, NULL, NULL, ?)',
+                         ((f't{i}', user_id(i, 0), channel_base + i * 8 + 7, guild_base + i) for i in range(g)))
+        conn.executemany('INSERT INTO ticket_users VALUES (?, ?, ?)',
+                         ((user_id(i, u), u, f't{i}') for i in range(g) for u in range(2)))
+        conn.executemany('INSERT INTO waiting_for_responses VALUES (?, ?, ?, NULL, ?)', (
+            (f'q{n}', user_id(n, 0), channel_base + n * 8 + 2, guild_base + n) for n in range(sizes.responses)))
+        conn.executemany('INSERT INTO autorole_backfills VALUES (?, ?)',
+                         ((guild_base + i, user_id(i, 0)) for i in range(0, g, 100)))
+        conn.executemany('INSERT INTO cache_invalidations (cache, guild_id, date) VALUES (?, ?, ?)', (
+            ('roles', guild_base + n % g, now.strftime('%Y-%m-%d %H:%M:%S'))
+            for n in range(sizes.cache_invalidations)))
+
+    conn.close()
+
+
+def sample(rng: random.Random, sizes: Sizes, now: datetime) -> dict:
+    """
+    Pick existing rows of the same guild to call a function with
+    :param rng: Random generator
+    :param sizes: Counts of the rows
+    :param now: Time of the benchmark
+    :return: Values of the parameters by name
+    """
+    room = rng.randrange(sizes.private_rooms)
+    guild = room % sizes.guilds
+    user = rng.randrange(users_per_guild)
+    response = rng.randrange(sizes.responses)
+
+    return {
+        'guild_id': guild_base + guild,
+        'new_guild_id': guild_base + guild_count * 1000 + rng.randrange(10 ** 15),
+        'user_id': user_id(guild, user),
+        'user_ids': [user_id(guild, u) for u in range(10)],
+        'mod_id': user_id(guild, 0),
+        'reporter_id': user_id(guild, 1),
+        'main_user_id': user_id(guild, user),
+        'owner_id': user_id(guild, user),
+        'role_id': role_base + guild * 4 + 1,
+        'room_id': f'r{room}',
+        'room_channel_id': room_base + room,
+        'text_channel_id': channel_base + guild * 8 + 7,
+        'channel_id': channel_base + response * 8 + 2,
+        'ticket_id': f't{guild}',
+        'response_id': f'q{response}',
+        'warn_id': f'w{rng.randrange(sizes.warns)}',
+        'ban_id': f'b{rng.randrange(sizes.bans)}',
+        'mute_id': f'm{rng.randrange(sizes.mutes)}',
+        'report_id': f'p{rng.randrange(sizes.reports)}',
+        'after_id': sizes.cache_invalidations - 100,
+        'date': now,
+        'temp': True,
+        'cache': 'roles',
+        'process_id': 1,
+        'type_': 'MODERATOR',
+        'table': 'warns',
+        'identifier': 'warn_id',
+        'value': 1,
+    }
+
+
+def functions() -> list[tuple[str, object]]:
+    """
+    Collect the public functions of the database modules and the entity constructors
+    :return: Qualified names and functions in the order they are timed
+    """
+    collected = []
+    for module in modules:
+        module_name = module.__name__.rsplit('.', 1)[-1]
+        for name, function in vars(module).items():
+            if name.startswith('_'):
+                continue
+            if hasattr(function, 'query_name') or (module is select and name in entities):
+                collected.append((f'{module_name}.{name}', function))
+    return collected
+
+
+def arguments(name: str, function, values: dict) -> dict:
+    """
+    Build the arguments of a function out of a sample
+    :param name: Qualified name of the function
+    :param function: Function to call
+    :param values: Sample of existing rows
+    :return: Keyword arguments of the function
+    :raises KeyError: If there is no value for a required parameter
+    """
+    if inspect.isclass(function):
+        return entities[function.__name__](values)
+
+    # Skip the cursor of the connection decorator
+    parameters = list(inspect.signature(function).parameters.values())[1:]
+    special = overrides.get(name, {})
+
+    kwargs = {}
+    for parameter in parameters:
+        if parameter.name in special:
+            kwargs[parameter.name] = special[parameter.name](values)
+        elif parameter.name == 'argument':
+            # Functions of the update and delete factories
+            kwargs['argument'] = values[table_keys[function.query_name.split('.')[1]]]
+        elif parameter.name in values and (parameter.default is inspect.Parameter.empty or parameter.name == 'value'):
+            kwargs[parameter.name] = values[parameter.name]
+        elif parameter.default is inspect.Parameter.empty and parameter.kind != parameter.VAR_KEYWORD:
+            raise KeyError(parameter.name)
+    return kwargs
+
+
+def time_function(name: str, function, rng: random.Random, sizes: Sizes, now: datetime) -> dict:
+    """
+    Call a function with random existing rows until the time budget is used up
+    :return: Count of calls, median and 95th percentile in microseconds and count of failed calls
+    """
+    durations = []
+    errors = 0
+    spent = 0.0
+    while len(durations) < max_calls and (spent < time_budget or len(durations) < min_calls):
+        kwargs = arguments(name, function, sample(rng, sizes, now))
+        start = perf_counter()
+        try:
+            function(**kwargs)
+        except Exception:
+            errors += 1
+        duration = perf_counter() - start
+        durations.append(duration)
+        spent += duration
+
+    durations.sort()
+    return {'calls': len(durations), 'median_us': round(durations[len(durations) // 2] * 1e6, 1),
+            'p95_us': round(durations[int(0.95 * (len(durations) - 1))] * 1e6, 1), 'errors': errors}
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> list[str]:
+    """
+    Compare the medians with the results of another run
+    :param results: Results of this run
+    :param baseline_path: Path of the JSON file of the other run
+    :param threshold: Share a median may grow by before it counts as a regression
+    :return: Names of the regressed functions
+    """
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+
+    if baseline['scale'] != results['scale']:
+        print(f'\033[33mThe baseline was run at scale {baseline["scale"]}, not {results["scale"]}\033[0m')
+
+    regressions = []
+    print(f'\nCompared with {baseline_path} ({baseline.get("commit") or "unknown commit"}):')
+    for name, result in results['functions'].items():
+        old = baseline['functions'].get(name)
+        if not old or not old['median_us']:
+            continue
+
+        ratio = result['median_us'] / old['median_us']
+        if ratio > 1 + threshold and result['median_us'] - old['median_us'] >= min_regression:
+            regressions.append(name)
+            print(f'\033[31m  {name:52}{old["median_us"]:12.1f} -> {result["median_us"]:.1f} µs ({ratio:.2f}×)\033[0m')
+        elif ratio < 1 / (1 + threshold) and old['median_us'] - result['median_us'] >= min_regression:
+            print(f'\033[32m  {name:52}{old["median_us"]:12.1f} -> {result["median_us"]:.1f} µs ({ratio:.2f}×)\033[0m')
+
+    print(f'  {len(regressions)} regressions above {threshold:.0%}')
+    return regressions
+
+
+def commit() -> str:
+    """Get the commit the benchmark runs on"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the database functions of fryselBot.')
+    parser.add_argument('--scale', type=float, default=1, help='factor for 10k guilds, 1M warns and 100k rooms')
+    parser.add_argument('--output', default='bench_database.json', help='JSON file the results are written to')
+    parser.add_argument('--compare', help='JSON file of another run to find regressions')
+    parser.add_argument('--threshold', type=float, default=0.25, help='growth of a median that is a regression')
+    args = parser.parse_args()
+
+    sizes = Sizes(args.scale)
+    now = datetime.utcnow()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager.database_path = os.path.join(directory, 'bot.db')
+        manager._create_tables()
+
+        start = perf_counter()
+        populate(sizes, now)
+        print(f'Populated {sizes.guilds} guilds, {sizes.warns} warns and {sizes.private_rooms} private rooms in '
+              f'{perf_counter() - start:.1f} s')
+
+        results = {'commit': commit(), 'date': now.strftime('%Y-%m-%d %H:%M:%S'), 'scale': args.scale,
+                   'sqlite': sqlite3.sqlite_version, 'functions': {}}
+
+        print(f'{"function":52}{"calls":>7}{"median µs":>12}{"p95 µs":>12}{"errors":>8}')
+        for name, function in functions():
+            try:
+                result = time_function(name, function, rng, sizes, now)
+            except KeyError as error:
+                print(f'{name:52} skipped, no value for {error}')
+                continue
+
+            results['functions'][name] = result
+            print(f'{name:52}{result["calls"]:7}{result["median_us"]:12.1f}{result["p95_us"]:12.1f}'
+                  f'{result["errors"]:8}')
+
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f'Results written to {args.output}')
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
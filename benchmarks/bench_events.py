@@ -0,0 +1,266 @@
+"""
+Drives the event handlers of the bot (on_message, on_voice_state_update, on_member_join and the moderation commands)
+with fake guilds at a configurable rate against a scratch database. Reports the throughput, the latency and the
+database queries and API requests per event.
+Run from the root of the repository: python benchmarks/bench_events.py [--events 1000] [--rate 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import traceback
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discord import Permissions  # noqa: E402
+
+import bot  # noqa: E402
+from benchmarks.fakes import FakeHTTP, FakeState, FakeGuild, FakeMessage, next_id, voice_channel  # noqa: E402
+from database import insert, manager  # noqa: E402
+from system import appearance  # noqa: E402
+from system.moderation import moderation  # noqa: E402
+from utilities import metrics, secret  # noqa: E402
+
+# Scenarios in the order they run
+scenarios = ('message', 'voice', 'join', 'command')
+
+# Moderation commands of the command scenario by their weight
+moderation_commands = {'warn': 6, 'mute': 2, 'kick': 1}
+
+# Words of the chat messages
+words = ['hello', 'gg', 'lol', 'anyone here?', 'nice', 'what', 'ok', 'thanks', 'wow', 'brb']
+
+# Seconds to wait after a scenario, so the direct messages and buffered log messages are sent
+settle_time = moderation.log_flush_delay + 1
+
+
+def create_guild(state: FakeState, index: int, member_count: int) -> FakeGuild:
+    """
+    Create a fake guild with members and the channels and roles of the bot and register it in the database
+    :param state: State shared by all fake objects
+    :param index: Number of the guild
+    :param member_count: Count of members (without the bot, the owner and the moderator)
+    :return: The guild
+    """
+    guild = FakeGuild(state, next_id(), f'Guild {index}')
+
+    # Roles of the bot, the moderators and muted members
+    bot_role = guild.add_role('fryselBot', 100, Permissions.all())
+    mod_role = guild.add_role('Moderator', 50, Permissions.general())
+    mute_role = guild.add_role('Muted', 10)
+
+    guild.add_member(appearance.bot_name, [bot_role], member_id=secret.bot_id, bot=True)
+    guild.owner_id = guild.add_member('Owner').id
+    guild.add_member('Moderator', [mod_role])
+    for i in range(member_count):
+        guild.add_member(f'Member {i}')
+
+    guild.general = guild.add_text_channel('general')
+    welcome_channel = guild.add_text_channel('welcome')
+    mod_log = guild.add_text_channel('mod-log')
+    settings_channel = guild.add_text_channel('private-room-settings')
+    guild.cpr_channel = guild.add_voice_channel('Create Private Room')
+
+    insert.guild(guild_id=guild.id, welcome_channel_id=welcome_channel.id, cpr_channel_id=guild.cpr_channel.id,
+                 pr_settings_id=settings_channel.id, mod_log_id=mod_log.id, mute_role_id=mute_role.id)
+    insert.guild_settings(guild_id=guild.id, welcome_messages=True, welcome_dms=True,
+                          welcome_dm='Welcome <member>, have fun!', automod=True)
+    insert.default_pr_settings(guild_id=guild.id)
+    insert.role(role_id=mod_role.id, type_='MODERATOR', guild_id=guild.id)
+
+    return guild
+
+
+def dispatch(client, event: str, *args) -> list[asyncio.Task]:
+    """
+    Dispatch an event like the gateway would
+    :param client: Bot client
+    :param event: Name of the event
+    :param args: Arguments of the event
+    :return: Tasks of the handlers of the event
+    """
+    tasks = []
+    schedule_event = client._schedule_event
+
+    def recording_schedule_event(*schedule_args, **kwargs) -> asyncio.Task:
+        tasks.append(schedule_event(*schedule_args, **kwargs))
+        return tasks[-1]
+
+    # Dispatching doesn't yield, so the handlers of other events aren't recorded
+    client._schedule_event = recording_schedule_event
+    try:
+        client.dispatch(event, *args)
+    finally:
+        del client._schedule_event
+    return tasks
+
+
+def event_factory(scenario: str, guilds: list[FakeGuild], rng: random.Random):
+    """
+    Create the function that builds the next event of a scenario
+    :param scenario: Name of the scenario
+    :param guilds: Fake guilds
+    :param rng: Random generator
+    :return: Function that returns the name and the arguments of the next event
+    """
+    def members(guild: FakeGuild) -> list:
+        return [member for member in guild.members if not member.bot and member.id != guild.owner_id]
+
+    if scenario == 'message':
+        def message():
+            guild = rng.choice(guilds)
+            content = f'{rng.choice(words)} {rng.randrange(1000)}'
+            return 'message', (FakeMessage(next_id(), content, rng.choice(members(guild)), guild.general),)
+        return message
+
+    if scenario == 'voice':
+        def voice():
+            while True:
+                guild = rng.choice(guilds)
+                member = rng.choice(members(guild))
+                if member.voice is None:
+                    # Join the create private room channel
+                    return 'voice_state_update', (member, *voice_channel(member, guild.cpr_channel))
+                if member.voice.channel is not guild.cpr_channel:
+                    # Leave the private room
+                    return 'voice_state_update', (member, *voice_channel(member, None))
+        return voice
+
+    if scenario == 'join':
+        def join():
+            guild = rng.choice(guilds)
+            return 'member_join', (guild.add_member(f'Newbie {rng.randrange(10000)}'),)
+        return join
+
+    def command():
+        guild = rng.choice(guilds)
+        moderator = guild.get_member_named('Moderator')
+        name = rng.choices(list(moderation_commands), weights=list(moderation_commands.values()))[0]
+        target = rng.choice([member for member in members(guild) if member is not moderator])
+        content = f'{appearance.default_prefix}{name} {target.mention} {rng.choice(words)}'
+        return 'message', (FakeMessage(next_id(), content, moderator, guild.general),)
+    return command
+
+
+async def drive(client, events: int, rate: float, next_event) -> tuple[list[float], float]:
+    """
+    Dispatch the events of a scenario
+    :param client: Bot client
+    :param events: Count of events
+    :param rate: Events per second (0 dispatches the next event when the last one is handled)
+    :param next_event: Function that returns the name and the arguments of the next event
+    :return: Latencies of the events and the seconds until all events were handled
+    """
+    latencies = []
+
+    async def handle(event: str, args: tuple) -> None:
+        start = perf_counter()
+        await asyncio.gather(*dispatch(client, event, *args))
+        latencies.append(perf_counter() - start)
+
+    handlers = []
+    start = perf_counter()
+    for i in range(events):
+        if not rate:
+            await handle(*next_event())
+            continue
+
+        # Dispatch at the planned time, even if earlier events are still handled
+        delay = start + i / rate - perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        handlers.append(asyncio.create_task(handle(*next_event())))
+
+    await asyncio.gather(*handlers)
+    return latencies, perf_counter() - start
+
+
+def percentile(values: list[float], share: float) -> float:
+    """
+    Get a percentile of the values
+    :param values: Sorted values
+    :param share: Share of the values below the percentile (e.g. 0.99)
+    :return: The percentile
+    """
+    return values[int(share * (len(values) - 1))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    client = bot.client
+    rng = random.Random(0)
+
+    http = FakeHTTP(args.api_latency / 1000)
+    state = FakeState(http)
+    guilds = [create_guild(state, i, args.members) for i in range(args.guilds)]
+
+    # The bot user is needed to tell commands of other users apart
+    state.user = client._connection.user = guilds[0].get_member(secret.bot_id)
+    state.self_id = secret.bot_id
+
+    # Count exceptions of handlers and failed commands
+    errors = []
+
+    async def on_error(event: str, *_, **__) -> None:
+        if not errors:
+            traceback.print_exc()
+        errors.append(event)
+
+    async def on_command_error(ctx, error: Exception) -> None:
+        errors.append(f'{ctx.command}: {error}')
+
+    client.on_error = on_error
+    client.add_listener(on_command_error)
+
+    print(f'{len(guilds)} guilds with {args.members} members, {args.events} events per scenario at '
+          f'{args.rate or "max"} events/s, {args.api_latency:g} ms per API request')
+    print(f'{"scenario":10}{"events/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"queries/ev":>12}{"API/ev":>9}'
+          f'{"errors":>8}')
+
+    for scenario in args.scenarios:
+        queries = metrics.query_latency.count()
+        requests = http.total()
+        errors.clear()
+
+        latencies, seconds = await drive(client, args.events, args.rate, event_factory(scenario, guilds, rng))
+        # Direct messages and log messages are sent in the background
+        await asyncio.sleep(settle_time)
+
+        latencies.sort()
+        queries = (metrics.query_latency.count() - queries) / args.events
+        requests = (http.total() - requests) / args.events
+        print(f'{scenario:10}{args.events / seconds:10.0f}{percentile(latencies, 0.5) * 1000:10.2f}'
+              f'{percentile(latencies, 0.99) * 1000:10.2f}{queries:12.1f}{requests:9.2f}{len(errors):8}')
+
+    print(f'API requests: {", ".join(f"{route} {count}" for route, count in http.calls.most_common())}')
+
+    # Stop the workers and delayed deletions that are still waiting
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the event handlers of fryselBot with fake guilds.')
+    parser.add_argument('--events', type=int, default=1000, help='count of events per scenario')
+    parser.add_argument('--rate', type=float, default=200, help='events per second (0: one event after the other)')
+    parser.add_argument('--guilds', type=int, default=50, help='count of fake guilds')
+    parser.add_argument('--members', type=int, default=100, help='count of members per guild')
+    parser.add_argument('--api-latency', type=float, default=0, help='milliseconds every API request takes')
+    parser.add_argument('--scenarios', nargs='+', choices=scenarios, default=scenarios, help='scenarios to run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The handlers work on a scratch database
+        manager.database_path = os.path.join(directory, 'bot.db')
+        manager._create_tables()
+
+        # The client and its cogs use the loop that was current when bot.py was imported
+        bot.client.loop.run_until_complete(run(args))
+
+
+if __name__ == '__main__':
+    main()
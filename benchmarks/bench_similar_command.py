@@ -0,0 +1,76 @@
+"""
+Compares the indexed fuzzy command suggestion with the previous linear SequenceMatcher loop.
+Run from the root of the repository: python benchmarks/bench_similar_command.py
+"""
+import os
+import sys
+from difflib import SequenceMatcher
+from timeit import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from system import description  # noqa: E402
+
+# Mistyped commands like they are sent by members
+typos = ['hlep', 'clera', 'kik', 'bna', 'tempbann', 'unbna', 'mtue', 'tmepmute', 'unmtue', 'warnn', 'wanrs',
+         'reprot', 'reportss', 'invtie', 'setpu', 'prefx', 'colr', 'welcom', 'welcome chanel', 'roles ad',
+         'moderaton log', 'private room', 'private rooms pol', 'lod', 'unlaod', 'asdfghjkl', 'xyz', 'q']
+
+# Count of runs over all typos
+runs = 200
+
+
+def linear_similar_command(name: str) -> tuple[bool, description.Command]:
+    """
+    The previous implementation that compares the name with every command
+    :param name: Name of the command
+    :return: Whether it is only a suggestion and the command with similar name
+    """
+    highest_ration = (description.get_command('help'), 0.0)
+
+    for cmd in description.commands:
+        ratio = SequenceMatcher(None, cmd.name, name).ratio()
+        if ratio > highest_ration[1]:
+            highest_ration = (cmd, ratio)
+
+    return highest_ration[1] <= 0.6, highest_ration[0]
+
+
+def indexed_uncached() -> None:
+    """Runs the indexed suggestion over all typos without the LRU cache"""
+    for typo in typos:
+        description.get_similar_command.__wrapped__(typo)
+
+
+def indexed_cached() -> None:
+    """Runs the indexed suggestion over all typos with the LRU cache"""
+    for typo in typos:
+        description.get_similar_command(typo)
+
+
+def linear() -> None:
+    """Runs the linear suggestion over all typos"""
+    for typo in typos:
+        linear_similar_command(typo)
+
+
+def main() -> None:
+    # Compare the suggestions of both implementations
+    differences = 0
+    for typo in typos:
+        old, new = linear_similar_command(typo), description.get_similar_command(typo)
+        if old[0] != new[0] or old[1].name != new[1].name:
+            differences += 1
+            print(f'{typo!r}: linear {old[1].name!r} ({old[0]}), indexed {new[1].name!r} ({new[0]})')
+
+    print(f'{differences} of {len(typos)} suggestions differ\n')
+
+    # Time the implementations
+    calls = runs * len(typos)
+    for name, func in [('linear', linear), ('indexed', indexed_uncached), ('indexed + lru', indexed_cached)]:
+        seconds = timeit(func, number=runs)
+        print(f'{name:15} {seconds / calls * 1e6:8.2f} µs per suggestion')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Measures how many welcome cards can be rendered per second, with cold and warm caches and in the process pool.
+Needs Pillow. Run from the root of the repository: python benchmarks/bench_welcome_cards.py
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from system import welcome_cards  # noqa: E402
+
+# Count of rendered cards per run
+card_count = 200
+
+# Count of different members (avatars) and guilds (backgrounds)
+avatar_count = 50
+guild_count = 5
+
+
+def png(size: tuple[int, int], seed: int) -> bytes:
+    """
+    Create a noisy test image like a real avatar or banner
+    :param size: Size of the image
+    :param seed: Seed of the image
+    :return: Image as PNG
+    """
+    image = welcome_cards.Image.effect_noise(size, 40 + seed % 60).convert('RGB')
+    output = BytesIO()
+    image.save(output, 'PNG')
+    return output.getvalue()
+
+
+def jobs() -> list[tuple]:
+    """Create the arguments of the rendered cards"""
+    avatars = [(f'avatar{i}', png((256, 256), i)) for i in range(avatar_count)]
+    backgrounds = [(f'guild{i}', png((960, 540), i)) for i in range(guild_count)]
+
+    return [(*backgrounds[i % guild_count], 0xff9900, *avatars[i % avatar_count], f'Welcome Member{i}',
+             f'Member #{1000 + i} of Test Guild') for i in range(card_count)]
+
+
+def clear_caches() -> None:
+    """Forget the decoded images of this process"""
+    welcome_cards._backgrounds.clear()
+    welcome_cards._avatars.clear()
+
+
+def main() -> None:
+    if not welcome_cards.is_available():
+        print('Pillow is not installed')
+        return
+
+    cards = jobs()
+
+    # Every card decodes its images
+    start = perf_counter()
+    for card in cards:
+        clear_caches()
+        welcome_cards.render_card(*card)
+    cold = perf_counter() - start
+
+    # Decoded backgrounds and avatars are reused
+    clear_caches()
+    start = perf_counter()
+    for card in cards:
+        welcome_cards.render_card(*card)
+    warm = perf_counter() - start
+
+    # Cards are rendered by the process pool of the bot
+    with ProcessPoolExecutor(max_workers=welcome_cards.max_workers) as executor:
+        list(executor.map(welcome_cards.render_card, *zip(*cards[:welcome_cards.max_workers])))
+        start = perf_counter()
+        list(executor.map(welcome_cards.render_card, *zip(*cards)))
+        pool = perf_counter() - start
+
+    print(f'{"no caches":25} {card_count / cold:8.1f} cards per second')
+    print(f'{"caches":25} {card_count / warm:8.1f} cards per second')
+    print(f'{f"pool of {welcome_cards.max_workers} + caches":25} {card_count / pool:8.1f} cards per second')
+
+
+if __name__ == '__main__':
+    main()
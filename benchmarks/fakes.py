@@ -0,0 +1,332 @@
+"""
+Lightweight fakes of the Discord objects the event handlers work with. They subclass the discord.py models, so
+isinstance checks and the methods that don't call the API behave like on Discord, while every API request goes to a
+recording stub of the HTTP client instead.
+"""
+import asyncio
+import itertools
+from collections import Counter
+from typing import Optional
+
+import discord
+from discord import Permissions, VoiceState
+
+# Default of the overwrite of set_permissions (None resets the overwrite)
+_keep = object()
+
+# Snowflakes of all fake objects (the creation time within the snowflakes spreads the guilds over the shards)
+_ids = itertools.count(800000000000000000, 4194305)
+
+
+def next_id() -> int:
+    """
+    Create a new snowflake
+    :return: Unused snowflake
+    """
+    return next(_ids)
+
+
+class FakeHTTP:
+    """
+    Recording stub of discord.http.HTTPClient. Every request is counted by its route and answered after the simulated
+    latency with a minimal payload.
+    Args:
+        latency  (float): Seconds every request takes
+    Attributes:
+        latency  (float): Seconds every request takes
+        calls  (Counter): Count of requests by route (the name of the method of the HTTP client)
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+
+    def __getattr__(self, route: str):
+        async def request(*_, **__) -> dict:
+            self.calls[route] += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return {'id': str(next_id())}
+
+        return request
+
+    def total(self) -> int:
+        """
+        Count all requests
+        :return: Count of requests
+        """
+        return sum(self.calls.values())
+
+
+class FakeState:
+    """
+    Stands in for discord.state.ConnectionState, which models use to reach the HTTP client and the bot user.
+    Args:
+        http  (FakeHTTP): Recording HTTP client
+        user    (Member): Member of the bot (set once the bot member exists)
+    """
+
+    def __init__(self, http: FakeHTTP, user=None):
+        self.http = http
+        self.user = user
+        self.self_id = user.id if user else None
+        self.allowed_mentions = None
+        self.loop = asyncio.get_event_loop()
+
+    def create_message(self, *, channel, data: dict) -> 'FakeMessage':
+        """Build the message the API answered with"""
+        return FakeMessage(int(data['id']), '', self.user, channel)
+
+
+class FakeRole(discord.Role):
+    """Role with an ID, a position and permissions"""
+
+    def __init__(self, guild: 'FakeGuild', role_id: int, name: str, position: int = 0,
+                 permissions: Permissions = None):
+        self.guild = guild
+        self.id = role_id
+        self.name = name
+        self.position = position
+        self._permissions = (permissions or Permissions.none()).value
+        self._state = guild._state
+        self.managed = self.hoist = self.mentionable = False
+
+    async def edit(self, **fields) -> None:
+        await self._state.http.edit_role(self.guild.id, self.id, **fields)
+        self.position = fields.get('position', self.position)
+
+    async def delete(self, *, reason: str = None) -> None:
+        await self._state.http.delete_role(self.guild.id, self.id, reason=reason)
+        self.guild._roles.pop(self.id, None)
+
+
+class FakeMember(discord.Member):
+    """Member of a fake guild. Its roles, activities and voice state are plain attributes."""
+
+    # Properties of discord.Member that read the cached user, roles and presence are plain attributes
+    id = name = display_name = bot = roles = activities = voice = None
+
+    def __init__(self, guild: 'FakeGuild', member_id: int, name: str, roles: list = None, bot: bool = False):
+        self.guild = guild
+        self.id = member_id
+        self.name = self.display_name = self.nick = name
+        self.bot = bot
+        self.roles = [guild.default_role, *(roles or [])]
+        self.activities = ()
+        self.voice: Optional[VoiceState] = None
+        self._state = guild._state
+        self.joined_at = None
+
+    def __hash__(self) -> int:
+        return self.id >> 22
+
+    @property
+    def mention(self) -> str:
+        return f'<@{self.id}>'
+
+    @property
+    def avatar_url(self) -> str:
+        return f'https://cdn.discordapp.com/embed/avatars/{self.id % 5}.png'
+
+    @property
+    def activity(self):
+        return self.activities[0] if self.activities else None
+
+    @property
+    def top_role(self) -> FakeRole:
+        return max(self.roles, key=lambda role: role.position)
+
+    async def send(self, content: str = None, *, embed: discord.Embed = None, **_) -> 'FakeMessage':
+        data = await self._state.http.send_message(self.id, content, embed=embed.to_dict() if embed else None)
+        return self._state.create_message(channel=None, data=data)
+
+    async def add_roles(self, *roles, reason: str = None, atomic: bool = True) -> None:
+        for role in roles:
+            await self._state.http.add_role(self.guild.id, self.id, role.id, reason=reason)
+            if role not in self.roles:
+                self.roles.append(role)
+
+    async def remove_roles(self, *roles, reason: str = None, atomic: bool = True) -> None:
+        for role in roles:
+            await self._state.http.remove_role(self.guild.id, self.id, role.id, reason=reason)
+            if role in self.roles:
+                self.roles.remove(role)
+
+    async def move_to(self, channel: Optional['FakeVoiceChannel'], *, reason: str = None) -> None:
+        await self._state.http.edit_member(self.guild.id, self.id, channel_id=channel and channel.id, reason=reason)
+        voice_channel(self, channel)
+
+    async def edit(self, *, reason: str = None, **fields) -> None:
+        await self._state.http.edit_member(self.guild.id, self.id, reason=reason, **fields)
+        if 'voice_channel' in fields:
+            voice_channel(self, fields['voice_channel'])
+
+
+class _FakeChannel:
+    """API requests shared by the fake text and voice channels"""
+
+    async def set_permissions(self, target, *, overwrite=_keep, reason: str = None, **_) -> None:
+        if overwrite is None:
+            await self._state.http.delete_channel_permissions(self.id, target.id, reason=reason)
+        else:
+            await self._state.http.edit_channel_permissions(self.id, target.id, 0, 0, 'member', reason=reason)
+
+    async def edit(self, *, reason: str = None, **fields) -> None:
+        await self._state.http.edit_channel(self.id, reason=reason)
+        self.name = fields.get('name', self.name)
+
+    async def delete(self, *, reason: str = None) -> None:
+        await self._state.http.delete_channel(self.id, reason=reason)
+        self.guild._channels.pop(self.id, None)
+
+
+class FakeTextChannel(_FakeChannel, discord.TextChannel):
+    """Text channel of a fake guild. Messages are sent by discord.py through the recording HTTP client."""
+
+    def __init__(self, guild: 'FakeGuild', channel_id: int, name: str, category_id: int = None):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.category_id = category_id
+        self.position = 0
+        self.topic = None
+        self.nsfw = False
+        self.slowmode_delay = 0
+        self._overwrites = []
+        self._type = discord.ChannelType.text.value
+        self._state = guild._state
+
+
+class FakeVoiceChannel(_FakeChannel, discord.VoiceChannel):
+    """Voice channel of a fake guild with a plain list of its members"""
+
+    # Connected members (discord.py reads them out of the voice states of the guild)
+    members = None
+
+    def __init__(self, guild: 'FakeGuild', channel_id: int, name: str, category_id: int = None, user_limit: int = 0):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.category_id = category_id
+        self.user_limit = user_limit or 0
+        self.position = 0
+        self.bitrate = 64000
+        self._overwrites = []
+        self._state = guild._state
+        self.members: list[FakeMember] = []
+
+
+class FakeMessage(discord.Message):
+    """Message in a fake text channel"""
+
+    def __init__(self, message_id: int, content: str, author: FakeMember, channel: Optional[FakeTextChannel]):
+        self.id = message_id
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild if channel else None
+        self._state = author._state if author else channel._state
+        self.mentions = [member for member in (self.guild._members.values() if self.guild else ())
+                         if member.mention in content] if '<@' in content else []
+        self.role_mentions = []
+        self.embeds = []
+        self.attachments = []
+        self.webhook_id = None
+        self.reference = None
+        self.type = discord.MessageType.default
+
+
+class FakeGuild(discord.Guild):
+    """
+    Guild whose members, channels and roles are kept in the dicts discord.py looks them up in. Channels and roles are
+    created through the recording HTTP client.
+    """
+
+    def __init__(self, state: FakeState, guild_id: int, name: str):
+        self._state = state
+        self.id = guild_id
+        self.name = name
+        self.icon = None
+        self.owner_id = None
+        self.unavailable = False
+        self._members: dict[int, FakeMember] = {}
+        self._channels: dict[int, discord.abc.GuildChannel] = {}
+        self._roles: dict[int, FakeRole] = {}
+        self._voice_states = {}
+
+        # Role of @everyone has the ID of the guild
+        self._roles[guild_id] = FakeRole(self, guild_id, '@everyone', permissions=Permissions.general())
+
+    def add_member(self, name: str, roles: list = None, member_id: int = None, bot: bool = False) -> FakeMember:
+        """Add a member to the cache of the guild"""
+        member = FakeMember(self, member_id or next_id(), name, roles, bot)
+        self._members[member.id] = member
+        return member
+
+    def add_role(self, name: str, position: int, permissions: Permissions = None) -> FakeRole:
+        """Add a role to the cache of the guild"""
+        role = FakeRole(self, next_id(), name, position, permissions)
+        self._roles[role.id] = role
+        return role
+
+    def add_text_channel(self, name: str) -> FakeTextChannel:
+        """Add a text channel to the cache of the guild"""
+        channel = FakeTextChannel(self, next_id(), name)
+        self._channels[channel.id] = channel
+        return channel
+
+    def add_voice_channel(self, name: str, category_id: int = None, user_limit: int = 0) -> FakeVoiceChannel:
+        """Add a voice channel to the cache of the guild"""
+        channel = FakeVoiceChannel(self, next_id(), name, category_id, user_limit)
+        self._channels[channel.id] = channel
+        return channel
+
+    async def create_voice_channel(self, name: str, *, category=None, reason: str = None, user_limit: int = 0,
+                                   **_) -> FakeVoiceChannel:
+        data = await self._state.http.create_channel(self.id, discord.ChannelType.voice.value, name=name,
+                                                     reason=reason)
+        channel = FakeVoiceChannel(self, int(data['id']), name, category and category.id, user_limit)
+        self._channels[channel.id] = channel
+        return channel
+
+    async def create_text_channel(self, name: str, *, category=None, reason: str = None, **_) -> FakeTextChannel:
+        data = await self._state.http.create_channel(self.id, discord.ChannelType.text.value, name=name,
+                                                     reason=reason)
+        channel = FakeTextChannel(self, int(data['id']), name, category and category.id)
+        self._channels[channel.id] = channel
+        return channel
+
+    async def create_role(self, *, name: str = 'new role', permissions: Permissions = None, reason: str = None,
+                          **_) -> FakeRole:
+        data = await self._state.http.create_role(self.id, reason=reason)
+        role = FakeRole(self, int(data['id']), name, 1, permissions)
+        self._roles[role.id] = role
+        return role
+
+    async def kick(self, user, *, reason: str = None) -> None:
+        await self._state.http.kick(user.id, self.id, reason=reason)
+
+    async def ban(self, user, *, reason: str = None, delete_message_days: int = 1) -> None:
+        await self._state.http.ban(user.id, self.id, delete_message_days, reason=reason)
+
+    async def unban(self, user, *, reason: str = None) -> None:
+        await self._state.http.unban(user.id, self.id, reason=reason)
+
+
+def voice_channel(member: FakeMember, channel: Optional[FakeVoiceChannel]) -> tuple[VoiceState, VoiceState]:
+    """
+    Move the member into a voice channel (or out of voice if the channel is None) like the gateway would
+    :param member: Member that moves
+    :param channel: Channel the member moves into
+    :return: Voice states before and after the move (the arguments of on_voice_state_update)
+    """
+    before = member.voice or VoiceState(data={}, channel=None)
+    if before.channel and member in before.channel.members:
+        before.channel.members.remove(member)
+
+    after = VoiceState(data={}, channel=channel)
+    if channel:
+        channel.members.append(member)
+    member.voice = after if channel else None
+
+    return before, after
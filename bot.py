@@ -1,3 +1,5 @@
+import asyncio
+
 # discord.py imports
 import discord
 from discord.ext import commands, tasks
@@ -5,9 +7,10 @@ from discord.ext.commands import Bot
 from discord import Message
 
 # fryselBot imports
-from database import delete
+from database import delete, select, manager
 from system.private_rooms import private_rooms
-from system import cogs, guilds, appearance, help
+from system import cogs, guilds, appearance, help, coordination, loop_monitor
+from utilities import fake_gateway, metrics
 
 try:
     from utilities import secret
@@ -24,10 +27,29 @@ async def get_prefix(_: Bot, message: Message):
 
 # Setup intents and create bot client
 intents = discord.Intents.all()
-client = commands.Bot(command_prefix=get_prefix, intents=intents, help_command=None, case_insensitive=True)
-
-# Load all extensions
-cogs.load_all(client)
+if coordination.shard_count:
+    # Process of launcher.py that runs a range of the shards
+    client = commands.AutoShardedBot(command_prefix=get_prefix, intents=intents, help_command=None,
+                                     case_insensitive=True, shard_ids=coordination.shard_ids,
+                                     shard_count=coordination.shard_count)
+else:
+    client = commands.Bot(command_prefix=get_prefix, intents=intents, help_command=None, case_insensitive=True)
+
+# Measure events, commands and API requests and read the gauges on every scrape
+metrics.instrument(client)
+loop_monitor.install(client)
+metrics.private_rooms.set_function(lambda: len(coordination.owned(select.all_private_rooms())))
+for table in ('mutes', 'bans'):
+    metrics.pending_expiries.set_function(
+        lambda t=table: sum(count for guild_id, count in select.pending_expiries(t) if coordination.owns(guild_id)),
+        table)
+
+# Bring the db of an older version up to date before the cogs use it
+manager.migrate()
+
+# Load all extensions (the fake gateway doesn't run them)
+if not coordination.fake_gateway:
+    cogs.load_all(client)
 
 
 @client.event
@@ -37,6 +59,10 @@ async def on_ready():
     await client.change_presence(status=discord.Status.online)
     change_status.start()
 
+    # Drop cache entries that other bot processes change
+    if not coordination.runs_all_shards() and not sync_caches.is_running():
+        sync_caches.start()
+
     # Set database up to date
     for check in guilds.checks:
         check(client)
@@ -44,7 +70,18 @@ async def on_ready():
     for check in guilds.async_checks:
         await check(client)
 
-    delete.all_waiting_for_responses()
+    # Drop the responses that were waited for before the start (other processes wait for the ones of their guilds)
+    if coordination.runs_all_shards():
+        delete.all_waiting_for_responses()
+    else:
+        delete.all_waiting_for_responses([guild.id for guild in client.guilds])
+
+    # Serve the metrics
+    loop_monitor.start()
+    try:
+        await metrics.serve()
+    except OSError as error:
+        print(f'\033[31mMetrics are not served: {error}\033[0m')
 
     # States, that the bot is ready
     print(f'\033[93m{appearance.bot_name} is logged in as user {client.user.name}\033[0m')
@@ -56,6 +93,12 @@ async def change_status():
     await client.change_presence(activity=discord.Game(next(appearance.status)))
 
 
+@tasks.loop(seconds=coordination.poll_interval)
+async def sync_caches():
+    """Apply the cache invalidations of the other bot processes"""
+    coordination.sync()
+
+
 @client.event
 async def on_message(message: Message):
     """Is called when there is a new message in a text channel."""
@@ -76,5 +119,10 @@ async def on_message(message: Message):
         await client.process_commands(message)
 
 
-# Starts the bot with given token
-client.run(secret.bot_token)
+if __name__ == '__main__':
+    if coordination.fake_gateway:
+        # Test the shards of this process with fake guilds instead of connecting to Discord
+        asyncio.run(fake_gateway.run())
+    else:
+        # Starts the bot with given token
+        client.run(secret.bot_token)
@@ -3,10 +3,11 @@ from discord.ext.commands import Bot
 from discord import Guild, Role, TextChannel, VoiceChannel, CategoryChannel, Member
 from discord.abc import GuildChannel
 
-from system import guilds, welcome, moderation
+from system import guilds, welcome, moderation, permission
 from database import delete, select
 from system.moderation import mute, moderation
-from system.private_rooms import private_rooms, settings as pr_settings
+from system.private_rooms import private_rooms, pool, settings as pr_settings
+from system.setup import snapshot
 
 
 class GuildUpdates(commands.Cog):
@@ -44,11 +45,13 @@ class GuildUpdates(commands.Cog):
                 welcome.toggle_welcome(guild, disable=True)
                 welcome.toggle_leave(guild, disable=True)
                 welcome.set_welcome_channel(guild, channel_id=None)
+                snapshot.invalidate(guild.id)
 
             # Moderation System: Check whether the channel is the moderation log
             if (channel.id, guild.id) in select.all_moderation_logs():
                 # Delete mod log out of database
                 moderation.set_mod_log(guild, channel_id=None)
+                snapshot.invalidate(guild.id)
 
             # Private Rooms: Check whether the channel is the settings channel
             if (channel.id, guild.id) in select.all_pr_settings():
@@ -84,6 +87,12 @@ class GuildUpdates(commands.Cog):
                 private_room = select.PrivateRoom(guild_id=guild.id, move_channel_id=channel.id)
                 await pr_settings.unlock(guild, private_room)
 
+            # Private Rooms: Check whether the channel was in the channel pool
+            elif pool.is_pool_channel(channel):
+                # Remove the channel from the pool and create a new one
+                pool.discard_channel(channel)
+                pool.refill_pool(guild)
+
         elif isinstance(channel, CategoryChannel):
             guild = channel.guild
             # Private Rooms: Check whether the channel is the pr category
@@ -105,6 +114,7 @@ class GuildUpdates(commands.Cog):
         if (role.id, guild.id) in select.all_roles():
             # Delete role out of database
             delete.role(role.id)
+            permission.invalidate_roles(guild.id)
 
 
 def setup(client: Bot):
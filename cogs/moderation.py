@@ -1,14 +1,15 @@
 from datetime import datetime, timedelta
 from typing import Union
 
-from discord import Member, Role
+from discord import Member, User, Role, Message, RawMessageDeleteEvent, RawBulkMessageDeleteEvent, RawReactionActionEvent, \
+    TextChannel
 from discord.ext import commands, tasks
-from discord.ext.commands import Bot, Context
+from discord.ext.commands import Bot, Context, Greedy
 
-from database import delete, select
+from database import delete
 from utilities import util
-from system import description, error_messages, permission
-from system.moderation import moderation as mod, clear, kick, ban, mute, warn, report
+from system import description, error_messages, permission, coordination
+from system.moderation import moderation as mod, clear, kick, ban, mute, warn, report, purge, bulk, history, automod
 
 
 class Moderation(commands.Cog):
@@ -48,6 +49,18 @@ class Moderation(commands.Cog):
             await error_messages.error_handler(ctx, error, description.get_command('clear'), 'Amount',
                                                'The amount has to be a positive integer.', True)
 
+    @commands.command(name='purge')
+    @commands.check(permission.is_mod)
+    async def purge(self, ctx: Context, amount: int, channels: Greedy[TextChannel]):
+        """Purge command"""
+        await purge.purge(ctx.message, channels or [ctx.channel], amount)
+
+    @purge.error
+    async def purge_error(self, ctx: Context, error: Exception):
+        """Handles exceptions while running the purge command"""
+        await error_messages.error_handler(ctx, error, description.get_command('purge'), 'Amount',
+                                           'The amount has to be a positive integer.', True)
+
     ####################################
 
     @commands.command(name='kick')
@@ -143,6 +156,18 @@ class Moderation(commands.Cog):
             await error_messages.error_handler(ctx, error, description.get_command('unban'), 'User',
                                                'Cannot find the user.', True)
 
+    @commands.command(name='bans')
+    @commands.check(permission.is_mod)
+    async def bans(self, ctx: Context, user: User):
+        """Bans command"""
+        await history.history_cmd(ctx.message, user, 'bans')
+
+    @bans.error
+    async def bans_error(self, ctx: Context, error: Exception):
+        """Handles exceptions while running the bans command"""
+        await error_messages.error_handler(ctx, error, description.get_command('bans'), 'User',
+                                           'Cannot find the user.', True)
+
     ####################################
 
     @commands.command(name='mute')
@@ -151,6 +176,32 @@ class Moderation(commands.Cog):
         """Mute command"""
         await mute.mute_cmd(ctx.message, member, reason)
 
+    @commands.Cog.listener()
+    async def on_message(self, message: Message):
+        """Called when a message is sent. Remembers the message for clearing and mutes spamming members."""
+        clear.record_message(message)
+        await automod.check_message(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent):
+        """Called when a message is deleted. Forgets the message if its author is known."""
+        if payload.cached_message:
+            clear.forget_message(payload.channel_id, payload.cached_message.author.id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent):
+        """Called when messages are deleted in bulk. Forgets the messages whose author is known."""
+        for message in payload.cached_messages:
+            clear.forget_message(payload.channel_id, message.author.id, message.id)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: RawReactionActionEvent):
+        """Called when a reaction is added to a message. Cancels purges and turns the pages of histories."""
+        if payload.emoji.name == purge.cancel_emoji:
+            purge.cancel(payload.message_id, payload.user_id)
+        else:
+            await history.turn_page(payload.message_id, payload.user_id, payload.emoji.name)
+
     @commands.Cog.listener()
     async def on_member_join(self, member: Member):
         """Called when a member joines a guild"""
@@ -221,6 +272,18 @@ class Moderation(commands.Cog):
             await error_messages.error_handler(ctx, error, description.get_command('unmute'), 'Member',
                                                'Cannot find the member.', True)
 
+    @commands.command(name='mutes')
+    @commands.check(permission.is_mod)
+    async def mutes(self, ctx: Context, member: Member):
+        """Mutes command"""
+        await history.history_cmd(ctx.message, member, 'mutes')
+
+    @mutes.error
+    async def mutes_error(self, ctx: Context, error: Exception):
+        """Handles exceptions while running the mutes command"""
+        await error_messages.error_handler(ctx, error, description.get_command('mutes'), 'Member',
+                                           'Cannot find the member.', True)
+
     ####################################
 
     @tasks.loop(seconds=30)
@@ -236,6 +299,72 @@ class Moderation(commands.Cog):
 
     ####################################
 
+    @commands.group(name='massban', invoke_without_command=True)
+    @commands.check(permission.ban)
+    async def massban(self, ctx: Context, members: Greedy[Member], *, reason: str = None):
+        """Massban command"""
+        await bulk.mass_ban(ctx.message, members, self.client, reason)
+
+    @massban.command(name='joined')
+    @commands.check(permission.ban)
+    async def massban_joined(self, ctx: Context, duration_amount: int, duration_unit: str, *, reason: str = None):
+        """Massban joined command"""
+        members = bulk.members_joined_since(ctx.guild, duration_amount, duration_unit)
+        await bulk.mass_ban(ctx.message, members, self.client, reason)
+
+    @commands.group(name='masskick', invoke_without_command=True)
+    @commands.check(permission.kick)
+    async def masskick(self, ctx: Context, members: Greedy[Member], *, reason: str = None):
+        """Masskick command"""
+        await bulk.mass_kick(ctx.message, members, self.client, reason)
+
+    @masskick.command(name='joined')
+    @commands.check(permission.kick)
+    async def masskick_joined(self, ctx: Context, duration_amount: int, duration_unit: str, *, reason: str = None):
+        """Masskick joined command"""
+        members = bulk.members_joined_since(ctx.guild, duration_amount, duration_unit)
+        await bulk.mass_kick(ctx.message, members, self.client, reason)
+
+    @commands.group(name='massmute', invoke_without_command=True)
+    @commands.check(permission.mute)
+    async def massmute(self, ctx: Context, members: Greedy[Member], *, reason: str = None):
+        """Massmute command"""
+        await bulk.mass_mute(ctx.message, members, self.client, reason)
+
+    @massmute.command(name='joined')
+    @commands.check(permission.mute)
+    async def massmute_joined(self, ctx: Context, duration_amount: int, duration_unit: str, *, reason: str = None):
+        """Massmute joined command"""
+        members = bulk.members_joined_since(ctx.guild, duration_amount, duration_unit)
+        await bulk.mass_mute(ctx.message, members, self.client, reason)
+
+    @massban.error
+    @masskick.error
+    @massmute.error
+    @massban_joined.error
+    @masskick_joined.error
+    @massmute_joined.error
+    async def mass_error(self, ctx: Context, error: Exception):
+        """Handles exceptions while running the mass moderation commands"""
+        if error.args[0].endswith('No targets'):
+            # No members left after removing moderators and the bot
+            await util.delete_message(ctx.message)
+            await error_messages.invalid_input_error(ctx, title='Members',
+                                                     description='There are no members I can do that to.')
+        elif error.args[0].endswith('Too many targets'):
+            await util.delete_message(ctx.message)
+            await error_messages.invalid_input_error(ctx, title='Members',
+                                                     description=f'At most {bulk.max_targets} members can be '
+                                                                 f'affected at once.')
+        elif error.args[0].endswith('Invalid Duration'):
+            # Invalid duration
+            await error_messages.arguments_error(ctx, description.get_command(ctx.command.qualified_name))
+        else:
+            await error_messages.error_handler(ctx, error, description.get_command(ctx.command.qualified_name),
+                                               'Members', 'I am missing permissions to do that.', True)
+
+    ####################################
+
     @commands.command(name='warn')
     @commands.check(permission.is_mod)
     async def warn(self, ctx: Context, member: Member, *, reason: str = None):
@@ -263,7 +392,7 @@ class Moderation(commands.Cog):
     @commands.check(permission.is_mod)
     async def warns(self, ctx: Context, member: Member):
         """Warns command"""
-        await warn.warns_of_member_cmd(self.client, ctx.message, member)
+        await warn.warns_of_member_cmd(ctx.message, member)
 
     @warns.error
     async def warns_error(self, ctx: Context, error: Exception):
@@ -274,10 +403,13 @@ class Moderation(commands.Cog):
     @tasks.loop(hours=24)
     async def check_old_warns(self):
         """Checks for old warns"""
+        if not coordination.is_primary():
+            # Only one bot process deletes the old warns of all guilds
+            return
+
         # Get date of 1 year ago
         date = datetime.utcnow() - timedelta(days=365)
-        for w in select.warns_date(date=date, after=False):
-            delete.warn(w.warn_id)
+        delete.old_warns(date)
 
     ####################################
 
@@ -310,7 +442,7 @@ class Moderation(commands.Cog):
     @commands.check(permission.is_mod)
     async def reports(self, ctx: Context, member: Member):
         """Reports command"""
-        await report.reports_of_member_cmd(self.client, ctx.message, member)
+        await report.reports_of_member_cmd(ctx.message, member)
 
     @reports.error
     async def reports_error(self, ctx: Context, error: Exception):
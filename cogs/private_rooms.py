@@ -4,8 +4,8 @@ from discord.ext.commands import Bot
 
 from database.manager import DatabaseEntryError
 from database.select import PrivateRoom
-from system import welcome, waiting_for_responses
-from system.private_rooms import private_rooms, settings
+from system import welcome, waiting_for_responses, message_cache
+from system.private_rooms import private_rooms, settings, game_activity, pool
 from utilities import secret
 
 
@@ -14,12 +14,15 @@ class PrivateRooms(commands.Cog):
     Handles the welcome system of the bot
     Attributes:
         client  (Bot): The bot client
+        avoided_renames (int): Count of renames avoided between the last two game activity checks
     Arguments:
          client (Bot): The bot client
     """
     def __init__(self, client: Bot, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.client = client
+        # Count of renames avoided between the last two game activity checks
+        self.avoided_renames = 0
         self.check_activity.start()
 
     @commands.Cog.listener()
@@ -60,29 +63,54 @@ class PrivateRooms(commands.Cog):
             if private_rooms.is_private_room(channel):
                 await private_rooms.leave_private_room(member, channel)
 
+    @commands.Cog.listener()
+    async def on_member_update(self, before: Member, after: Member):
+        """Is called when a member updates their profile or presence. Refreshes the game activity of private rooms."""
+        if before.activities == after.activities or not after.voice or not after.voice.channel:
+            # Ignore members that don't change their activities in a voice channel
+            return
+
+        channel: VoiceChannel = after.voice.channel
+        if game_activity.update_member(channel.id, after):
+            await settings.refresh_name(after.guild, channel.id)
+
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
-        """Called when there is a reaction on a message added. Handles the ones on setup commands."""
-        # Retrieve information out of payload
-        try:
+        """Called when there is a reaction on a message added. Handles the ones in the settings channel."""
+        if payload.user_id == secret.bot_id or not payload.guild_id:
+            # Ignore reactions from our bot and in direct messages
+            return
+
+        message: Message = message_cache.get(payload.message_id, 'SETTINGS')
+        if not message:
+            # Messages of the settings channel are only fetched if they are not cached (e.g. after a restart)
             guild: Guild = self.client.get_guild(payload.guild_id)
-            channel: TextChannel = guild.get_channel(payload.channel_id)
-            message: Message = await channel.fetch_message(payload.message_id)
-            member: Member = guild.get_member(payload.user_id)
-            emoji = payload.emoji.name
-        except NotFound:
-            pass
-
-        # Check reaction if the reaction is in a settings channel and the member owns a private room
-        if private_rooms.is_settings_channel(channel):
+            channel: TextChannel = guild.get_channel(payload.channel_id) if guild else None
+            if not isinstance(channel, TextChannel) or not private_rooms.is_settings_channel(channel):
+                return
+
             try:
-                private_room: PrivateRoom = PrivateRoom(guild.id, owner_id=member.id)
-            except DatabaseEntryError:
-                if member.id != secret.bot_id:
-                    await message.remove_reaction(emoji, member)
+                message = await channel.fetch_message(payload.message_id)
+            except NotFound:
                 return
-            else:
-                await settings.check_reactions(member, guild, private_room, message, emoji, True)
+
+            if message.author.id != secret.bot_id:
+                return
+            message_cache.add(message, 'SETTINGS')
+
+        # Retrieve information out of payload
+        guild: Guild = message.guild
+        member: Member = payload.member or guild.get_member(payload.user_id)
+        emoji = payload.emoji.name
+
+        # Check reaction if the member owns a private room
+        try:
+            private_room: PrivateRoom = PrivateRoom(guild.id, owner_id=member.id)
+        except DatabaseEntryError:
+            await message.remove_reaction(emoji, member)
+            return
+        else:
+            await settings.check_reactions(member, guild, private_room, message, emoji, True)
 
     @commands.Cog.listener()
     async def on_message(self, message: Message):
@@ -96,13 +124,15 @@ class PrivateRooms(commands.Cog):
 
     @tasks.loop(minutes=1)
     async def check_activity(self):
-        """Checks for new activities"""
-        await settings.handle_game_activity(self.client)
+        """Retries renames that were put off by the rename limit"""
+        self.avoided_renames = await settings.handle_game_activity(self.client)
 
     @check_activity.before_loop
     async def before_check_activity(self):
-        """Wait until bot is ready"""
+        """Wait until bot is ready, start tracking the game activity of the private rooms and fill the channel pools"""
         await self.client.wait_until_ready()
+        settings.load_game_activity(self.client)
+        pool.load_pools(self.client)
 
     #####################
 
@@ -1,14 +1,13 @@
 from discord.ext import commands
 from discord.ext.commands import Context, Bot
-from discord import Message, Guild, TextChannel, Member, Role, NotFound
+from discord import Message, Guild, TextChannel, Member, Role
 
-from system import description, error_messages, permission
+from system import description, error_messages, permission, message_cache
 from system.setup import setup as setup_setup, \
     prefix as prefix_setup, \
     color as color_setup, \
     welcome, roles, moderation, private_rooms
-from system.private_rooms import private_rooms as pr_sys
-from utilities import util
+from utilities import util, secret
 
 
 class Setup(commands.Cog):
@@ -27,22 +26,28 @@ class Setup(commands.Cog):
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
         """Called when there is a reaction on a message added. Handles the ones on setup commands."""
-        # Retrieve information out of payload
-        try:
-            guild: Guild = self.client.get_guild(payload.guild_id)
-            channel: TextChannel = guild.get_channel(payload.channel_id)
-            message: Message = await channel.fetch_message(payload.message_id)
-            member: Member = guild.get_member(payload.user_id)
-            emoji = payload.emoji.name
-        except NotFound:
+        if payload.user_id == secret.bot_id:
+            # Ignore reactions from our bot
             return
 
-        # Ignore messages in the settings channel
-        if pr_sys.is_settings_channel(channel):
+        # Only reactions on setup pages are handled (they are cached when they are sent)
+        message: Message = message_cache.get(payload.message_id, 'SETUP')
+        if not message:
             return
 
+        # Retrieve information out of payload
+        guild: Guild = message.guild
+        channel: TextChannel = message.channel
+        member: Member = payload.member or guild.get_member(payload.user_id)
+        emoji = payload.emoji.name
+
         await setup_setup.check_reactions(member, guild, channel, message, emoji)
 
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        """Called when a message is deleted. Removes it from the message cache."""
+        message_cache.remove(payload.message_id)
+
     ######################
 
     @commands.group(name='setup')
@@ -181,6 +186,23 @@ class Setup(commands.Cog):
         await error_messages.error_handler(ctx, error, description.get_command('roles remove'), 'Type',
                                            'The type must be either *admin*, *moderator* or *supporter*.', True)
 
+    @roles.command(name='backfill')
+    async def roles_backfill(self, ctx: Context):
+        """Command for giving the autoroles to all members"""
+        await roles.backfill_auto_roles(ctx.guild, ctx.channel, ctx.message)
+
+    @roles_backfill.error
+    async def roles_backfill_error(self, ctx: Context, error: Exception):
+        """Handles exceptions while running the roles backfill command"""
+        if error.args[0].endswith('No autoroles'):
+            # There are no autoroles to give
+            await util.delete_message(ctx.message)
+            await error_messages.invalid_input_error(ctx, title='Autoroles',
+                                                     description='Add autoroles first.')
+        else:
+            await error_messages.error_handler(ctx, error, description.get_command('roles backfill'), 'Autoroles',
+                                               '', True)
+
     ########################
 
     @setup.group(name='moderation')
@@ -208,6 +230,18 @@ class Setup(commands.Cog):
         await error_messages.error_handler(ctx, error, description.get_command('moderation log'), 'Channel',
                                            'Cannot find the channel.', True)
 
+    @moderation.command(name='warns')
+    async def set_warn_thresholds(self, ctx: Context, mute_threshold: int, kick_threshold: int):
+        """Command to set the warn counts that escalate warns"""
+        await moderation.setup_warn_thresholds(ctx.channel, ctx.guild, ctx.message, mute_threshold, kick_threshold)
+
+    @set_warn_thresholds.error
+    async def warn_thresholds_error(self, ctx: Context, error: Exception):
+        """Handles exceptions while running the moderation warns command"""
+        # Handle error messages
+        await error_messages.error_handler(ctx, error, description.get_command('moderation warns'), 'Counts',
+                                           'The counts must be integers from 2 to 10.', True)
+
     ####################################
 
     @setup.group(name='private')
@@ -217,14 +251,28 @@ class Setup(commands.Cog):
             # Send error message
             await error_messages.arguments_error(ctx, description.get_command('private rooms'))
 
-    @private.command(name='rooms')
+    @private.group(name='rooms')
     async def private_rooms(self, ctx: Context):
         """Setup private rooms command"""
-        await private_rooms.private_rooms_page(ctx.channel, ctx.guild)
+        if ctx.invoked_subcommand is None:
+            # Send private rooms page if no args are given
+            await private_rooms.private_rooms_page(ctx.channel, ctx.guild)
 
     @private_rooms.error
     async def pr_error(self, ctx: Context, error: Exception):
         await error_messages.error_handler(ctx, error, description.get_command('private rooms'), '', '', True)
+
+    @private_rooms.command(name='pool')
+    async def pr_pool(self, ctx: Context, size: int):
+        """Command for setting the size of the private room pool"""
+        await private_rooms.setup_pool_size(ctx.channel, ctx.guild, ctx.message, size)
+
+    @pr_pool.error
+    async def pr_pool_error(self, ctx: Context, error: Exception):
+        """Handles exceptions while running the private rooms pool command"""
+        # Handle error messages
+        await error_messages.error_handler(ctx, error, description.get_command('private rooms pool'), 'Size',
+                                           'The size must be an integer from 0 to 10.', True)
         
 
 def setup(client: Bot):
@@ -1,9 +1,9 @@
 from discord.ext import commands
-from discord.ext.commands import Context, Bot
+from discord.ext.commands import Context, Bot, CheckFailure
 
 from database import manager
 from database.select import PrivateRoom
-from system import help, invite
+from system import help, invite, loop_monitor, error_messages
 from utilities import secret
 
 
@@ -33,6 +33,21 @@ class UtilityCommands(commands.Cog):
         """Invite command"""
         await invite.invite_command(ctx.message)
 
+    @commands.command(name='lag')
+    @commands.check(lambda ctx: ctx.author.id in secret.dev_ids)
+    async def lag(self, ctx: Context, threshold: int = None):
+        """Shows the loop lag and the worst offenders. Optionally sets the threshold for slow callbacks in ms."""
+        await loop_monitor.lag_cmd(ctx.message, threshold)
+
+    @lag.error
+    async def lag_error(self, ctx: Context, error: Exception):
+        """Handles exceptions while running the lag command"""
+        # No Permission error
+        if isinstance(error, CheckFailure):
+            return
+        await error_messages.invalid_input_error(ctx, title='Threshold', description='The threshold must be a '
+                                                                                     'positive count of milliseconds.')
+
     @commands.command(name='test')
     @commands.check(lambda ctx: ctx.author.id in secret.dev_ids)
     async def test(self, ctx: Context, arg: int, arg2=None):
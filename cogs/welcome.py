@@ -2,7 +2,7 @@ from discord import Member
 from discord.ext import commands
 from discord.ext.commands import Bot
 
-from system import welcome, roles
+from system import welcome, autoroles
 
 
 class Welcome(commands.Cog):
@@ -17,6 +17,11 @@ class Welcome(commands.Cog):
         super().__init__(*args, **kwargs)
         self.client = client
 
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Is called when the client is ready. Continues the autorole backfills."""
+        autoroles.resume_backfills(self.client)
+
     @commands.Cog.listener()
     async def on_member_join(self, member: Member):
         """Is called when a member joins a guild"""
@@ -24,9 +29,15 @@ class Welcome(commands.Cog):
             # Ignore bots
             return
 
-        await welcome.welcome_message(member)
+        if welcome.record_join(member.guild):
+            # Batch welcome messages while many members join
+            welcome.queue_welcome_message(member)
+        else:
+            await welcome.welcome_message(member)
         await welcome.welcome_dm(member)
-        await roles.add_auto_roles(member)
+
+        # Auto roles are assigned paced by the autorole worker
+        autoroles.queue(member)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: Member):
@@ -1,6 +1,7 @@
+from datetime import datetime
 from typing import Callable
 
-from database.manager import connection
+from database.manager import connection, warn_counter, latest_warns, save_warn_counter
 from sqlite3.dbapi2 import Cursor
 
 
@@ -30,6 +31,7 @@ def _delete_by_keyword_factory(table: str, keyword: str) -> Callable[[Cursor, st
         # Delete entry
         _c.execute(statement)
 
+    _delete_by_keyword.query_name = f'delete.{table}'
     return _delete_by_keyword
 
 
@@ -44,8 +46,6 @@ ban = _delete_by_keyword_factory(table='bans', keyword='ban_id')
 
 mute = _delete_by_keyword_factory(table='mutes', keyword='mute_id')
 
-warn = _delete_by_keyword_factory(table='warns', keyword='warn_id')
-
 report = _delete_by_keyword_factory(table='reports', keyword='report_id')
 
 private_room = _delete_by_keyword_factory(
@@ -62,6 +62,12 @@ ticket = _delete_by_keyword_factory(table='tickets', keyword='ticket_id')
 waiting_for_response = _delete_by_keyword_factory(
     table='waiting_for_responses', keyword='id')
 
+autorole_backfill = _delete_by_keyword_factory(
+    table='autorole_backfills', keyword='guild_id')
+
+pool_channel = _delete_by_keyword_factory(
+    table='pr_pool_channels', keyword='channel_id')
+
 
 @connection
 def ticket_user(_c: Cursor, ticket_id: str, user_id: str) -> None:
@@ -76,6 +82,66 @@ def ticket_user(_c: Cursor, ticket_id: str, user_id: str) -> None:
         "DELETE FROM ticket_users WHERE ticket_id==? AND user_id==?", (ticket_id, user_id))
 
 
+@connection
+def warn(_c: Cursor, warn_id: str) -> None:
+    """
+    Deletes a warn and updates the warn counter of the user in the same transaction
+    :param _c: Database cursor (provided by decorator)
+    :param warn_id: ID of the warn
+    """
+    _c.execute('BEGIN')
+    _c.execute('SELECT guild_id, user_id FROM warns WHERE warn_id==?', (warn_id,))
+    entry = _c.fetchone()
+
+    if entry:
+        guild_id, user_id = entry
+        count, _ = warn_counter(_c, guild_id, user_id)
+
+        # Delete entry
+        _c.execute('DELETE FROM warns WHERE warn_id==?', (warn_id,))
+        save_warn_counter(_c, guild_id, user_id, count - 1, latest_warns(_c, guild_id, user_id))
+
+    _c.execute('COMMIT')
+
+
+@connection
+def warns_of_member(_c: Cursor, user_id: int, guild_id: int) -> None:
+    """
+    Deletes all warns of user on guild and their warn counter in the same transaction
+    :param _c: Database cursor (provided by decorator)
+    :param user_id: UserID of the warns
+    :param guild_id: GuildID of the warns
+    """
+    _c.execute('BEGIN')
+    _c.execute('DELETE FROM warns WHERE user_id==? AND guild_id==?', (user_id, guild_id))
+    _c.execute('DELETE FROM warn_counters WHERE user_id==? AND guild_id==?', (user_id, guild_id))
+    _c.execute('COMMIT')
+
+
+@connection
+def old_warns(_c: Cursor, date: datetime) -> None:
+    """
+    Deletes all warns created before the date and updates the warn counters in the same transaction
+    :param _c: Database cursor (provided by decorator)
+    :param date: Warns before this date are deleted
+    """
+    date = date.strftime('%Y-%m-%d %H:%M:%S')
+
+    _c.execute('BEGIN')
+    _c.execute('''SELECT guild_id, user_id, COUNT(*) FROM warns WHERE date <= Datetime(?)
+                  GROUP BY guild_id, user_id''', (date,))
+    expired = _c.fetchall()
+
+    # Decrease the counters by the count of expired warns
+    for guild_id, user_id, expired_count in expired:
+        count, dates = warn_counter(_c, guild_id, user_id)
+        save_warn_counter(_c, guild_id, user_id, count - expired_count, [d for d in dates if d > date])
+
+    # Delete entries
+    _c.execute('DELETE FROM warns WHERE date <= Datetime(?)', (date,))
+    _c.execute('COMMIT')
+
+
 def mod_operation_of_member_factory(table: str) -> Callable[[Cursor, str, str], None]:
     @connection
     def inner(_c: Cursor, user_id: str, guild_id: str) -> None:
@@ -86,18 +152,41 @@ def mod_operation_of_member_factory(table: str) -> Callable[[Cursor, str, str],
         :param guild_id: GuildID of the mod_operations
         """
         # Delete entries
-        _c.execute("DELETE FROM ? WHERE user_id==? AND guild_id==?",
-                   (table, user_id, guild_id))
+        _c.execute("DELETE FROM {} WHERE user_id==? AND guild_id==?".format(table),
+                   (user_id, guild_id))
+    inner.query_name = f'delete.{table}_of_member'
     return inner
 
 
-warns_of_member = mod_operation_of_member_factory('warns')
-
 mutes_of_member = mod_operation_of_member_factory('mutes')
 
 bans_of_member = mod_operation_of_member_factory('bans')
 
 
+def mod_operations_of_members_factory(table: str) -> Callable[[Cursor, list[int], int], None]:
+    @connection
+    def inner(_c: Cursor, user_ids: list[int], guild_id: int) -> None:
+        """
+        Deletes all entries of a specific mod operation of several users on guild with one statement
+        :param _c: Database cursor (provided by decorator)
+        :param user_ids: UserIDs of the mod_operations
+        :param guild_id: GuildID of the mod_operations
+        """
+        if not user_ids:
+            return
+
+        # Delete entries
+        _c.execute("DELETE FROM {} WHERE guild_id==? AND user_id IN ({})".format(table, ','.join('?' * len(user_ids))),
+                   (guild_id, *user_ids))
+    inner.query_name = f'delete.{table}_of_members'
+    return inner
+
+
+mutes_of_members = mod_operations_of_members_factory('mutes')
+
+bans_of_members = mod_operations_of_members_factory('bans')
+
+
 @connection
 def all_entries_of_guild(_c: Cursor, guild_id: str) -> None:
     """
@@ -121,18 +210,35 @@ def all_entries_of_guild(_c: Cursor, guild_id: str) -> None:
                     )''', (guild_id,))
 
     # Delete all entries of tables with guild_id attribute
-    tables = ['guilds', 'guild_settings', 'roles', 'bans', 'mutes', 'warns', 'reports', 'private_rooms', 'tickets',
-              'waiting_for_responses', 'default_pr_settings']
+    tables = ['guilds', 'guild_settings', 'roles', 'bans', 'mutes', 'warns', 'warn_counters', 'reports',
+              'private_rooms', 'tickets', 'waiting_for_responses', 'default_pr_settings', 'autorole_backfills',
+              'pr_pool_channels', 'ban_history', 'mute_history']
 
     for table in tables:
-        _c.execute("DELETE FROM ? WHERE guild_id==?", (table, guild_id))
+        _c.execute("DELETE FROM {} WHERE guild_id==?".format(table), (guild_id,))
 
 
 @connection
-def all_waiting_for_responses(_c: Cursor) -> None:
+def all_waiting_for_responses(_c: Cursor, guild_ids: list[int] = None) -> None:
     """
     Delete alle entries of waiting for responses
     :param _c: Database cursor (privided by decorator)
+    :param guild_ids: Only delete the entries of these guilds (all entries if None)
+    """
+    if guild_ids is None:
+        # Delete all entries
+        _c.execute('DELETE FROM waiting_for_responses')
+    elif guild_ids:
+        # Delete the entries of the guilds
+        _c.execute('DELETE FROM waiting_for_responses WHERE guild_id IN ({})'.format(','.join('?' * len(guild_ids))),
+                   tuple(guild_ids))
+
+
+@connection
+def old_cache_invalidations(_c: Cursor, date: datetime) -> None:
+    """
+    Deletes all cache invalidations created before the date
+    :param _c: Database cursor (provided by decorator)
+    :param date: Cache invalidations before this date are deleted
     """
-    # Delete all entries
-    _c.execute('DELETE FROM waiting_for_responses')
+    _c.execute('DELETE FROM cache_invalidations WHERE date <= ?', (date.strftime('%Y-%m-%d %H:%M:%S'),))
@@ -1,4 +1,4 @@
-from database.manager import connection, DatabaseAttributeError, DatabaseError
+from database.manager import connection, DatabaseAttributeError, DatabaseError, warn_counter, save_warn_counter
 from sqlite3.dbapi2 import Cursor
 from utilities import util
 
@@ -79,7 +79,8 @@ def guild_settings(_c: Cursor, guild_id: int, prefix: str = None, color: hex = N
                    welcome_dms: bool = False, welcome_dm: str = None,
                    pr_text_channel: bool = False, pr_name: bool = True,
                    pr_privacy: bool = True, pr_limit: bool = True,
-                   pr_visibility: bool = False) -> None:
+                   pr_visibility: bool = False, pr_pool_size: int = 0, warn_mute_threshold: int = 3,
+                   warn_kick_threshold: int = 4, automod: bool = False, welcome_cards: bool = False) -> None:
     """
     Insert guild_settings to db.
     :param _c: Database cursor (provided by decorator)
@@ -95,6 +96,11 @@ def guild_settings(_c: Cursor, guild_id: int, prefix: str = None, color: hex = N
     :param pr_privacy: Whether the private rooms can be locked
     :param pr_limit: Whether a user limit can be set for private rooms
     :param pr_visibility: Whether a private room can be made invisible
+    :param pr_pool_size: Count of private room channels that are created in advance
+    :param warn_mute_threshold: Count of warns within a week that mute the user for 2 hours
+    :param warn_kick_threshold: Count of warns within a month that kick the user
+    :param automod: Whether spam is muted automatically
+    :param welcome_cards: Whether welcome messages show an image card
     """
     # Parse bool into int
     welcome_messages = int(welcome_messages)
@@ -105,11 +111,18 @@ def guild_settings(_c: Cursor, guild_id: int, prefix: str = None, color: hex = N
     pr_privacy = int(pr_privacy)
     pr_limit = int(pr_limit)
     pr_visibility = int(pr_visibility)
+    automod = int(automod)
+    welcome_cards = int(welcome_cards)
 
     # Insert into db
-    _c.execute('''INSERT INTO guild_settings VALUES (:setting_id, :prefix, :color, 
+    _c.execute('''INSERT INTO guild_settings (setting_id, prefix, color,
+                welcome_messages, leave_messages, welcome_dms, welcome_dm,
+                pr_text_channel, pr_name, pr_privacy, pr_limit, pr_visibility, pr_pool_size,
+                warn_mute_threshold, warn_kick_threshold, automod, welcome_cards, guild_id)
+                VALUES (:setting_id, :prefix, :color,
                 :welcome_messages, :leave_messages, :welcome_dms, :welcome_dm, 
-                :pr_text_channel, :pr_name, :pr_privacy, :pr_limit, :pr_visibility, :guild_id)''',
+                :pr_text_channel, :pr_name, :pr_privacy, :pr_limit, :pr_visibility, :pr_pool_size,
+                :warn_mute_threshold, :warn_kick_threshold, :automod, :welcome_cards, :guild_id)''',
                {'setting_id': generate_new_id(table='guild_settings', identifier='setting_id'),
                 'prefix': prefix,
                 'color': color,
@@ -122,6 +135,11 @@ def guild_settings(_c: Cursor, guild_id: int, prefix: str = None, color: hex = N
                 'pr_privacy': pr_privacy,
                 'pr_limit': pr_limit,
                 'pr_visibility': pr_visibility,
+                'pr_pool_size': pr_pool_size,
+                'warn_mute_threshold': warn_mute_threshold,
+                'warn_kick_threshold': warn_kick_threshold,
+                'automod': automod,
+                'welcome_cards': welcome_cards,
                 'guild_id': guild_id
                 })
 
@@ -169,17 +187,21 @@ def ban(_c: Cursor, temp: bool, user_id: int, mod_id: int, date: datetime.dateti
     if until_date:
         until_date = until_date.strftime('%Y-%m-%d %H:%M:%S')
 
-    # Insert into db
-    _c.execute('INSERT INTO bans VALUES (:ban_id, :temp, :user_id, :mod_id, :reason, :date, :until_date, :guild_id)',
-               {'ban_id': generate_new_id(table='bans', identifier='ban_id'),
-                'temp': temp,
-                'user_id': user_id,
-                'mod_id': mod_id,
-                'reason': reason,
-                'date': date,
-                'until_date': until_date,
-                'guild_id': guild_id
-                })
+    # Insert into db (the history keeps the entry when it is deleted from bans)
+    _c.execute('BEGIN')
+    entry = {'ban_id': _generate_new_ids(_c, table='ban_history', identifier='ban_id', count=1)[0],
+             'temp': temp,
+             'user_id': user_id,
+             'mod_id': mod_id,
+             'reason': reason,
+             'date': date,
+             'until_date': until_date,
+             'guild_id': guild_id
+             }
+    for table in ('bans', 'ban_history'):
+        _c.execute('INSERT INTO {} VALUES (:ban_id, :temp, :user_id, :mod_id, :reason, :date, :until_date, :guild_id)'
+                   .format(table), entry)
+    _c.execute('COMMIT')
 
 
 @connection
@@ -205,21 +227,126 @@ def mute(_c: Cursor, temp: bool, user_id: int, mod_id: int, date: datetime.datet
     if until_date:
         until_date = until_date.strftime('%Y-%m-%d %H:%M:%S')
 
-    # Insert into db
-    _c.execute('INSERT INTO mutes VALUES (:mute_id, :temp, :user_id, :mod_id, :reason, :date, :until_date, :guild_id)',
-               {'mute_id': generate_new_id(table='mutes', identifier='mute_id'),
-                'temp': temp,
-                'user_id': user_id,
-                'mod_id': mod_id,
-                'reason': reason,
-                'date': date,
-                'until_date': until_date,
-                'guild_id': guild_id
-                })
+    # Insert into db (the history keeps the entry when it is deleted from mutes)
+    _c.execute('BEGIN')
+    entry = {'mute_id': _generate_new_ids(_c, table='mute_history', identifier='mute_id', count=1)[0],
+             'temp': temp,
+             'user_id': user_id,
+             'mod_id': mod_id,
+             'reason': reason,
+             'date': date,
+             'until_date': until_date,
+             'guild_id': guild_id
+             }
+    for table in ('mutes', 'mute_history'):
+        _c.execute('INSERT INTO {} VALUES (:mute_id, :temp, :user_id, :mod_id, :reason, :date, :until_date, :guild_id)'
+                   .format(table), entry)
+    _c.execute('COMMIT')
+
+
+def _generate_new_ids(_c: Cursor, table: str, identifier: str, count: int) -> list[str]:
+    """
+    Generate count unique IDs in table for identifier with the cursor of the caller
+    :param _c: Database cursor
+    :param table: Database table
+    :param identifier: Identifier of id attribute
+    :param count: Count of IDs
+    :return: List of unique IDs
+    """
+    ids = set()
+    tries = 0
+    # Create new IDs until there are enough unique ones
+    while len(ids) < count:
+        candidates = {util.random_base_16_code() for _ in range(count - len(ids))} - ids
+
+        # Remove the IDs that are already used
+        _c.execute("SELECT {0} FROM {1} WHERE {0} IN ({2})".format(identifier, table, ','.join('?' * len(candidates))),
+                   tuple(candidates))
+        ids.update(candidates - {entry[0] for entry in _c.fetchall()})
+
+        # No infinite loop
+        tries += 1
+        if tries >= 1000000:
+            raise DatabaseError('No unique code could be generated for table: {}'.format(table))
+
+    return list(ids)
 
 
 @connection
-def warn(_c: Cursor, user_id: int, mod_id: int, date: datetime.datetime, guild_id: int, reason: str = None) -> None:
+def mutes(_c: Cursor, temp: bool, user_ids: list[int], mod_id: int, date: datetime.datetime, guild_id: int,
+          reason: str = None, until_date: datetime.datetime = None) -> None:
+    """
+    Insert mutes of several users into db in one transaction.
+    :param _c: Database cursor (provided by decorator)
+    :param temp: Whether the mutes are temporary
+    :param user_ids: Discord UserIDs
+    :param mod_id: Discord UserID
+    :param date: Date of mutes
+    :param guild_id: Discord GuildID
+    :param reason: Reason for mutes
+    :param until_date: Date until the mutes last
+    :return: None
+    """
+    if not user_ids:
+        return
+
+    # Parse arguments into correct data types for db
+    temp = int(temp)
+
+    date = date.strftime('%Y-%m-%d %H:%M:%S')
+
+    if until_date:
+        until_date = until_date.strftime('%Y-%m-%d %H:%M:%S')
+
+    # Insert into db (the history keeps the entries when they are deleted from mutes)
+    _c.execute('BEGIN')
+    mute_ids = _generate_new_ids(_c, table='mute_history', identifier='mute_id', count=len(user_ids))
+    entries = [(mute_id, temp, user_id, mod_id, reason, date, until_date, guild_id)
+               for mute_id, user_id in zip(mute_ids, user_ids)]
+    _c.executemany('INSERT INTO mutes VALUES (?, ?, ?, ?, ?, ?, ?, ?)', entries)
+    _c.executemany('INSERT INTO mute_history VALUES (?, ?, ?, ?, ?, ?, ?, ?)', entries)
+    _c.execute('COMMIT')
+
+
+@connection
+def bans(_c: Cursor, temp: bool, user_ids: list[int], mod_id: int, date: datetime.datetime, guild_id: int,
+         reason: str = None, until_date: datetime.datetime = None) -> None:
+    """
+    Insert bans of several users into db in one transaction.
+    :param _c: Database cursor (provided by decorator)
+    :param temp: Whether the bans are temporary
+    :param user_ids: Discord UserIDs
+    :param mod_id: Discord UserID
+    :param date: Date of bans
+    :param guild_id: Discord GuildID
+    :param reason: Reason for bans
+    :param until_date: Date until the bans last
+    :return: None
+    """
+    if not user_ids:
+        return
+
+    # Parse arguments into correct data types for db
+    temp = int(temp)
+
+    date = date.strftime('%Y-%m-%d %H:%M:%S')
+
+    if until_date:
+        until_date = until_date.strftime('%Y-%m-%d %H:%M:%S')
+
+    # Insert into db (the history keeps the entries when they are deleted from bans)
+    _c.execute('BEGIN')
+    ban_ids = _generate_new_ids(_c, table='ban_history', identifier='ban_id', count=len(user_ids))
+    entries = [(ban_id, temp, user_id, mod_id, reason, date, until_date, guild_id)
+               for ban_id, user_id in zip(ban_ids, user_ids)]
+    _c.executemany('INSERT INTO bans VALUES (?, ?, ?, ?, ?, ?, ?, ?)', entries)
+    _c.executemany('INSERT INTO ban_history VALUES (?, ?, ?, ?, ?, ?, ?, ?)', entries)
+    _c.execute('COMMIT')
+
+
+@connection
+def warn(_c: Cursor, user_id: int, mod_id: int, date: datetime.datetime, guild_id: int,
+         reason: str = None) -> tuple[int, list[str]]:
     """
     Insert ban into db.
     :param _c: Database cursor (provided by decorator)
@@ -228,12 +355,14 @@ def warn(_c: Cursor, user_id: int, mod_id: int, date: datetime.datetime, guild_i
     :param date: Date of warn
     :param guild_id: Discord GuildID
     :param reason: Reason for warn
-    :return: None
+    :return: Updated count of warns and dates of the latest warns of the user (newest first)
     """
     # Parse arguments into correct data types for db
     date = date.strftime('%Y-%m-%d %H:%M:%S')
 
-    # Insert into db
+    # Insert into db and update the warn counter of the user in the same transaction
+    _c.execute('BEGIN')
+    count, dates = warn_counter(_c, guild_id, user_id)
     _c.execute('INSERT INTO warns VALUES (:warn_id, :user_id, :mod_id, :reason, :date, :guild_id)',
                {'warn_id': generate_new_id(table='warns', identifier='warn_id'),
                 'user_id': user_id,
@@ -242,6 +371,10 @@ def warn(_c: Cursor, user_id: int, mod_id: int, date: datetime.datetime, guild_i
                 'date': date,
                 'guild_id': guild_id
                 })
+    save_warn_counter(_c, guild_id, user_id, count + 1, [date] + dates)
+    _c.execute('COMMIT')
+
+    return count + 1, [date] + dates
 
 
 @connection
@@ -383,6 +516,17 @@ def ticket(_c: Cursor, main_user_id: int, text_channel_id: int, guild_id: int, v
                 })
 
 
+@connection
+def pool_channel(_c: Cursor, channel_id: int, guild_id: int) -> None:
+    """
+    Insert a channel of the private room pool into db
+    :param _c: Database cursor (provided by decorator)
+    :param channel_id: Discord VoiceChannelID
+    :param guild_id: Discord GuildID
+    """
+    _c.execute('INSERT OR IGNORE INTO pr_pool_channels VALUES (?, ?)', (channel_id, guild_id))
+
+
 @connection
 def ticket_user(_c: Cursor, user_id: int, ticket_id: str, is_mod: bool = False) -> None:
     """
@@ -425,3 +569,27 @@ def waiting_for_reponse(_c: Cursor, user_id: int, channel_id: int, guild_id: int
                 })
 
     return waiting_id
+
+
+@connection
+def autorole_backfill(_c: Cursor, guild_id: int) -> None:
+    """
+    Insert autorole backfill that starts at the first member (replaces a running one)
+    :param _c: Database cursor (provided by decorator)
+    :param guild_id: Discord GuildID
+    """
+    _c.execute('INSERT OR REPLACE INTO autorole_backfills VALUES (?, 0)', (guild_id,))
+
+
+@connection
+def cache_invalidation(_c: Cursor, cache: str, guild_id: int, process_id: int) -> None:
+    """
+    Insert a cache invalidation for the other bot processes
+    :param _c: Database cursor (provided by decorator)
+    :param cache: Name of the cache
+    :param guild_id: Discord GuildID
+    :param process_id: ID of the publishing bot process
+    """
+    date = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    _c.execute('INSERT INTO cache_invalidations (cache, guild_id, date, process_id) VALUES (?, ?, ?, ?)',
+               (cache, guild_id, date, process_id))
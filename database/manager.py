@@ -1,6 +1,10 @@
 import sqlite3
 import os
+import tempfile
 from sqlite3.dbapi2 import Connection, Cursor
+from time import perf_counter
+
+from utilities import metrics
 
 
 # Database errors
@@ -71,15 +75,157 @@ class DatabaseEntryError(DatabaseError):
         super().__init__(error_message, *args, **kwargs)
 
 
+# Path of the db file (benchmarks point it to a scratch db)
+database_path = './database/bot.db'
+
+# Columns that were added to the tables of existing dbs by name of the table (added by migrate)
+_added_columns: dict[str, list[tuple[str, str]]] = {
+    'guild_settings': [('pr_pool_size', 'INTEGER DEFAULT 0'), ('warn_mute_threshold', 'INTEGER DEFAULT 3'),
+                       ('warn_kick_threshold', 'INTEGER DEFAULT 4'), ('automod', 'INTEGER DEFAULT 0'),
+                       ('welcome_cards', 'INTEGER DEFAULT 0')],
+    'cache_invalidations': [('process_id', 'INTEGER')],
+}
+
+# Statements of the tables that were added to existing dbs (run by _create_tables and migrate)
+_added_tables: dict[str, str] = {
+    'warn_counters': '''CREATE TABLE IF NOT EXISTS warn_counters (
+                    guild_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    latest_dates TEXT NOT NULL,
+                    PRIMARY KEY (guild_id, user_id),
+                    FOREIGN KEY (guild_id)
+                        REFERENCES guilds (guild_id)
+                    )''',
+    'autorole_backfills': '''CREATE TABLE IF NOT EXISTS autorole_backfills (
+                        guild_id INTEGER PRIMARY KEY,
+                        last_member_id INTEGER NOT NULL,
+                        FOREIGN KEY (guild_id)
+                            REFERENCES guilds (guild_id)
+                        )''',
+    'pr_pool_channels': '''CREATE TABLE IF NOT EXISTS pr_pool_channels (
+                        channel_id INTEGER PRIMARY KEY,
+                        guild_id INTEGER NOT NULL,
+                        FOREIGN KEY (guild_id)
+                            REFERENCES guilds (guild_id)
+                        )''',
+    'cache_invalidations': '''CREATE TABLE IF NOT EXISTS cache_invalidations (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        cache TEXT NOT NULL,
+                        guild_id INTEGER NOT NULL,
+                        date TEXT NOT NULL,
+                        process_id INTEGER
+                        )''',
+    'ban_history': '''CREATE TABLE IF NOT EXISTS ban_history (
+                    ban_id TEXT PRIMARY KEY,
+                    temp INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    mod_id INTEGER NOT NULL,
+                    reason TEXT,
+                    date DATE NOT NULL,
+                    until_date DATE,
+                    guild_id INTEGER NOT NULL,
+                    FOREIGN KEY (guild_id)
+                        REFERENCES guilds (guild_id)
+                    )''',
+    'mute_history': '''CREATE TABLE IF NOT EXISTS mute_history (
+                    mute_id TEXT PRIMARY KEY,
+                    temp INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    mod_id INTEGER NOT NULL,
+                    reason TEXT,
+                    date DATE NOT NULL,
+                    until_date DATE,
+                    guild_id INTEGER NOT NULL,
+                    FOREIGN KEY (guild_id)
+                        REFERENCES guilds (guild_id)
+                    )''',
+}
+
+# Statements that copy the existing entries into added tables (run by migrate, entries that exist are skipped)
+_copied_entries: list[str] = [
+    'INSERT OR IGNORE INTO ban_history SELECT ban_id, temp, user_id, mod_id, reason, date, until_date, guild_id '
+    'FROM bans',
+    'INSERT OR IGNORE INTO mute_history SELECT mute_id, temp, user_id, mod_id, reason, date, until_date, guild_id '
+    'FROM mutes',
+]
+
+# Statements of the indexes by name (run by _create_tables and migrate)
+_indexes: dict[str, str] = {
+    'bans_of_user': 'CREATE INDEX IF NOT EXISTS bans_of_user ON bans (guild_id, user_id, date, ban_id)',
+    'mutes_of_user': 'CREATE INDEX IF NOT EXISTS mutes_of_user ON mutes (guild_id, user_id, date, mute_id)',
+    'warns_of_user': 'CREATE INDEX IF NOT EXISTS warns_of_user ON warns (guild_id, user_id, date, warn_id)',
+    'reports_of_user': 'CREATE INDEX IF NOT EXISTS reports_of_user ON reports (guild_id, user_id, date, report_id)',
+    'ban_history_of_user': 'CREATE INDEX IF NOT EXISTS ban_history_of_user ON ban_history '
+                           '(guild_id, user_id, date, ban_id)',
+    'mute_history_of_user': 'CREATE INDEX IF NOT EXISTS mute_history_of_user ON mute_history '
+                            '(guild_id, user_id, date, mute_id)',
+}
+
+# Count of warn dates kept per user in warn_counters (limits the escalation thresholds)
+latest_warn_dates = 10
+
+
+def warn_counter(c: Cursor, guild_id: int, user_id: int) -> tuple[int, list[str]]:
+    """
+    Read the warn counter of a user. The counter is created out of the warns if it doesn't exist yet.
+    :param c: Database cursor of the caller
+    :param guild_id: Discord GuildID
+    :param user_id: Discord UserID
+    :return: Count of warns and dates of the latest warns (newest first)
+    """
+    c.execute('SELECT count, latest_dates FROM warn_counters WHERE guild_id==? AND user_id==?', (guild_id, user_id))
+    entry = c.fetchone()
+
+    if entry:
+        return entry[0], entry[1].split(',') if entry[1] else []
+
+    # Count the existing warns of the user once
+    c.execute('SELECT COUNT(*) FROM warns WHERE guild_id==? AND user_id==?', (guild_id, user_id))
+    count = c.fetchone()[0]
+    dates = latest_warns(c, guild_id, user_id)
+
+    save_warn_counter(c, guild_id, user_id, count, dates)
+    return count, dates
+
+
+def latest_warns(c: Cursor, guild_id: int, user_id: int) -> list[str]:
+    """
+    Read the dates of the latest warns of a user out of the warns
+    :param c: Database cursor of the caller
+    :param guild_id: Discord GuildID
+    :param user_id: Discord UserID
+    :return: Dates of the latest warns (newest first)
+    """
+    c.execute('SELECT date FROM warns WHERE guild_id==? AND user_id==? ORDER BY date DESC LIMIT ?',
+              (guild_id, user_id, latest_warn_dates))
+    return [entry[0] for entry in c.fetchall()]
+
+
+def save_warn_counter(c: Cursor, guild_id: int, user_id: int, count: int, dates: list[str]) -> None:
+    """
+    Write the warn counter of a user
+    :param c: Database cursor of the caller
+    :param guild_id: Discord GuildID
+    :param user_id: Discord UserID
+    :param count: Count of warns
+    :param dates: Dates of the latest warns (newest first)
+    """
+    c.execute('INSERT OR REPLACE INTO warn_counters VALUES (?, ?, ?, ?)',
+              (guild_id, user_id, max(count, 0), ','.join(dates[:latest_warn_dates])))
+
+
 # Database functions for internal use
 def _delete_database() -> None:
     """
     Deletes the db (only for test purpose)
     """
     # Path of db file
-    path = './database/bot.db'
-    # Double check to not delete the wrong file
-    if path.endswith('database/bot.db'):
+    path = os.path.realpath(database_path)
+    temp_directory = os.path.realpath(tempfile.gettempdir())
+    # Double check to not delete the wrong file (only the bot's database or one of the benchmarks)
+    if path.endswith(os.path.join('database', 'bot.db')) or \
+            os.path.commonpath([path, temp_directory]) == temp_directory:
         # Try to delete file
         try:
             os.remove(path)
@@ -96,9 +242,11 @@ def connection(func) -> Callable:
 
     def inner(*args, **kwargs):
         """Calls the function with db connection"""
+        start = perf_counter()
+
         # Setup db connection
         _conn: Connection = sqlite3.connect(
-            './database/bot.db', isolation_level=None)
+            database_path, isolation_level=None)
 
         # Create cursor to execute statements
         _c: Cursor = _conn.cursor()
@@ -111,11 +259,64 @@ def connection(func) -> Callable:
             print('SQLite error', error)
         finally:
             _conn.close()
+            metrics.query_latency.observe(perf_counter() - start, inner.query_name)
         return return_value
 
+    # Label of the function in the query metrics (functions created by factories name their table)
+    inner.query_name = f'{func.__module__.rsplit(".", 1)[-1]}.{func.__name__}'
+    # Let inspect find the parameters of the function (the cursor is the first one)
+    inner.__wrapped__ = func
     return inner
 
 
+@connection
+def enable_wal(c: Cursor) -> None:
+    """
+    Let multiple bot processes read the db while another one writes (the mode is stored in the db file)
+    :param c: Database cursor (provided by decorator)
+    """
+    c.execute('PRAGMA journal_mode=WAL')
+
+
+def migrate() -> None:
+    """
+    Add the tables, columns and indexes that are missing in a db of an older version (safe to run on every start)
+    """
+    # A db that doesn't exist yet is set up by _create_tables
+    if os.path.exists(database_path):
+        _migrate()
+
+
+@connection
+def _migrate(c: Cursor) -> None:
+    """
+    Bring an existing db up to date
+    :param c: Database cursor (provided by decorator)
+    """
+    c.execute('BEGIN IMMEDIATE')
+
+    # Create missing tables
+    for statement in _added_tables.values():
+        c.execute(statement)
+
+    # Add missing columns (existing entries get the default)
+    for table, columns in _added_columns.items():
+        c.execute(f'PRAGMA table_info({table})')
+        existing_columns = {entry[1] for entry in c.fetchall()}
+
+        for column, definition in columns:
+            if column not in existing_columns:
+                c.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+    # Create missing indexes
+    for statement in _indexes.values():
+        c.execute(statement)
+
+    # Fill the added tables
+    for statement in _copied_entries:
+        c.execute(statement)
+
+
 @connection
 def _create_tables(c: Cursor) -> None:
     """
@@ -161,6 +362,11 @@ def _create_tables(c: Cursor) -> None:
     ATTRIBUTE: pr_privacy             # 0 or 1
     ATTRIBUTE: pr_limit               # 0 or 1
     ATTRIBUTE: pr_visibility          # 0 or 1
+    ATTRIBUTE: pr_pool_size           # Count of pre-created private room channels
+    ATTRIBUTE: warn_mute_threshold    # Count of warns within a week that mute
+    ATTRIBUTE: warn_kick_threshold    # Count of warns within a month that kick
+    ATTRIBUTE: automod                # 0 or 1
+    ATTRIBUTE: welcome_cards          # 0 or 1
     FOREIGN KEY: guild_id  (guilds)
     '''
     c.execute('''CREATE TABLE guild_settings (
@@ -176,6 +382,11 @@ def _create_tables(c: Cursor) -> None:
                     pr_privacy INTEGER,
                     pr_limit INTEGER,
                     pr_visibility INTEGER,
+                    pr_pool_size INTEGER,
+                    warn_mute_threshold INTEGER,
+                    warn_kick_threshold INTEGER,
+                    automod INTEGER,
+                    welcome_cards INTEGER,
                     guild_id INTEGER NOT NULL,
                     FOREIGN KEY(guild_id) 
                         REFERENCES guilds (guild_id)
@@ -219,6 +430,17 @@ def _create_tables(c: Cursor) -> None:
                         REFERENCES guilds (guild_id)
                     )''')
 
+    c.execute(_indexes['bans_of_user'])
+
+    '''
+    TABLE: ban_history                   # Every ban (bans only keeps the active one of a user)
+    PRIMARY KEY: ban_id                  # Same ID as the entry in bans
+    ATTRIBUTE: temp, user_id, mod_id, reason, date, until_date like in bans
+    FOREIGN KEY: guild_id  (guilds)
+    '''
+    c.execute(_added_tables['ban_history'])
+    c.execute(_indexes['ban_history_of_user'])
+
     '''
     TABLE: mutes
     PRIMARY KEY: mute_id
@@ -243,6 +465,17 @@ def _create_tables(c: Cursor) -> None:
                         REFERENCES guilds (guild_id)
                     )''')
 
+    c.execute(_indexes['mutes_of_user'])
+
+    '''
+    TABLE: mute_history                  # Every mute (mutes only keeps the active one of a user)
+    PRIMARY KEY: mute_id                 # Same ID as the entry in mutes
+    ATTRIBUTE: temp, user_id, mod_id, reason, date, until_date like in mutes
+    FOREIGN KEY: guild_id  (guilds)
+    '''
+    c.execute(_added_tables['mute_history'])
+    c.execute(_indexes['mute_history_of_user'])
+
     '''
     TABLE: warns
     PRIMARY KEY: warn_id
@@ -263,6 +496,17 @@ def _create_tables(c: Cursor) -> None:
                         REFERENCES guilds (guild_id)
                     )''')
 
+    c.execute(_indexes['warns_of_user'])
+
+    '''
+    TABLE: warn_counters
+    PRIMARY KEY: guild_id, user_id
+    ATTRIBUTE: count                     # Count of active warns
+    ATTRIBUTE: latest_dates              # Dates of the latest warns separated by commas (newest first)
+    FOREIGN KEY: guild_id  (guilds)
+    '''
+    c.execute(_added_tables['warn_counters'])
+
     '''
     TABLE: reports
     PRIMARY KEY: report_id
@@ -283,6 +527,8 @@ def _create_tables(c: Cursor) -> None:
                         REFERENCES guilds (guild_id)
                     )''')
 
+    c.execute(_indexes['reports_of_user'])
+
     '''
     TABLE: private_rooms                 # Create Private Room voice channels
     PRIMARY KEY: room_id
@@ -346,6 +592,13 @@ def _create_tables(c: Cursor) -> None:
                             REFERENCES guilds (guild_id)
                         )''')
 
+    '''
+    TABLE: pr_pool_channels              # Hidden voice channels that wait in the private room pool
+    PRIMARY KEY: channel_id              # Discord VoiceChannelID
+    FOREIGN KEY: guild_id  (guilds)
+    '''
+    c.execute(_added_tables['pr_pool_channels'])
+
     '''
     TABLE: tickets                       # Support ticket
     PRIMARY KEY: ticket_id               # AUTOINCREMENT
@@ -397,3 +650,21 @@ def _create_tables(c: Cursor) -> None:
                         FOREIGN KEY (guild_id)
                             REFERENCES guilds (guild_id)
                         )''')
+
+    '''
+    TABLE: autorole_backfills           # Assign the autoroles to the members that joined before
+    PRIMARY KEY: guild_id
+    ATTRIBUTE: last_member_id           # Discord UserID of the last member that was processed
+    FOREIGN KEY: guild_id  (guilds)
+    '''
+    c.execute(_added_tables['autorole_backfills'])
+
+    '''
+    TABLE: cache_invalidations          # Changes other bot processes have to drop from their caches
+    PRIMARY KEY: id                     # Increasing, so every process reads the entries after the last one it knows
+    ATTRIBUTE: cache                    # Name of the cache
+    ATTRIBUTE: guild_id                 # Discord GuildID
+    ATTRIBUTE: date
+    ATTRIBUTE: process_id               # ID of the bot process that published it (skips its own entries)
+    '''
+    c.execute(_added_tables['cache_invalidations'])
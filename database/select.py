@@ -1,6 +1,6 @@
 from typing import Any, Callable
 
-from database.manager import connection, DatabaseEntryError, DatabaseError
+from database.manager import connection, DatabaseEntryError, DatabaseError, warn_counter
 from sqlite3.dbapi2 import Cursor
 from datetime import datetime
 from utilities import util
@@ -60,6 +60,7 @@ def _select_by_guild_id_factory(table: str, attribute: str, all_entries: bool =
         return value
 
     # Return closure
+    _select_by_guild_id.query_name = f'select.{table}.{attribute}'
     return _select_by_guild_id
 
 
@@ -78,8 +79,7 @@ def _fetch_mod_operation_entry(_c: Cursor, table: str, guild_id: int = None, use
     """
     if operation_id:
         # Fetch entry by operation_id out of database
-        _c.execute("SELECT * FROM {} WHERE {}=={} LIMIT 1".format(table,
-                   id_identifier, operation_id))
+        _c.execute("SELECT * FROM {} WHERE {}==? LIMIT 1".format(table, id_identifier), (operation_id,))
         entry = _c.fetchone()
         # Check if there was a operation on the user
         if not entry:
@@ -134,6 +134,9 @@ pr_change_limit = _select_by_guild_id_factory(
 pr_change_visibility = _select_by_guild_id_factory(
     table='guild_settings', attribute='pr_visibility')
 
+pr_pool_size = _select_by_guild_id_factory(
+    table='guild_settings', attribute='pr_pool_size')
+
 default_pr_name = _select_by_guild_id_factory(
     table='default_pr_settings', attribute='name')
 
@@ -178,6 +181,12 @@ welcome_dms = _select_by_guild_id_factory(
 welcome_dm = _select_by_guild_id_factory(
     table='guild_settings', attribute='welcome_dm')
 
+welcome_cards = _select_by_guild_id_factory(
+    table='guild_settings', attribute='welcome_cards')
+
+automod = _select_by_guild_id_factory(
+    table='guild_settings', attribute='automod')
+
 moderator_roles = _select_by_guild_id_factory(
     table='roles', attribute='role_id', all_entries=True, type='MODERATOR')
 
@@ -191,6 +200,89 @@ auto_roles = _select_by_guild_id_factory(
     table='roles', attribute='role_id', all_entries=True, type='AUTOROLE')
 
 
+@connection
+def help_settings(_c: Cursor, guild_id: int) -> tuple:
+    """
+    Get the settings the help of a guild depends on in a single query
+    :param _c: Database cursor (provided by decorator)
+    :param guild_id: ID of the guild
+    :return: Tuple of prefix, color, mod_log_id, cpr_channel_id and pr_settings_id
+    :raises DatabaseEntryError: If couldn't find the entry
+    """
+    _c.execute("""SELECT s.prefix, s.color, g.mod_log_id, g.cpr_channel_id, g.pr_settings_id
+                  FROM guild_settings s JOIN guilds g ON s.guild_id == g.guild_id
+                  WHERE s.guild_id==? LIMIT 1""", (guild_id,))
+    entry = _c.fetchone()
+
+    if not entry:
+        raise DatabaseEntryError('guild_settings', 'guild_id', guild_id)
+
+    return entry
+
+
+# Columns of the setup snapshot of a guild
+setup_snapshot_columns = ('welcome_channel_id', 'cpr_channel_id', 'mod_log_id', 'prefix', 'color', 'welcome_messages',
+                          'leave_messages', 'welcome_dms', 'welcome_dm', 'welcome_cards', 'pr_text_channel', 'pr_name',
+                          'pr_privacy', 'pr_limit', 'pr_visibility', 'pr_pool_size', 'warn_mute_threshold',
+                          'warn_kick_threshold', 'automod', 'default_pr_name', 'default_pr_game_activity',
+                          'default_pr_locked', 'default_pr_user_limit', 'default_pr_hidden', 'roles')
+
+
+@connection
+def setup_snapshot(_c: Cursor, guild_id: int) -> dict:
+    """
+    Get everything the setup pages of a guild show in a single query
+    :param _c: Database cursor (provided by decorator)
+    :param guild_id: ID of the guild
+    :return: Dict of setup_snapshot_columns and values. 'roles' are pairs of role_ids and types.
+    :raises DatabaseEntryError: If couldn't find the entry
+    """
+    _c.execute("""SELECT g.welcome_channel_id, g.cpr_channel_id, g.mod_log_id, s.prefix, s.color, s.welcome_messages,
+                         s.leave_messages, s.welcome_dms, s.welcome_dm, s.welcome_cards, s.pr_text_channel, s.pr_name,
+                         s.pr_privacy, s.pr_limit, s.pr_visibility, s.pr_pool_size, s.warn_mute_threshold,
+                         s.warn_kick_threshold, s.automod, d.name, d.game_activity, d.locked, d.user_limit, d.hidden,
+                         (SELECT group_concat(r.role_id || ':' || r.type) FROM roles r WHERE r.guild_id == g.guild_id)
+                  FROM guilds g JOIN guild_settings s ON s.guild_id == g.guild_id
+                  LEFT JOIN default_pr_settings d ON d.guild_id == g.guild_id
+                  WHERE g.guild_id==? LIMIT 1""", (guild_id,))
+    entry = _c.fetchone()
+
+    if not entry:
+        raise DatabaseEntryError('guilds', 'guild_id', guild_id)
+
+    snapshot = dict(zip(setup_snapshot_columns, entry))
+
+    # Split the roles into pairs of role_ids and types
+    roles = snapshot['roles'].split(',') if snapshot['roles'] else []
+    snapshot['roles'] = [(int(role_id), type_) for role_id, type_ in (role.split(':') for role in roles)]
+
+    return snapshot
+
+
+@connection
+def roles_of_guild(_c: Cursor, guild_id: int) -> list[tuple[int, str]]:
+    """
+    Get all roles of a guild with their type in a single query
+    :param _c: Database cursor (provided by decorator)
+    :param guild_id: ID of the guild
+    :return: List of pairs of role_ids and types
+    """
+    _c.execute("SELECT role_id, type FROM roles WHERE guild_id==?", (guild_id,))
+    return _c.fetchall()
+
+
+@connection
+def pool_channels(_c: Cursor, guild_id: int) -> list[int]:
+    """
+    Get the channels of the private room pool of a guild
+    :param _c: Database cursor (provided by decorator)
+    :param guild_id: ID of the guild
+    :return: List of channel_ids
+    """
+    _c.execute("SELECT channel_id FROM pr_pool_channels WHERE guild_id==?", (guild_id,))
+    return [entry[0] for entry in _c.fetchall()]
+
+
 def _select_all_factory(table: str, attributes: list) -> Callable[[Cursor], list]:
     @connection
     def inner(_c: Cursor) -> list:
@@ -219,6 +311,7 @@ def _select_all_factory(table: str, attributes: list) -> Callable[[Cursor], list
 
         return entries
 
+    inner.query_name = f'select.{table}.{"+".join(attributes)}'
     return inner
 
 
@@ -251,6 +344,9 @@ all_pr_text_channels = _select_all_factory(
 all_waiting_for_response = _select_all_factory(
     'waiting_for_responses', ['user_id', 'channel_id'])
 
+all_autorole_backfills = _select_all_factory(
+    'autorole_backfills', ['guild_id', 'last_member_id'])
+
 
 class Ban:
     """
@@ -482,11 +578,35 @@ def count_warns(_c: Cursor, user_id: int, guild_id: int) -> int:
     :param user_id: Discord UserID
     :param guild_id: Discord GuildID
     """
-    # Fetch count
-    _c.execute(
-        """SELECT COUNT(*) FROM warns WHERE guild_id==? AND user_id==?""", (guild_id, user_id))
+    # Read count out of the warn counter
+    return warn_counter(_c, guild_id, user_id)[0]
 
-    return _c.fetchone()[0]
+
+@connection
+def latest_warn_dates(_c: Cursor, user_id: int, guild_id: int) -> list[datetime]:
+    """
+    Get the dates of the latest warns of user on a guild out of the warn counter
+    :param _c: Database cursor (provided by decorator)
+    :param user_id: Discord UserID
+    :param guild_id: Discord GuildID
+    :return: Dates of the latest warns (newest first)
+    """
+    return [util.iso_to_datetime(date) for date in warn_counter(_c, guild_id, user_id)[1]]
+
+
+@connection
+def warn_thresholds(_c: Cursor, guild_id: int) -> tuple[int, int]:
+    """
+    Get the warn counts that escalate warns on a guild
+    :param _c: Database cursor (provided by decorator)
+    :param guild_id: Discord GuildID
+    :return: Count of warns within a week that mute and count of warns within a month that kick
+    """
+    _c.execute('SELECT warn_mute_threshold, warn_kick_threshold FROM guild_settings WHERE guild_id==? LIMIT 1',
+               (guild_id,))
+    entry = _c.fetchone() or (None, None)
+
+    return entry[0] or 3, entry[1] or 4
 
 
 @connection
@@ -632,6 +752,68 @@ def reports_of_user(_c: Cursor, user_id: int, guild_id: int, limit: int = 5) ->
     return reports
 
 
+# Columns of the mod operations in the history: ID, ID of the user who executed it, reason, date and until date
+_history_columns = {
+    'warns': ('warn_id', 'mod_id', 'reason', 'date', 'NULL'),
+    'reports': ('report_id', 'reporter_id', 'reason', 'date', 'NULL'),
+    'mutes': ('mute_id', 'mod_id', 'reason', 'date', 'until_date'),
+    'bans': ('ban_id', 'mod_id', 'reason', 'date', 'until_date')
+}
+
+# Tables that keep every mod operation (mutes and bans only keep the active one of a user)
+_history_tables = {
+    'warns': 'warns',
+    'reports': 'reports',
+    'mutes': 'mute_history',
+    'bans': 'ban_history'
+}
+
+
+@connection
+def mod_operations_page(_c: Cursor, table: str, user_id: int, guild_id: int, limit: int = 5,
+                        after: tuple[str, str] = None) -> list[tuple]:
+    """
+    Selects a page of the mod operations of user_id on guild_id (newest first). A page continues after the date and ID
+    of the last entry of the previous page, so deep pages cost the same as the first one.
+    :param _c: Database cursor (provided by decorator)
+    :param table: Table of the mod operations ('warns', 'reports', 'mutes' or 'bans')
+    :param user_id: Discord UserID
+    :param guild_id: Discord GuildID
+    :param limit: Count of entries on the page
+    :param after: Date and ID of the last entry of the previous page
+    :return: List of (ID, moderator ID, reason, date, until date) tuples
+    """
+    columns = _history_columns[table]
+    statement = 'SELECT {} FROM {} WHERE guild_id==? AND user_id==?'.format(', '.join(columns),
+                                                                            _history_tables[table])
+    parameters = [guild_id, user_id]
+
+    if after:
+        # Continue after the last entry of the previous page
+        statement += ' AND (date, {}) < (?, ?)'.format(columns[0])
+        parameters += after
+
+    _c.execute(statement + ' ORDER BY date DESC, {} DESC LIMIT ?'.format(columns[0]), (*parameters, limit))
+
+    return _c.fetchall()
+
+
+@connection
+def count_mod_operations(_c: Cursor, table: str, user_id: int, guild_id: int) -> int:
+    """
+    Counts the mod operations of user on a guild
+    :param _c: Database cursor (provided by decorator)
+    :param table: Table of the mod operations ('warns', 'reports', 'mutes' or 'bans')
+    :param user_id: Discord UserID
+    :param guild_id: Discord GuildID
+    """
+    # Fetch count
+    _c.execute('SELECT COUNT(*) FROM {} WHERE guild_id==? AND user_id==?'.format(_history_tables[table]),
+               (guild_id, user_id))
+
+    return _c.fetchone()[0]
+
+
 class PrivateRoom:
     """
     Represents private room.
@@ -852,7 +1034,7 @@ class Ticket:
         @connection
         def execution(_c: Cursor):
             _c.execute("SELECT user_id FROM ticket_users WHERE ticket_id==? AND is_mod==0", (
-                self.ticket_id))
+                self.ticket_id,))
             return _c.fetchall()
 
         self._user_ids = list(map(lambda x: x[0], execution()))
@@ -861,7 +1043,7 @@ class Ticket:
         @connection
         def execution(_c: Cursor):
             _c.execute("SELECT user_id FROM ticket_users WHERE ticket_id==? AND is_mod==1", (
-                self.ticket_id))
+                self.ticket_id,))
             return _c.fetchall()
 
         self._mod_ids = list(map(lambda x: x[0], execution()))
@@ -936,3 +1118,39 @@ class WaitingResponse:
     channel_id = property(lambda self: self._channel_id)
     response = property(lambda self: self._response)
     guild_id = property(lambda self: self._guild_id)
+
+
+@connection
+def cache_invalidations(_c: Cursor, after_id: int) -> list[tuple[int, str, int, int]]:
+    """
+    Get the cache invalidations inserted after an entry
+    :param _c: Database cursor (provided by decorator)
+    :param after_id: ID of the last cache invalidation that is known
+    :return: List of IDs, names of the caches, guild_ids and IDs of the publishing processes ordered by ID
+    """
+    _c.execute('SELECT id, cache, guild_id, process_id FROM cache_invalidations WHERE id > ? ORDER BY id',
+               (after_id,))
+    return _c.fetchall()
+
+
+@connection
+def last_cache_invalidation(_c: Cursor) -> int:
+    """
+    Get the ID of the latest cache invalidation
+    :param _c: Database cursor (provided by decorator)
+    :return: ID of the latest cache invalidation or 0 if there is none
+    """
+    _c.execute('SELECT MAX(id) FROM cache_invalidations')
+    return _c.fetchone()[0] or 0
+
+
+@connection
+def pending_expiries(_c: Cursor, table: str) -> list[tuple[int, int]]:
+    """
+    Count the temporary mutes or bans of every guild
+    :param _c: Database cursor (provided by decorator)
+    :param table: 'mutes' or 'bans'
+    :return: List of guild_ids and counts
+    """
+    _c.execute(f'SELECT guild_id, COUNT(*) FROM {table} WHERE temp==1 GROUP BY guild_id')
+    return _c.fetchall()
@@ -33,6 +33,7 @@ def _update_by_keyword_factory(table: str, attribute: str, keyword: str) -> Call
             _c.execute(
                 f"UPDATE {table} SET {attribute}=NULL WHERE {keyword}==?", (argument,))
 
+    update_by_keyword_id.query_name = f'update.{table}.{attribute}'
     return update_by_keyword_id
 
 
@@ -75,6 +76,9 @@ leave_messages = _update_by_keyword_factory(
 welcome_dms = _update_by_keyword_factory(
     table='guild_settings', attribute='welcome_dms', keyword='guild_id')
 
+welcome_cards = _update_by_keyword_factory(
+    table='guild_settings', attribute='welcome_cards', keyword='guild_id')
+
 welcome_dm = _update_by_keyword_factory(
     table='guild_settings', attribute='welcome_dm', keyword='guild_id')
 
@@ -93,6 +97,21 @@ pr_change_limit = _update_by_keyword_factory(
 pr_change_visibility = _update_by_keyword_factory(
     table='guild_settings', attribute='pr_visibility', keyword='guild_id')
 
+pr_pool_size = _update_by_keyword_factory(
+    table='guild_settings', attribute='pr_pool_size', keyword='guild_id')
+
+warn_mute_threshold = _update_by_keyword_factory(
+    table='guild_settings', attribute='warn_mute_threshold', keyword='guild_id')
+
+warn_kick_threshold = _update_by_keyword_factory(
+    table='guild_settings', attribute='warn_kick_threshold', keyword='guild_id')
+
+automod = _update_by_keyword_factory(
+    table='guild_settings', attribute='automod', keyword='guild_id')
+
+autorole_backfill = _update_by_keyword_factory(
+    table='autorole_backfills', attribute='last_member_id', keyword='guild_id')
+
 pr_owner_id = _update_by_keyword_factory(
     table='private_rooms', attribute='owner_id', keyword='room_id')
 
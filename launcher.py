@@ -0,0 +1,93 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from database import manager
+from system import coordination
+from utilities import metrics
+
+# Seconds to wait before a crashed bot process is started again
+restart_delay = 5
+
+# Directory of the bot (bot.py and the database are found relative to it)
+root = os.path.dirname(os.path.abspath(__file__))
+
+
+def shard_ranges(processes: int, shards: int) -> list[list[int]]:
+    """
+    Split the shards into consecutive ranges, one for every process
+    :param processes: Count of bot processes
+    :param shards: Total count of shards
+    :return: IDs of the shards of every process
+    """
+    return [list(range(i * shards // processes, (i + 1) * shards // processes)) for i in range(processes)]
+
+
+def start(index: int, shard_ids: list[int], shard_count: int, fake: bool) -> subprocess.Popen:
+    """
+    Start a bot process that runs a range of the shards
+    :param index: Number of the process (the metrics of every process are served on their own port)
+    :param shard_ids: IDs of the shards of the process
+    :param shard_count: Total count of shards
+    :param fake: Whether the process uses the fake gateway instead of Discord
+    :return: The started process
+    """
+    env = dict(os.environ)
+    env[coordination.shard_ids_variable] = ','.join(map(str, shard_ids))
+    env[coordination.shard_count_variable] = str(shard_count)
+    env[metrics.port_variable] = str(metrics.port + index)
+    if fake:
+        env[coordination.fake_gateway_variable] = '1'
+
+    return subprocess.Popen([sys.executable, 'bot.py'], cwd=root, env=env)
+
+
+def main() -> None:
+    """Run the bot processes and restart the ones that crash"""
+    parser = argparse.ArgumentParser(description='Run fryselBot in multiple processes that share the database.')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='count of bot processes')
+    parser.add_argument('--shards', type=int, help='total count of shards (default: one per process)')
+    parser.add_argument('--fake', action='store_true', help='use fake guilds instead of connecting to Discord')
+    args = parser.parse_args()
+
+    shard_count = args.shards or args.processes
+    if not 1 <= args.processes <= shard_count:
+        parser.error('every process needs at least one shard')
+
+    # Let the processes read while another one writes
+    os.chdir(root)
+    manager.enable_wal()
+
+    # Migrate the db once, before the processes use it
+    manager.migrate()
+
+    ranges = shard_ranges(args.processes, shard_count)
+    processes = {index: start(index, shard_ids, shard_count, args.fake) for index, shard_ids in enumerate(ranges)}
+
+    try:
+        while processes:
+            time.sleep(1)
+            for index, process in list(processes.items()):
+                code = process.poll()
+                if code is None:
+                    continue
+
+                if code == 0 or args.fake:
+                    # The process finished
+                    del processes[index]
+                else:
+                    print(f'\033[31mBot process of shards {ranges[index]} exited with {code}, restarting\033[0m')
+                    time.sleep(restart_delay)
+                    processes[index] = start(index, ranges[index], shard_count, args.fake)
+    except KeyboardInterrupt:
+        # Stop all bot processes
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
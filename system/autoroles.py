@@ -0,0 +1,141 @@
+import asyncio
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Optional
+
+from discord import Member, Guild, Client, HTTPException
+
+from database import insert, select, update, delete
+from system import roles
+
+# Seconds between two role assignments on a guild (Discord limits role changes per guild)
+assign_interval = 0.5
+
+# Seconds to wait after hitting the rate limit anyway
+rate_limit_delay = 10
+
+# Count of processed members after which the progress of a backfill is saved
+backfill_checkpoint = 50
+
+# Members waiting for their auto roles by guild ID and member ID (each member is queued once)
+_queues: dict[int, OrderedDict[int, Member]] = {}
+
+# Running backfills by guild ID: sorted IDs of the members and index of the next member
+_backfills: dict[int, tuple[list[int], int]] = {}
+
+# Tasks that assign the auto roles by guild ID
+_workers: dict[int, asyncio.Task] = {}
+
+
+def queue(member: Member) -> None:
+    """
+    Queue the member to get the auto roles. The roles are assigned paced, so join bursts don't hit the rate limit.
+    :param member: Member to add the auto roles to
+    """
+    guild: Guild = member.guild
+    _queues.setdefault(guild.id, OrderedDict())[member.id] = member
+
+    _start_worker(guild)
+
+
+def pending(guild_id: int) -> int:
+    """
+    Count the members waiting for their auto roles
+    :param guild_id: ID of the guild
+    :return: Count of waiting members including the rest of a running backfill
+    """
+    member_ids, index = _backfills.get(guild_id, ((), 0))
+    return len(_queues.get(guild_id, ())) + len(member_ids) - index
+
+
+def start_backfill(guild: Guild, last_member_id: int = 0) -> None:
+    """
+    Assign the auto roles to all members of the guild. The progress is saved, so the backfill continues after a
+    restart.
+    :param guild: Guild to assign the auto roles on
+    :param last_member_id: ID of the last member that was processed before
+    """
+    if not last_member_id:
+        insert.autorole_backfill(guild.id)
+
+    # Members are processed ordered by ID, so the progress is a single ID
+    member_ids = sorted(member.id for member in guild.members if not member.bot)
+    _backfills[guild.id] = (member_ids, bisect_right(member_ids, last_member_id))
+
+    _start_worker(guild)
+
+
+def resume_backfills(client: Client) -> None:
+    """
+    Continue the backfills that were running when the bot stopped
+    :param client: Bot client
+    """
+    for guild_id, last_member_id in select.all_autorole_backfills():
+        guild: Guild = client.get_guild(guild_id)
+        if guild and guild.id not in _backfills:
+            start_backfill(guild, last_member_id)
+
+
+def _start_worker(guild: Guild) -> None:
+    """
+    Start the worker of the guild if it doesn't run yet
+    :param guild: Guild to assign the auto roles on
+    """
+    if guild.id not in _workers:
+        _workers[guild.id] = asyncio.create_task(_worker(guild))
+
+
+def _next_member(guild: Guild) -> Optional[Member]:
+    """
+    Get the next member that gets the auto roles. Joined members are preferred over the backfill.
+    :param guild: Guild to assign the auto roles on
+    :return: The next member or None if there is none
+    """
+    queued = _queues.get(guild.id)
+    if queued:
+        return queued.popitem(last=False)[1]
+
+    while guild.id in _backfills:
+        member_ids, index = _backfills[guild.id]
+
+        if index == len(member_ids):
+            # The backfill is done
+            del _backfills[guild.id]
+            delete.autorole_backfill(guild.id)
+            return None
+
+        _backfills[guild.id] = (member_ids, index + 1)
+        if index and index % backfill_checkpoint == 0:
+            # Save the progress (the worker only asks for the next member once the previous one got the roles)
+            update.autorole_backfill(argument=guild.id, value=member_ids[index - 1])
+
+        member = guild.get_member(member_ids[index])
+        if member:
+            return member
+
+    return None
+
+
+async def _worker(guild: Guild) -> None:
+    """
+    Assign the auto roles to the queued members of a guild until the queue and the backfill are done
+    :param guild: Guild to assign the auto roles on
+    """
+    try:
+        while member := _next_member(guild):
+            auto_roles = [role for role in roles.get_auto_roles(guild) if role and role not in member.roles]
+            if not auto_roles:
+                # Skip members that have the roles already
+                continue
+
+            try:
+                await member.add_roles(*auto_roles, reason='Autorole')
+            except HTTPException as error:
+                if error.status == 429:
+                    await asyncio.sleep(rate_limit_delay)
+
+            await asyncio.sleep(assign_interval)
+    finally:
+        del _workers[guild.id]
+        if not _queues.get(guild.id):
+            _queues.pop(guild.id, None)
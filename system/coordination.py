@@ -0,0 +1,135 @@
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+from database import insert, select, delete
+
+# Environment variables that configure the shards of a bot process (set by launcher.py)
+shard_ids_variable = 'FRYSEL_SHARD_IDS'
+shard_count_variable = 'FRYSEL_SHARD_COUNT'
+fake_gateway_variable = 'FRYSEL_FAKE_GATEWAY'
+
+# Seconds between two reads of the cache invalidations of the other processes
+poll_interval = 2
+
+# Cache invalidations are kept this long, so processes that were busy can still read them
+invalidation_lifetime = timedelta(hours=1)
+
+# Total count of shards (None if the bot isn't sharded)
+shard_count: Optional[int] = int(os.environ[shard_count_variable]) if os.environ.get(shard_count_variable) else None
+
+# Shards run by this process (all shards if only the count is set)
+shard_ids: Optional[list[int]] = None
+if shard_count:
+    shard_ids = [int(shard_id) for shard_id in os.environ.get(shard_ids_variable, '').split(',') if shard_id] \
+                or list(range(shard_count))
+
+# Whether the process is fed by utilities/fake_gateway.py instead of Discord
+fake_gateway = os.environ.get(fake_gateway_variable) == '1'
+
+# ID of this bot process within the cache invalidations (its own invalidations are already applied locally)
+process_id = os.getpid()
+
+# Functions that drop the entry of a guild from a local cache by name of the cache
+_handlers: dict[str, Callable[[int], None]] = {}
+
+# ID of the latest cache invalidation that was applied (None until the first sync)
+_last_invalidation: Optional[int] = None
+
+# Time the old cache invalidations were deleted the last time
+_pruned = datetime.min
+
+
+def shard_of(guild_id: int, count: int = None) -> int:
+    """
+    Get the shard Discord sends the events of a guild to
+    :param guild_id: ID of the guild
+    :param count: Total count of shards (shard_count if not given)
+    :return: ID of the shard
+    """
+    return (guild_id >> 22) % (count or shard_count or 1)
+
+
+def owns(guild_id: int) -> bool:
+    """
+    Check whether the guild is run by this process. Background jobs only handle the guilds of their own process.
+    :param guild_id: ID of the guild
+    :return: Whether a shard of this process receives the events of the guild
+    """
+    return shard_count is None or shard_of(guild_id) in shard_ids
+
+
+def owned(entries: Iterable[tuple]) -> list[tuple]:
+    """
+    Filter entries of the database by the guilds run by this process
+    :param entries: Tuples of an ID and a guild_id like the ones of select.all_* functions
+    :return: The entries of guilds run by this process
+    """
+    return [entry for entry in entries if owns(entry[1])]
+
+
+def is_primary() -> bool:
+    """
+    Check whether this process runs the jobs that affect the whole database (e.g. deleting old warns)
+    :return: Whether this process runs shard 0
+    """
+    return shard_count is None or 0 in shard_ids
+
+
+def runs_all_shards() -> bool:
+    """
+    Check whether this process is the only bot process, so caches don't have to be invalidated in other processes
+    :return: Whether the process runs all shards
+    """
+    return shard_count is None or len(set(shard_ids)) == shard_count
+
+
+def register(cache: str, handler: Callable[[int], None]) -> None:
+    """
+    Register a local cache, so changes of other processes drop its entries
+    :param cache: Name of the cache
+    :param handler: Function that drops the entry of a guild from the cache (without publishing it again)
+    """
+    _handlers[cache] = handler
+
+
+def publish(cache: str, guild_id: int) -> None:
+    """
+    Tell the other bot processes to drop the entry of a guild from a cache. The local cache has to be updated by the
+    caller.
+    :param cache: Name of the cache
+    :param guild_id: ID of the guild
+    """
+    if not runs_all_shards():
+        insert.cache_invalidation(cache, guild_id, process_id)
+
+
+def sync() -> int:
+    """
+    Apply the cache invalidations the other bot processes published since the last sync
+    :return: Count of applied cache invalidations
+    """
+    global _last_invalidation, _pruned
+
+    if _last_invalidation is None:
+        # Caches are empty on start, so older invalidations don't matter
+        _last_invalidation = select.last_cache_invalidation()
+        return 0
+
+    applied = 0
+    for invalidation_id, cache, guild_id, publisher_id in select.cache_invalidations(_last_invalidation):
+        _last_invalidation = invalidation_id
+
+        # The caches of this process were updated when it published the invalidation
+        handler = _handlers.get(cache)
+        if handler and publisher_id != process_id:
+            handler(guild_id)
+            applied += 1
+
+    # Delete the old invalidations from time to time
+    now = datetime.utcnow()
+    if is_primary() and now - _pruned > invalidation_lifetime:
+        delete.old_cache_invalidations(now - invalidation_lifetime)
+        _pruned = now
+
+    return applied
@@ -1,4 +1,5 @@
 from difflib import SequenceMatcher
+from functools import lru_cache
 from typing import Union, Callable
 
 from discord import Guild
@@ -17,6 +18,7 @@ class Command:
         admin_only     (bool): Whether the command is for admins only
         mod_only       (bool): Whether the command is for moderators only
         in_help        (bool/Callable): Whether the command is in help
+        aliases   (list[str]): Other names of the command
     Attributes:
         name            (str): Name of the command
         syntax          (str): Syntax for calling the command
@@ -25,11 +27,12 @@ class Command:
         admin_only     (bool): Whether the command is for admins only
         mod_only       (bool): Whether the command is for moderators only
         in_help    (Guild -> bool): Whether the command is in help
+        aliases  (tuple[str]): Other names of the command
     """
 
     def __init__(self, name: str, syntax: str, description: str, args_description: dict[str: str] = None,
                  admin_only: bool = False, mod_only: bool = False, support_only: bool = False,
-                 in_help: Union[Callable[[Guild], bool], bool] = True):
+                 in_help: Union[Callable[[Guild], bool], bool] = True, aliases: list[str] = None):
         # Initializing attributes
         self._name = name
         self._syntax = syntax
@@ -38,6 +41,7 @@ class Command:
         self._support_only = support_only
         self._description = description
         self._args_description = args_description
+        self._aliases = tuple(aliases) if aliases else ()
         if type(in_help) == bool:
             self._in_help = lambda x: in_help
         else:
@@ -88,6 +92,7 @@ class Command:
     description = property(lambda self: self._description)
     args_description = property(_get_argument_description)
     in_help = property(lambda self: self._in_help)
+    aliases = property(lambda self: self._aliases)
 
 
 # Description of the bot commands
@@ -99,13 +104,25 @@ commands = [  # User commands
 
     # Moderation commands
     Command('clear', 'clear <amount> (member)', 'Clear messages in the channel.',
-            {'amount': 'Positive integer, at most 100',
+            {'amount': 'Positive integer, at most 10000',
              'member': 'User mention or name'},
             mod_only=True),
+    Command('purge', 'purge <amount> (channels)', 'Clear messages in several channels.',
+            {'amount': 'Positive integer per channel, at most 10000',
+             'channels': 'Text channel mentions or names (this channel if none are given)'},
+            mod_only=True),
     Command('mute', 'mute <member> (reason)', 'Mute a member in the text-channels.',
             {'member': 'User mention or name',
              'reason': 'Any text'},
             mod_only=True),
+    Command('massmute', 'massmute <members> (reason)', 'Mute several members at once.',
+            {'members': 'User mentions or IDs',
+             'reason': 'Any text'},
+            mod_only=True),
+    Command('massmute joined', 'massmute joined <duration> (reason)', 'Mute all members who joined recently.',
+            {'duration': "e.g. *'10 min'* or *'2 h'*",
+             'reason': 'Any text'},
+            mod_only=True),
     Command('tempmute', 'tempmute <member> <duration> (reason)', 'Mute a member temporarily in the text-channels.',
             {'member': 'User mention or name',
              'duration': "e.g. *'5 min'*, *'3 d'*, *'1 week'*, *'6 months'* or *'3 years'*  (5 years maximum)",
@@ -114,13 +131,32 @@ commands = [  # User commands
     Command('unmute', 'unmute <member>', 'Unmute a member on the server.',
             {'member': 'User mention or name', },
             mod_only=True),
+    Command('mutes', 'mutes <member>', 'Browse the mutes of a member.',
+            {'member': 'User mention or name'},
+            mod_only=True),
     Command('kick', 'kick <member> (reason)', 'Kick a member from the server.',
             {'member': 'User mention or name',
              'reason': 'Any text'},
             mod_only=True),
+    Command('masskick', 'masskick <members> (reason)', 'Kick several members at once.',
+            {'members': 'User mentions or IDs',
+             'reason': 'Any text'},
+            mod_only=True),
+    Command('masskick joined', 'masskick joined <duration> (reason)', 'Kick all members who joined recently.',
+            {'duration': "e.g. *'10 min'* or *'2 h'*",
+             'reason': 'Any text'},
+            mod_only=True),
     Command('ban', 'ban <member> (reason)', 'Ban a member on the server.',
             {'member': 'User mention or name',
              'reason': 'Any text'},
+            mod_only=True, aliases=['bigmac']),
+    Command('massban', 'massban <members> (reason)', 'Ban several members at once.',
+            {'members': 'User mentions or IDs',
+             'reason': 'Any text'},
+            mod_only=True),
+    Command('massban joined', 'massban joined <duration> (reason)', 'Ban all members who joined recently.',
+            {'duration': "e.g. *'10 min'* or *'2 h'*",
+             'reason': 'Any text'},
             mod_only=True),
     Command('tempban', 'tempban <member> <duration> (reason)', 'Ban a member temporarily on the server.',
             {'member': 'User mention or name',
@@ -130,18 +166,21 @@ commands = [  # User commands
     Command('unban', 'unban <user>', 'Unban a user on the server.',
             {'user': 'User mention, name or ID'},
             mod_only=True),
+    Command('bans', 'bans <user>', 'Browse the bans of a user.',
+            {'user': 'User mention or ID'},
+            mod_only=True),
     Command('warn', 'warn <member> (reason)', 'Warn a member on the server.',
             {'member': 'User mention or name',
              'reason': 'Any text'},
             mod_only=True),
-    Command('warns', 'warns <member>', 'Get the latest warns of a member.',
+    Command('warns', 'warns <member>', 'Browse the warns of a member.',
             {'member': 'User mention or name'},
             mod_only=True),
     Command('report', 'report <member> <reason>', 'Report a member of the server.',
             {'member': 'User mention or name',
              'reason': 'Any text'},
             in_help=lambda g: moderation.get_mod_log(g) is not None),
-    Command('reports', 'reports <member>', 'Get the latest reports of a member.',
+    Command('reports', 'reports <member>', 'Browse the reports of a member.',
             {'member': 'User mention or name'},
             mod_only=True,
             in_help=lambda g: moderation.get_mod_log(g) is not None),
@@ -154,7 +193,7 @@ commands = [  # User commands
             admin_only=True, in_help=False),
     Command('color', 'setup color <color>', "Set the color of the bot's messages on the server.",
             {'color': 'HEX color code'},
-            admin_only=True, in_help=False),
+            admin_only=True, in_help=False, aliases=['colour']),
     Command('welcome', 'setup welcome', 'Page to set up the welcome system.', admin_only=True, in_help=False),
     Command('welcome channel', 'setup welcome channel <text-channel>',
             'Set the channel for welcome and leave messages.',
@@ -172,42 +211,84 @@ commands = [  # User commands
             {'type': "*'admin'*, *'moderator'* or *'autorole'*",
              'role': 'Role mention or name'},
             admin_only=True, in_help=False),
+    Command('roles backfill', 'setup roles backfill', 'Give the autoroles to all members.', admin_only=True,
+            in_help=False),
     Command('moderation', 'setup moderation', 'Page to set up the moderation.', admin_only=True, in_help=False),
     Command('moderation log', 'setup moderation log <text-channel>', 'Set the moderation log.',
             {'text-channel': 'Channel mention or name'},
             admin_only=True, in_help=False),
+    Command('moderation warns', 'setup moderation warns <mute> <kick>', 'Set the warn counts that escalate warns.',
+            {'mute': 'Count of warns within one week that mute for 2h (2 to 10)',
+             'kick': 'Count of warns within one month that kick (2 to 10)'},
+            admin_only=True, in_help=False),
     Command('private rooms', 'setup private rooms', 'Page to set up private rooms.', admin_only=True, in_help=False),
+    Command('private rooms pool', 'setup private rooms pool <size>',
+            'Set how many private room channels are created in advance.',
+            {'size': 'Integer from 0 to 10'},
+            admin_only=True, in_help=False),
 ]
 
 
+# Commands by their names and aliases
+_commands_by_name: dict[str, Command] = {}
+for _cmd in commands:
+    for _name in (_cmd.name,) + _cmd.aliases:
+        _commands_by_name.setdefault(_name, _cmd)
+
+
+def _trigrams(name: str) -> set[str]:
+    """
+    Creates the trigrams of a name. The name is padded, so that short names have trigrams too.
+    :param name: Name to create the trigrams of
+    :return: Set of trigrams
+    """
+    padded = f'  {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Names and aliases of the commands by the trigrams they contain
+_trigram_index: dict[str, set[str]] = {}
+for _name in _commands_by_name:
+    for _trigram in _trigrams(_name):
+        _trigram_index.setdefault(_trigram, set()).add(_name)
+
+# Order of the names to break ties like a linear scan through the commands
+_name_order = {name: i for i, name in enumerate(_commands_by_name)}
+
+
 def get_command(name: str) -> Command:
     """
     Returns the command with the given name
-    :param name: Name of the command
+    :param name: Name or alias of the command
     :return: Command with the given name
     """
-    # Search command
-    for cmd in commands:
-        if cmd.name == name:
-            # Found command with name
-            return cmd
+    return _commands_by_name.get(name)
 
 
+@lru_cache(maxsize=256)
 def get_similar_command(name: str) -> tuple[bool, Command]:
     """
-    Returns a command with similar name
+    Returns a command with similar name. Only the names that share a trigram with the name are compared.
     :param name: Name of the command
     :return: Whether it is only a suggestion and the command with similar name
     """
+    # Return the command if the name matches exactly
+    if name in _commands_by_name:
+        return False, _commands_by_name[name]
+
+    # Collect the names that share at least one trigram with the name
+    candidates = set()
+    for trigram in _trigrams(name):
+        candidates.update(_trigram_index.get(trigram, ()))
 
     # Standard response
     highest_ration = (get_command('help'), 0.0)
 
-    # Iterate through commands and search the one with highest ratio
-    for cmd in commands:
-        ratio = SequenceMatcher(None, cmd.name, name).ratio()
+    # Iterate through the candidates and search the one with highest ratio
+    for cmd_name in sorted(candidates, key=_name_order.get):
+        ratio = SequenceMatcher(None, cmd_name, name).ratio()
         if ratio > highest_ration[1]:
-            highest_ration = (cmd, ratio)
+            highest_ration = (_commands_by_name[cmd_name], ratio)
 
     # Return command if there was a good match
     if highest_ration[1] > 0.6:
@@ -215,4 +296,4 @@ def get_similar_command(name: str) -> tuple[bool, Command]:
         return False, highest_ration[0]
     else:
         # Unsure: suggestion
-        return True, highest_ration[0]
\ No newline at end of file
+        return True, highest_ration[0]
@@ -0,0 +1,190 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Union, Optional, Callable, Awaitable
+
+from discord import User, Member, Embed, Forbidden, HTTPException
+
+from utilities import metrics
+
+# The maximum count of direct messages sent at the same time
+max_concurrent_sends = 3
+
+# The maximum count of direct messages waiting in the queue (further ones are dropped)
+max_queue_size = 1000
+
+# How often a direct message is retried after a rate limit or server error
+max_retries = 3
+
+# Seconds before the first retry (doubled for every further retry)
+retry_delay = 1
+
+# How long users with closed direct messages are skipped
+closed_ttl = timedelta(hours=6)
+
+# Direct messages waiting for delivery: user, embed, fallback and future of the delivery
+_queue: Optional[asyncio.Queue] = None
+
+# Tasks that deliver the direct messages
+_workers: list[asyncio.Task] = []
+
+# Running fallbacks of skipped direct messages (kept until they are done)
+_fallbacks: set[asyncio.Task] = set()
+
+# Until when users with closed direct messages are skipped by user ID
+_closed: dict[int, datetime] = {}
+
+# Expose the size of the queue and of the closed direct messages cache
+metrics.direct_message_queue.set_function(lambda: _queue.qsize() if _queue else 0)
+metrics.closed_direct_messages.set_function(lambda: len(_closed))
+
+
+def _start_workers() -> asyncio.Queue:
+    """
+    Create the queue and start the workers in the running event loop if they don't run yet
+    :return: Queue of direct messages
+    """
+    global _queue
+
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=max_queue_size)
+
+    for _ in range(max_concurrent_sends - len(_workers)):
+        _workers.append(asyncio.create_task(_worker()))
+
+    return _queue
+
+
+def has_closed_dms(user_id: int) -> bool:
+    """
+    Check whether direct messages to the user failed recently because the user closed them
+    :param user_id: ID of the user
+    :return: Whether the direct messages of the user are closed
+    """
+    until = _closed.get(user_id)
+    if until and until <= datetime.utcnow():
+        del _closed[user_id]
+        return False
+
+    return until is not None
+
+
+def _mark_closed(user_id: int) -> None:
+    """
+    Remember that the user closed the direct messages
+    :param user_id: ID of the user
+    """
+    now = datetime.utcnow()
+
+    # Forget expired entries once the cache grows
+    if len(_closed) > 10000:
+        for expired in [u_id for u_id, until in _closed.items() if until <= now]:
+            del _closed[expired]
+
+    _closed[user_id] = now + closed_ttl
+
+
+def send(user: Union[User, Member], embed: Embed,
+         on_forbidden: Callable[[], Awaitable] = None) -> asyncio.Future:
+    """
+    Queue a direct message for delivery in the background
+    :param user: User to send the message to
+    :param embed: Embed of the message
+    :param on_forbidden: Coroutine function that is called if the user closed the direct messages
+    :return: Future that results in whether the message was delivered
+    """
+    queue = _start_workers()
+    delivery = asyncio.get_event_loop().create_future()
+
+    if has_closed_dms(user.id):
+        # Don't try users that closed their direct messages
+        metrics.direct_messages.inc('skipped')
+        delivery.set_result(False)
+        if on_forbidden:
+            fallback = asyncio.create_task(on_forbidden())
+            _fallbacks.add(fallback)
+            fallback.add_done_callback(_fallback_done)
+        return delivery
+
+    try:
+        queue.put_nowait((user, embed, on_forbidden, delivery))
+    except asyncio.QueueFull:
+        metrics.direct_messages.inc('dropped')
+        delivery.set_result(False)
+    else:
+        metrics.direct_messages.inc('queued')
+
+    return delivery
+
+
+def _fallback_done(fallback: asyncio.Task) -> None:
+    """
+    Forget a finished fallback and report its error
+    :param fallback: Task of the fallback
+    """
+    _fallbacks.discard(fallback)
+
+    if not fallback.cancelled() and fallback.exception():
+        metrics.direct_messages.inc('failed')
+        print(f'\033[31mFallback of a skipped direct message failed: {fallback.exception()!r}\033[0m')
+
+
+async def wait(delivery: asyncio.Future, timeout: float = 5) -> bool:
+    """
+    Wait until a queued direct message is delivered (e.g. before the user is removed from the guild)
+    :param delivery: Future returned by send
+    :param timeout: Seconds to wait at most
+    :return: Whether the message was delivered in time
+    """
+    try:
+        return await asyncio.wait_for(asyncio.shield(delivery), timeout)
+    except asyncio.TimeoutError:
+        return False
+
+
+async def _worker() -> None:
+    """Deliver queued direct messages until the bot stops"""
+    while True:
+        user, embed, on_forbidden, delivery = await _queue.get()
+        try:
+            delivered = await _deliver(user, embed, on_forbidden)
+        except Exception:
+            metrics.direct_messages.inc('failed')
+            delivered = False
+        finally:
+            _queue.task_done()
+
+        if not delivery.done():
+            delivery.set_result(delivered)
+
+
+async def _deliver(user: Union[User, Member], embed: Embed, on_forbidden: Callable[[], Awaitable] = None) -> bool:
+    """
+    Send a direct message and retry it with backoff on rate limits and server errors
+    :param user: User to send the message to
+    :param embed: Embed of the message
+    :param on_forbidden: Coroutine function that is called if the user closed the direct messages
+    :return: Whether the message was delivered
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            await user.send(embed=embed)
+        except Forbidden:
+            # The user closed the direct messages
+            metrics.direct_messages.inc('closed')
+            _mark_closed(user.id)
+            if on_forbidden:
+                await on_forbidden()
+            return False
+        except HTTPException as error:
+            if (error.status == 429 or error.status >= 500) and attempt < max_retries:
+                metrics.direct_messages.inc('retried')
+                await asyncio.sleep(retry_delay * 2 ** attempt)
+                continue
+
+            metrics.direct_messages.inc('failed')
+            return False
+        else:
+            metrics.direct_messages.inc('sent')
+            return True
+
+    return False
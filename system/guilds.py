@@ -1,11 +1,12 @@
 from database import insert, delete, select
-from system import welcome, moderation
+from system import welcome, moderation, permission, coordination
 
 from discord import Guild, Client, Role, VoiceChannel, Member
 
 from system import private_rooms as pr_sys
-from system.moderation import mute, moderation
+from system.moderation import mute, moderation, automod
 from system.private_rooms import private_rooms
+from system.setup import snapshot
 
 
 async def join_guild(guild: Guild) -> None:
@@ -26,6 +27,9 @@ def remove_guild(guild: Guild) -> None:
     :param guild: Guild that is removed
     """
     delete.all_entries_of_guild(guild_id=guild.id)
+    permission.invalidate_roles(guild.id)
+    automod.forget_guild(guild.id)
+    snapshot.invalidate(guild.id)
 
 
 async def check_guilds(client: Client) -> None:
@@ -36,7 +40,8 @@ async def check_guilds(client: Client) -> None:
     # Get list of all active guild_ids and guild_ids in database
     active_guilds = client.guilds
     active_guild_ids = list(map(lambda g: g.id, active_guilds))
-    db_guild_ids = select.all_guilds()
+    # Guilds of other bot processes are neither joined nor left
+    db_guild_ids = [guild_id for guild_id in select.all_guilds() if coordination.owns(guild_id)]
 
     # Check for new guilds and add them to database
     for guild in active_guilds:
@@ -50,6 +55,9 @@ async def check_guilds(client: Client) -> None:
     for guild_id in db_guild_ids:
         if guild_id not in active_guild_ids:
             delete.all_entries_of_guild(guild_id=guild_id)
+            permission.invalidate_roles(guild_id)
+            automod.forget_guild(guild_id)
+            snapshot.invalidate(guild_id)
 
     # Server count
     print(f'The bot is currently on {len(active_guild_ids)} servers.')
@@ -62,7 +70,7 @@ async def check_channels(client: Client) -> None:
     """
     # Welcome System:List of pairs of channel_ids and guild_ids
     # Iterate through channels
-    for channel_id, guild_id in select.all_welcome_channels():
+    for channel_id, guild_id in coordination.owned(select.all_welcome_channels()):
         guild: Guild = client.get_guild(guild_id)
         # Check if the channel exists
         if channel_id not in list(map(lambda c: c.id, guild.channels)):
@@ -70,19 +78,21 @@ async def check_channels(client: Client) -> None:
             welcome.toggle_welcome(guild, disable=True)
             welcome.toggle_leave(guild, disable=True)
             welcome.set_welcome_channel(guild, channel_id=None)
+            snapshot.invalidate(guild.id)
 
     # Moderation Log: List of pairs of channel_ids and guild_ids
     # Iterate through channels
-    for channel_id, guild_id in select.all_moderation_logs():
+    for channel_id, guild_id in coordination.owned(select.all_moderation_logs()):
         guild: Guild = client.get_guild(guild_id)
         # Check if the channel exists
         if channel_id not in list(map(lambda c: c.id, guild.channels)):
             # Moderation System: Delete the moderation log
             moderation.set_mod_log(guild, channel_id=None)
+            snapshot.invalidate(guild.id)
 
     # Private_rooms: List of pairs of channel_ids and guild_ids
     # Iterate through channels
-    for channel_id, guild_id in select.all_private_rooms():
+    for channel_id, guild_id in coordination.owned(select.all_private_rooms()):
         guild: Guild = client.get_guild(guild_id)
         private_room = select.PrivateRoom(guild_id=guild.id, room_channel_id=channel_id)
         owner = guild.get_member(private_room.owner_id)
@@ -110,7 +120,7 @@ async def check_channels(client: Client) -> None:
 
     # Move channels: List of pairs of channel_ids and guild_ids
     # Iterate through channels
-    for channel_id, guild_id in select.all_move_channels():
+    for channel_id, guild_id in coordination.owned(select.all_move_channels()):
         guild: Guild = client.get_guild(guild_id)
         # Check if the channel exists
         if channel_id not in list(map(lambda c: c.id, guild.channels)):
@@ -120,7 +130,7 @@ async def check_channels(client: Client) -> None:
 
     # PR Text channels: List of pairs of channel_ids and guild_ids
     # Iterate through channels
-    for channel_id, guild_id in select.all_pr_text_channels():
+    for channel_id, guild_id in coordination.owned(select.all_pr_text_channels()):
         guild: Guild = client.get_guild(guild_id)
         # Check if the channel exists
         if channel_id not in list(map(lambda c: c.id, guild.channels)):
@@ -134,7 +144,7 @@ async def check_channels(client: Client) -> None:
     channels.extend(select.all_pr_categories())
 
     # Iterate through channels
-    for channel_id, guild_id in channels:
+    for channel_id, guild_id in coordination.owned(channels):
         guild: Guild = client.get_guild(guild_id)
         # Check if the channel exists
         if channel_id not in list(map(lambda c: c.id, guild.channels)):
@@ -148,7 +158,7 @@ def check_roles(client: Client) -> None:
     :param client: Bot client
     """
     # List of pairs of role_ids and guild_ids
-    roles = select.all_roles()
+    roles = coordination.owned(select.all_roles())
 
     # Iterate through channels
     for role_id, guild_id in roles:
@@ -157,6 +167,7 @@ def check_roles(client: Client) -> None:
         if role_id not in list(map(lambda c: c.id, guild.roles)):
             # Remove role out of database
             delete.role(role_id)
+            permission.invalidate_roles(guild_id)
 
 
 async def check_members(client: Client) -> None:
@@ -1,8 +1,20 @@
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Callable
+
+from database import select
 from system.private_rooms import private_rooms
 from utilities import secret, util
 from system import description, appearance, permission
 from discord import Message, Guild, Member, TextChannel, Embed, Forbidden, VoiceChannel
 
+# The maximum count of cached help embeds (the least recently used ones are dropped first)
+max_embeds = 500
+
+# Help embeds as dicts by guild ID, permission tier and the settings of the guild they depend on. Changing the setup
+# changes the settings and therefore the key, so outdated embeds are never served.
+_embeds: OrderedDict[tuple, dict] = OrderedDict()
+
 
 async def cmd_help(message: Message, cmd_name: str) -> None:
     """
@@ -45,34 +57,77 @@ async def help_command(message: Message) -> None:
     """
     # Initialize attributes of message
     member: Member = message.author
+    settings = _get_settings(message.guild)
 
     # Call different help messages depending on permission
-    await _member_help(message)
+    await _member_help(message, settings)
 
     if permission.is_admin(member=member):
-        await _mod_help(message, message.channel, footer=False)
-        await _admin_help(message, message.channel)
+        await _mod_help(message, message.channel, settings, footer=False)
+        await _admin_help(message, message.channel, settings)
 
     elif permission.is_mod(member=member):
-        await _mod_help(message, message.channel)
+        await _mod_help(message, message.channel, settings)
 
     # Delete message
     await util.delete_message(message)
 
 
-async def _member_help(message: Message) -> None:
+def _get_settings(guild: Guild) -> tuple:
     """
-    Sends help message for members in the text channel.
-    :param message: Message that executed the command
+    Get the settings the help embeds of the guild depend on with one query
+    :param guild: Guild to get the settings of
+    :return: Tuple of prefix, color, whether the moderation log exists, name of the cpr channel and ID of the
+             settings channel
     """
+    prefix, color, mod_log_id, cpr_channel_id, settings_id = select.help_settings(guild.id)
+    cpr_channel: VoiceChannel = guild.get_channel(cpr_channel_id) if cpr_channel_id else None
 
-    # Initialize attributes of message
-    channel: TextChannel = message.channel
-    guild: Guild = message.guild
-    member: Member = message.author
+    return (prefix or appearance.default_prefix, color or appearance.default_color,
+            guild.get_channel(mod_log_id) is not None, cpr_channel.name if cpr_channel else None, settings_id)
+
+
+def _get_embed(guild: Guild, tier: str, settings: tuple, build: Callable[[Guild, str], Embed]) -> Embed:
+    """
+    Get the help embed of a permission tier out of the cache or build it if it isn't cached
+    :param guild: Guild to get the embed for
+    :param tier: Permission tier of the embed ('MEMBER', 'MODERATOR' or 'ADMIN')
+    :param settings: Settings of the guild the embed depends on
+    :param build: Function that builds the embed with the guild and prefix
+    :return: A copy of the embed without footer
+    """
+    key = (guild.id, tier) + settings
+
+    if key in _embeds:
+        _embeds.move_to_end(key)
+    else:
+        _embeds[key] = build(guild, settings[0]).to_dict()
+
+        # Drop the least recently used embeds
+        while len(_embeds) > max_embeds:
+            _embeds.popitem(last=False)
+
+    return Embed.from_dict(deepcopy(_embeds[key]))
+
+
+def _set_footer(embed: Embed, prefix: str, member: Member) -> None:
+    """
+    Set the footer of a help embed
+    :param embed: Embed to set the footer of
+    :param prefix: Prefix of the guild
+    :param member: Member that called help
+    """
+    embed.set_footer(text=f'{prefix}help <command> for detailed information | <> Required  |  () Optional',
+                     icon_url=member.avatar_url)
 
-    prefix = appearance.get_prefix(guild.id)
 
+def _build_member_help(guild: Guild, prefix: str) -> Embed:
+    """
+    Builds the help embed for members
+    :param guild: Guild to build the embed for
+    :param prefix: Prefix of the guild
+    :return: Help embed without footer
+    """
     # Setup embed content
     embed: Embed = Embed()
     embed.title = 'Commands - ' + appearance.bot_name
@@ -94,25 +149,17 @@ async def _member_help(message: Message) -> None:
     # Setup embed style
     embed.colour = appearance.get_color(guild.id)
     embed.set_thumbnail(url=guild.get_member(secret.bot_id).avatar_url)
-    embed.set_footer(text=f'{prefix}help <command> for detailed information | <> Required  |  () Optional',
-                     icon_url=member.avatar_url)
 
-    # Send message
-    await channel.send(embed=embed)
+    return embed
 
 
-async def _mod_help(message: Message, channel: TextChannel, footer: bool = True) -> None:
+def _build_mod_help(guild: Guild, prefix: str) -> Embed:
     """
-    Sends help message for moderators via dm.
-    :param message: Message that executed the command
-    :param footer: Whether the embed should have a footer
+    Builds the help embed for moderators
+    :param guild: Guild to build the embed for
+    :param prefix: Prefix of the guild
+    :return: Help embed without footer
     """
-    # Initialize attributes of message
-    guild: Guild = message.guild
-    member: Member = message.author
-
-    prefix = appearance.get_prefix(guild.id)
-
     # Setup embed content
     embed: Embed = Embed()
     embed.title = 'Moderator Commands'
@@ -125,9 +172,63 @@ async def _mod_help(message: Message, channel: TextChannel, footer: bool = True)
     # Setup embed style
     embed.colour = appearance.get_color(guild.id)
 
+    return embed
+
+
+def _build_admin_help(guild: Guild, prefix: str) -> Embed:
+    """
+    Builds the help embed for admins
+    :param guild: Guild to build the embed for
+    :param prefix: Prefix of the guild
+    :return: Help embed without footer
+    """
+    # Setup embed content
+    embed: Embed = Embed()
+    embed.title = 'Admin Commands'
+
+    # Add fields for commands
+    for cmd in description.commands:
+        if cmd.admin_only and cmd.in_help(guild):
+            embed.add_field(name='`' + prefix + cmd.syntax + '`', value=cmd.description, inline=False)
+
+    # Setup embed style
+    embed.colour = appearance.get_color(guild.id)
+
+    return embed
+
+
+async def _member_help(message: Message, settings: tuple) -> None:
+    """
+    Sends help message for members in the text channel.
+    :param message: Message that executed the command
+    :param settings: Settings of the guild the help depends on
+    """
+    # Initialize attributes of message
+    channel: TextChannel = message.channel
+    guild: Guild = message.guild
+    member: Member = message.author
+
+    embed = _get_embed(guild, 'MEMBER', settings, _build_member_help)
+    _set_footer(embed, settings[0], member)
+
+    # Send message
+    await channel.send(embed=embed)
+
+
+async def _mod_help(message: Message, channel: TextChannel, settings: tuple, footer: bool = True) -> None:
+    """
+    Sends help message for moderators via dm.
+    :param message: Message that executed the command
+    :param settings: Settings of the guild the help depends on
+    :param footer: Whether the embed should have a footer
+    """
+    # Initialize attributes of message
+    guild: Guild = message.guild
+    member: Member = message.author
+
+    embed = _get_embed(guild, 'MODERATOR', settings, _build_mod_help)
     if footer:
-        embed.set_footer(text=f'{prefix}help <command> for detailed information | <> Required  |  () Optional',
-                         icon_url=member.avatar_url)
+        _set_footer(embed, settings[0], member)
 
     # Send direct message or in channel if dm is forbidden
     try:
@@ -136,29 +237,18 @@ async def _mod_help(message: Message, channel: TextChannel, footer: bool = True)
         await channel.send(embed=embed)
 
 
-async def _admin_help(message: Message, channel: TextChannel) -> None:
+async def _admin_help(message: Message, channel: TextChannel, settings: tuple) -> None:
     """
     Sends help message for admins via dm.
+    :param settings: Settings of the guild the help depends on
     """
     # Initialize attributes of message
     guild: Guild = message.guild
     member: Member = message.author
 
-    prefix = appearance.get_prefix(guild.id)
+    embed = _get_embed(guild, 'ADMIN', settings, _build_admin_help)
+    _set_footer(embed, settings[0], member)
 
-    # Setup embed content
-    embed: Embed = Embed()
-    embed.title = 'Admin Commands'
-
-    # Add fields for commands
-    for cmd in description.commands:
-        if cmd.admin_only and cmd.in_help(guild):
-            embed.add_field(name='`' + prefix + cmd.syntax + '`', value=cmd.description, inline=False)
-
-    # Setup embed style
-    embed.colour = appearance.get_color(guild.id)
-    embed.set_footer(text=f'{prefix}help <command> for detailed information | <> Required  |  () Optional',
-                     icon_url=member.avatar_url)
     # Send direct message or in channel if dm is forbidden
     try:
         await member.send(embed=embed)
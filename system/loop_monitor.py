@@ -0,0 +1,185 @@
+import asyncio
+import os
+from collections import deque
+from time import perf_counter
+from typing import Optional
+
+from discord import Message, Embed, TextChannel
+from discord.ext import tasks
+from discord.ext.commands import Bot, Context
+
+from system import appearance
+from utilities import metrics, util
+
+# Seconds between two samples of the loop lag
+sample_interval = 0.5
+
+# Count of kept lag samples (the last minute)
+lag_samples = 120
+
+# Callbacks that block the loop at least this many seconds are recorded as slow
+slow_callback_threshold = float(os.environ.get('FRYSEL_SLOW_CALLBACK_MS', 100)) / 1000
+
+# Count of offenders shown by the lag command
+shown_offenders = 10
+
+# Latest lag samples in seconds
+_lags: deque[float] = deque(maxlen=lag_samples)
+
+# Count, total and maximum duration of the slow callbacks by culprit
+_offenders: dict[str, list[float]] = {}
+
+# Task that samples the loop lag (None until it is started)
+_sampler: Optional[asyncio.Task] = None
+
+# Handle._run of asyncio that runs every callback of the loop (set when the tracer is installed)
+_run_handle = None
+
+
+def _coroutine_name(coro) -> str:
+    """
+    Get the name of the coroutine a task runs
+    :param coro: Coroutine of the task
+    :return: Qualified name of the coroutine
+    """
+    frame = getattr(coro, 'cr_frame', None)
+    loop = frame.f_locals.get('self') if frame and coro.__qualname__ == 'Loop._loop' else None
+    if isinstance(loop, tasks.Loop):
+        # Background loops of discord.ext.tasks are named by the function they repeat
+        return f'loop {loop.coro.__qualname__}'
+
+    return getattr(coro, '__qualname__', repr(coro))
+
+
+def _culprit(handle: asyncio.Handle) -> str:
+    """
+    Get the cog, listener or command that ran in a callback of the loop
+    :param handle: Handle of the callback
+    :return: Name of the culprit
+    """
+    callback = handle._callback
+    task = getattr(callback, '__self__', None)
+    if not isinstance(task, asyncio.Task):
+        return getattr(callback, '__qualname__', repr(callback))
+
+    # Listeners and commands name their task, other tasks are named by their coroutine
+    name = task.get_name()
+    return _coroutine_name(task.get_coro()) if name.startswith('Task-') else name
+
+
+def _timed_run(handle: asyncio.Handle) -> None:
+    """
+    Run a callback of the loop and record it if it blocked the loop for too long
+    :param handle: Handle of the callback
+    """
+    start = perf_counter()
+    _run_handle(handle)
+    duration = perf_counter() - start
+
+    if duration >= slow_callback_threshold:
+        culprit = _culprit(handle)
+        metrics.slow_callbacks.observe(duration, culprit)
+
+        offender = _offenders.setdefault(culprit, [0, 0.0, 0.0])
+        offender[0] += 1
+        offender[1] += duration
+        offender[2] = max(offender[2], duration)
+
+
+def install(client: Bot) -> None:
+    """
+    Trace the callbacks of the loop and name the tasks of listeners and commands, so stalls can be attributed
+    :param client: Bot client
+    """
+    global _run_handle
+
+    if _run_handle:
+        return
+
+    _run_handle = asyncio.Handle._run
+    asyncio.Handle._run = _timed_run
+
+    run_event = client._run_event
+    invoke = client.invoke
+
+    async def named_run_event(coro, event_name: str, *args, **kwargs) -> None:
+        asyncio.current_task().set_name(f'{event_name} {coro.__qualname__}')
+        await run_event(coro, event_name, *args, **kwargs)
+
+    async def named_invoke(ctx: Context) -> None:
+        if ctx.command:
+            # Commands run within the task of on_message
+            asyncio.current_task().set_name(f'command {ctx.command.qualified_name}')
+        await invoke(ctx)
+
+    client._run_event = named_run_event
+    client.invoke = named_invoke
+
+
+async def _sample() -> None:
+    """Measure how much later than expected the loop wakes up"""
+    loop = asyncio.get_event_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(sample_interval)
+        lag = max(loop.time() - start - sample_interval, 0)
+
+        metrics.loop_lag.observe(lag)
+        _lags.append(lag)
+
+
+def start() -> None:
+    """Start sampling the loop lag (only once)"""
+    global _sampler
+
+    if _sampler is None:
+        _sampler = asyncio.create_task(_sample(), name='loop lag sampler')
+
+
+def worst_offenders(count: int = shown_offenders) -> list[tuple[str, int, float, float]]:
+    """
+    Get the culprits that blocked the loop the longest
+    :param count: Maximum count of culprits
+    :return: Culprits with count, total and maximum duration of their slow callbacks
+    """
+    offenders = sorted(_offenders.items(), key=lambda offender: offender[1][1], reverse=True)[:count]
+    return [(culprit, int(calls), total, longest) for culprit, (calls, total, longest) in offenders]
+
+
+async def lag_cmd(message: Message, threshold: int = None) -> None:
+    """
+    Sends the loop lag and the worst offenders
+    :param message: Message of the command call
+    :param threshold: New threshold for slow callbacks in milliseconds
+    :raises InvalidInputError: When the threshold isn't positive
+    """
+    global slow_callback_threshold
+
+    channel: TextChannel = message.channel
+
+    # Delete message of member
+    await util.delete_message(message)
+
+    if threshold is not None:
+        if threshold <= 0:
+            raise util.InvalidInputError(threshold, 'The threshold must be a positive count of milliseconds')
+        slow_callback_threshold = threshold / 1000
+
+    embed: Embed = Embed(title='Loop Lag', colour=appearance.moderation_color if _offenders else
+                         appearance.success_color)
+
+    # Lag within the last minute
+    if _lags:
+        embed.add_field(name='Last Minute', value=f'Now: `{_lags[-1] * 1000:.1f} ms`\n'
+                                                  f'Average: `{sum(_lags) / len(_lags) * 1000:.1f} ms`\n'
+                                                  f'Maximum: `{max(_lags) * 1000:.1f} ms`', inline=False)
+
+    embed.add_field(name='Threshold', value=f'Callbacks blocking the loop for `{slow_callback_threshold * 1000:g} ms` '
+                                            f'or longer are recorded', inline=False)
+
+    # Culprits that blocked the loop the longest
+    offenders = '\n'.join(f'`{culprit[:60]}`: {calls}×, total `{total * 1000:.0f} ms`, max `{longest * 1000:.0f} ms`'
+                          for culprit, calls, total, longest in worst_offenders())
+    embed.add_field(name='Worst Offenders', value=offenders or 'None', inline=False)
+
+    await channel.send(embed=embed)
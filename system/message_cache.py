@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Optional
+
+from discord import Message
+
+# The maximum count of cached messages (the least recently used ones are dropped first)
+max_messages = 1000
+
+# Cached messages of the bot and their kind ('SETUP' or 'SETTINGS') by message ID
+_messages: OrderedDict[int, tuple[Message, str]] = OrderedDict()
+
+
+def add(message: Message, kind: str) -> None:
+    """
+    Add a message of the bot to the cache
+    :param message: Message to add
+    :param kind: Kind of message ('SETUP' or 'SETTINGS')
+    """
+    _messages[message.id] = (message, kind)
+    _messages.move_to_end(message.id)
+
+    # Drop the least recently used messages
+    while len(_messages) > max_messages:
+        _messages.popitem(last=False)
+
+
+def get(message_id: int, kind: str) -> Optional[Message]:
+    """
+    Get a cached message of the bot
+    :param message_id: ID of the message
+    :param kind: Kind of message ('SETUP' or 'SETTINGS')
+    :return: The cached message or None if there is no message of the kind cached
+    """
+    entry = _messages.get(message_id)
+    if not entry or entry[1] != kind:
+        return None
+
+    _messages.move_to_end(message_id)
+    return entry[0]
+
+
+def remove(message_id: int) -> None:
+    """
+    Remove a message from the cache
+    :param message_id: ID of the message
+    """
+    _messages.pop(message_id, None)
+
+
+def remove_channel(channel_id: int) -> None:
+    """
+    Remove all messages of a channel from the cache
+    :param channel_id: ID of the channel
+    """
+    for message_id in [m_id for m_id, (message, _) in _messages.items() if message.channel.id == channel_id]:
+        del _messages[message_id]
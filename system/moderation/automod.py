@@ -0,0 +1,153 @@
+import time
+from datetime import timedelta
+from typing import Optional
+
+from discord import Message, Member, Guild, Forbidden
+
+from database import select, update
+from system import permission, coordination
+from system.moderation import mute
+from utilities import secret
+from utilities.sketch import SlidingCountMinSketch
+
+# The maximum count of messages of a member within message_window seconds
+max_messages = 8
+message_window = 10
+
+# The maximum count of messages of a member with the same content within duplicate_window seconds
+max_duplicates = 4
+duplicate_window = 30
+
+# The maximum count of mentions in the messages of a member within mention_window seconds
+max_mentions = 10
+mention_window = 30
+
+# Duration of the mute of spamming members
+mute_duration = ('10 minutes', timedelta(minutes=10))
+
+# Counters of messages, duplicates and mentions by guild and member (the memory is fixed for all guilds)
+_messages = SlidingCountMinSketch(message_window)
+_duplicates = SlidingCountMinSketch(duplicate_window)
+_mentions = SlidingCountMinSketch(mention_window)
+
+# Whether automod is activated by guild ID
+_activated: dict[int, bool] = {}
+
+# Until when members who were muted by automod are ignored by guild and member ID (monotonic time)
+_punished: dict[tuple[int, int], float] = {}
+
+
+def is_activated(guild_id: int) -> bool:
+    """
+    Check whether automod is activated on the guild (the setting is cached)
+    :param guild_id: ID of the guild
+    :return: Whether automod is activated
+    """
+    activated = _activated.get(guild_id)
+    if activated is None:
+        activated = _activated[guild_id] = bool(select.automod(guild_id))
+
+    return activated
+
+
+def toggle(guild: Guild) -> bool:
+    """
+    Toggle automod on the guild
+    :param guild: Guild to toggle automod on
+    :return: Whether automod is activated now
+    """
+    activated = not is_activated(guild.id)
+    update.automod(argument=guild.id, value=int(activated))
+    _activated[guild.id] = activated
+    coordination.publish('automod', guild.id)
+
+    return activated
+
+
+def forget_guild(guild_id: int) -> None:
+    """
+    Forget the cached setting of a guild
+    :param guild_id: ID of the guild
+    """
+    _activated.pop(guild_id, None)
+
+
+coordination.register('automod', forget_guild)
+
+
+def violation(guild_id: int, user_id: int, content: str, mentions: int, now: float = None) -> Optional[str]:
+    """
+    Count a message of a member and check whether the member is spamming
+    :param guild_id: ID of the guild
+    :param user_id: ID of the author
+    :param content: Content of the message
+    :param mentions: Count of mentions in the message
+    :param now: Current time in seconds (time.monotonic() if not given)
+    :return: Reason for the mute if the member is spamming, otherwise None
+    """
+    now = time.monotonic() if now is None else now
+    key = (guild_id, user_id)
+
+    # Count all counters before checking them, so the windows stay complete
+    message_count = _messages.add(key, now=now)
+    duplicate_count = _duplicates.add((guild_id, user_id, content), now=now) if content else 0
+    mention_count = _mentions.add(key, mentions, now=now) if mentions else 0
+
+    if message_count > max_messages:
+        return 'Automod: Sending too many messages'
+    if duplicate_count > max_duplicates:
+        return 'Automod: Sending the same message repeatedly'
+    if mention_count > max_mentions:
+        return 'Automod: Mentioning too many users'
+
+    return None
+
+
+def _is_punished(key: tuple[int, int], now: float) -> bool:
+    """
+    Check whether the member was muted by automod recently
+    :param key: IDs of guild and member
+    :param now: Current time in seconds
+    :return: Whether the member is still ignored
+    """
+    until = _punished.get(key)
+    if until and until <= now:
+        del _punished[key]
+        return False
+
+    return until is not None
+
+
+async def check_message(message: Message) -> None:
+    """
+    Count the message and mute the author temporarily if the author is spamming
+    :param message: Message that was sent
+    """
+    guild: Guild = message.guild
+    member = message.author
+
+    if not guild or member.bot or not isinstance(member, Member) or not is_activated(guild.id):
+        # Only check messages of members on guilds with automod
+        return
+
+    now = time.monotonic()
+    key = (guild.id, member.id)
+    if _is_punished(key, now):
+        return
+
+    reason = violation(guild.id, member.id, message.content, len(message.raw_mentions), now)
+    if not reason or permission.is_mod(member=member):
+        # Ignore moderators
+        return
+
+    # Ignore the member until the mute is active
+    if len(_punished) > 10000:
+        for expired in [k for k, until in _punished.items() if until <= now]:
+            del _punished[expired]
+    _punished[key] = now + mute_duration[1].total_seconds()
+
+    try:
+        await mute.tempmute(member, guild.get_member(secret.bot_id), *mute_duration, reason=reason)
+    except Forbidden:
+        # No permission to mute
+        del _punished[key]
@@ -4,7 +4,7 @@ from discord import Message, Member, TextChannel, Guild, User, Client, utils as
 from database import delete, select, insert
 from database.select import Ban
 from utilities import util, secret
-from system import permission, appearance
+from system import permission, appearance, direct_messages, coordination
 from system.moderation import moderation
 
 
@@ -21,13 +21,19 @@ async def ban(member: Member, moderator: Member, client: Client, reason: str = N
     # Delete old entries out of database
     delete.bans_of_member(user_id=member.id, guild_id=guild.id)
 
-    # Send private message
+    # Send private message and wait for its delivery, since the member cannot receive it afterwards
     if permission.ban_kick_member(client, member):
-        await moderation.private_message(member, f'You got banned from {guild.name}', None, moderator, Reason=reason)
+        delivery = await moderation.private_message(member, f'You got banned from {guild.name}', None, moderator,
+                                                    Reason=reason)
+        await direct_messages.wait(delivery)
 
     # Ban member
     await guild.ban(member, reason=reason)
 
+    # Insert into database
+    insert.ban(temp=False, user_id=member.id, mod_id=moderator.id, date=datetime.utcnow(), guild_id=guild.id,
+               reason=reason)
+
     # Send log message in moderation log
     await moderation.log_message('Ban', member, moderator, guild, reason=reason, Duration='∞')
 
@@ -80,10 +86,11 @@ async def tempban(member: Member, moderator: Member, duration: str, tdelta: time
     # Get the date, the mute expires
     until_date = datetime.utcnow() + tdelta
 
-    # Send private message
+    # Send private message and wait for its delivery, since the member cannot receive it afterwards
     if permission.ban_kick_member(client, member):
-        await moderation.private_message(member, f'You got banned from {guild.name}', None, moderator,
-                                         Duration=duration, Reason=reason)
+        delivery = await moderation.private_message(member, f'You got banned from {guild.name}', None, moderator,
+                                                    Duration=duration, Reason=reason)
+        await direct_messages.wait(delivery)
 
     # Ban member
     await guild.ban(member, reason=reason)
@@ -140,7 +147,8 @@ async def check_expired(client: Client) -> None:
     Handles expired temporary bans
     :param client: Bot client
     """
-    expired_bans: list[Ban] = select.expired_bans()
+    # Fetch expired bans on the guilds of this process
+    expired_bans: list[Ban] = [b for b in select.expired_bans() if coordination.owns(b.guild_id)]
 
     for ban_entry in expired_bans:
         user: User = await client.fetch_user(ban_entry.user_id)
@@ -0,0 +1,181 @@
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from discord import Message, Member, TextChannel, Guild, Client, HTTPException
+
+from database import delete, insert
+from system import appearance, permission
+from system.moderation import moderation, mute
+from utilities import util, secret
+
+# The maximum count of members affected by one bulk operation
+max_targets = 500
+
+# The maximum count of API calls running at the same time
+max_concurrent_calls = 5
+
+
+def members_joined_since(guild: Guild, duration_amount: int, duration_unit: str) -> list[Member]:
+    """
+    Get the members who joined the guild within the duration
+    :param guild: Guild to search members on
+    :param duration_amount: Duration of join window (e.g. 10)
+    :param duration_unit: Unit of duration (e.g. 'minutes', 'hours')
+    :return: Members who joined within the duration
+    """
+    tdelta, _ = moderation.get_duration(duration_amount, duration_unit)
+    since = datetime.utcnow() - tdelta
+
+    return [member for member in guild.members if member.joined_at and member.joined_at >= since]
+
+
+def get_targets(members: list[Member], moderator: Member, client: Client, check_hierarchy: bool) -> list[Member]:
+    """
+    Remove the members the operation must not affect: the bot, the moderator, moderators and duplicates
+    :param members: Members selected by the moderator
+    :param moderator: Moderator of operation
+    :param client: Bot client
+    :param check_hierarchy: Whether members with a higher role than the bot are removed
+    :return: Members to affect
+    :raises Exception: If there are no members to affect or too many
+    """
+    targets = {}
+    for member in members:
+        if member.id in (secret.bot_id, moderator.id) or member.id in targets:
+            continue
+        if permission.is_mod(member=member):
+            continue
+        if check_hierarchy and not permission.ban_kick_member(client, member):
+            continue
+        targets[member.id] = member
+
+    if not targets:
+        raise Exception('There are no members to affect: No targets')
+
+    if len(targets) > max_targets:
+        raise Exception(f'At most {max_targets} members can be affected at once: Too many targets')
+
+    return list(targets.values())
+
+
+async def _fan_out(members: list[Member], action: Callable[[Member], Awaitable]) -> tuple[list[Member], int]:
+    """
+    Run the action for all members with bounded concurrency
+    :param members: Members to run the action for
+    :param action: Coroutine function that is called with each member
+    :return: Members the action succeeded for and count of failed ones
+    """
+    semaphore = asyncio.Semaphore(max_concurrent_calls)
+
+    async def run(member: Member) -> bool:
+        """Run the action when the limit allows it"""
+        async with semaphore:
+            try:
+                await action(member)
+            except HTTPException:
+                return False
+            return True
+
+    results = await asyncio.gather(*(run(member) for member in members))
+    succeeded = [member for member, success in zip(members, results) if success]
+
+    return succeeded, len(members) - len(succeeded)
+
+
+async def mass_ban(message: Message, members: list[Member], client: Client, reason: str = None) -> None:
+    """
+    Ban several members at once. No direct messages are sent and one report is logged.
+    :param message: Message of command call
+    :param members: Members to be banned
+    :param client: Bot client
+    :param reason: Reason for ban
+    """
+    # Initialize varaibles
+    channel: TextChannel = message.channel
+    guild: Guild = message.guild
+    moderator: Member = message.author
+
+    # Delete message of member
+    await util.delete_message(message)
+
+    targets = get_targets(members, moderator, client, check_hierarchy=True)
+
+    # Ban members
+    banned, failed = await _fan_out(targets, lambda m: guild.ban(m, reason=reason, delete_message_days=1))
+
+    # Delete old entries out of database
+    delete.bans_of_members(user_ids=[member.id for member in banned], guild_id=guild.id)
+
+    # Insert into database
+    insert.bans(temp=False, user_ids=[member.id for member in banned], mod_id=moderator.id, date=datetime.utcnow(),
+                guild_id=guild.id, reason=reason)
+
+    # Send log message in moderation log
+    await moderation.log_report('Mass Ban', banned, moderator, guild, failed, reason=reason, Duration='∞')
+
+    # Send embed as response in chat
+    await moderation.chat_message(channel, f'Banned {len(banned)} members', appearance.moderation_color, moderator)
+
+
+async def mass_kick(message: Message, members: list[Member], client: Client, reason: str = None) -> None:
+    """
+    Kick several members at once. No direct messages are sent and one report is logged.
+    :param message: Message of command call
+    :param members: Members to be kicked
+    :param client: Bot client
+    :param reason: Reason for kick
+    """
+    # Initialize varaibles
+    channel: TextChannel = message.channel
+    guild: Guild = message.guild
+    moderator: Member = message.author
+
+    # Delete message of member
+    await util.delete_message(message)
+
+    targets = get_targets(members, moderator, client, check_hierarchy=True)
+
+    # Kick members
+    kicked, failed = await _fan_out(targets, lambda m: guild.kick(m, reason=reason))
+
+    # Send log message in moderation log
+    await moderation.log_report('Mass Kick', kicked, moderator, guild, failed, reason=reason)
+
+    # Send embed as response in chat
+    await moderation.chat_message(channel, f'Kicked {len(kicked)} members', appearance.moderation_color, moderator)
+
+
+async def mass_mute(message: Message, members: list[Member], client: Client, reason: str = None) -> None:
+    """
+    Mute several members at once. No direct messages are sent and one report is logged.
+    :param message: Message of command call
+    :param members: Members to be muted
+    :param client: Bot client
+    :param reason: Reason for mute
+    """
+    # Initialize varaibles
+    channel: TextChannel = message.channel
+    guild: Guild = message.guild
+    moderator: Member = message.author
+
+    # Delete message of member
+    await util.delete_message(message)
+
+    targets = get_targets(members, moderator, client, check_hierarchy=False)
+
+    # Mute members
+    mute_role = await mute.get_mute_role(guild)
+    muted, failed = await _fan_out(targets, lambda m: m.add_roles(mute_role, reason=reason))
+
+    # Replace old mute entries in database in one batch
+    user_ids = [member.id for member in muted]
+    delete.mutes_of_members(user_ids=user_ids, guild_id=guild.id)
+    insert.mutes(temp=False, user_ids=user_ids, mod_id=moderator.id, date=datetime.utcnow(), guild_id=guild.id,
+                 reason=reason)
+
+    # Send log message in moderation log
+    await moderation.log_report('Mass Mute', muted, moderator, guild, failed, reason=reason, Duration='∞')
+
+    # Send embed as response in chat
+    await moderation.chat_message(channel, f'Muted {len(muted)} members', appearance.moderation_color, moderator)
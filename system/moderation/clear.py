@@ -1,8 +1,106 @@
-from discord import Message, TextChannel, Embed, Member, Guild
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+
+from discord import Message, TextChannel, Embed, Member, Guild, Object, NotFound
+from discord.utils import time_snowflake
 from system import appearance
-from system.moderation import moderation
+from system.moderation import moderation, purge
 from utilities import util
 
+# The maximum count of message IDs remembered per channel and author
+max_recent_messages = 100
+
+# The maximum count of (channel, author) pairs with remembered messages (the least recently active are dropped first)
+max_buffers = 5000
+
+# Ring buffers of the IDs of recent messages by (channel ID, author ID). Forgotten messages are set to 0.
+_buffers: OrderedDict[tuple[int, int], array] = OrderedDict()
+
+# Count of messages ever written to a buffer by (channel ID, author ID)
+_counts: dict[tuple[int, int], int] = {}
+
+# Messages created before this ID weren't seen by the buffers
+_tracked_since = time_snowflake(datetime.utcnow())
+
+
+def record_message(message: Message) -> None:
+    """
+    Remember the ID of a new message in the ring buffer of its channel and author
+    :param message: Message that was sent
+    """
+    if not message.guild:
+        # Ignore direct messages
+        return
+
+    key = (message.channel.id, message.author.id)
+    buffer = _buffers.get(key)
+
+    if buffer is None:
+        buffer = _buffers[key] = array('Q', [0] * max_recent_messages)
+        _counts[key] = 0
+
+        # Drop the buffers of the least recently active authors
+        while len(_buffers) > max_buffers:
+            old_key, _ = _buffers.popitem(last=False)
+            del _counts[old_key]
+    else:
+        _buffers.move_to_end(key)
+
+    # Overwrite the oldest entry
+    buffer[_counts[key] % max_recent_messages] = message.id
+    _counts[key] += 1
+
+
+def forget_message(channel_id: int, author_id: int, message_id: int) -> None:
+    """
+    Remove the ID of a deleted message from the ring buffer of its channel and author
+    :param channel_id: ID of the channel
+    :param author_id: ID of the author
+    :param message_id: ID of the deleted message
+    """
+    buffer = _buffers.get((channel_id, author_id))
+    if buffer is None:
+        return
+
+    try:
+        buffer[buffer.index(message_id)] = 0
+    except ValueError:
+        pass
+
+
+def recent_message_ids(channel_id: int, author_id: int) -> list[int]:
+    """
+    Get the IDs of the remembered messages of an author in a channel that can still be deleted in bulk
+    :param channel_id: ID of the channel
+    :param author_id: ID of the author
+    :return: IDs of the messages, the latest first
+    """
+    buffer = _buffers.get((channel_id, author_id))
+    if buffer is None:
+        return []
+
+    limit = purge.bulk_delete_limit()
+    return sorted((m_id for m_id in buffer if m_id > limit), reverse=True)
+
+
+def _unseen_before(channel_id: int, author_id: int) -> int:
+    """
+    Get the message ID before which messages of the author in the channel may be missing in the ring buffer
+    :param channel_id: ID of the channel
+    :param author_id: ID of the author
+    :return: Snowflake of the oldest point the buffer covers
+    """
+    key = (channel_id, author_id)
+    if _counts.get(key, 0) > max_recent_messages:
+        # The buffer overflowed and only covers the time since its oldest message
+        return min((m_id for m_id in _buffers[key] if m_id), default=_tracked_since)
+    elif key in _buffers:
+        return _tracked_since
+    else:
+        # The buffer might have been dropped, so nothing is known about the author
+        return time_snowflake(datetime.utcnow())
+
 
 async def clear_messages(message: Message, amount: int) -> None:
     """
@@ -10,15 +108,17 @@ async def clear_messages(message: Message, amount: int) -> None:
     :param message: Message of command call
     :param amount: Amount of messages that should be deleted
     """
+    # Purge more than 100 messages in chunks
+    if amount > 100:
+        await purge.purge(message, [message.channel], amount)
+        return
+
     # Delete message of member
     await util.delete_message(message)
 
     # Delete one message at minimum
     if amount < 0:
         amount = 0
-    # Only delete 100 messages at maximum
-    if amount > 100:
-        amount = 100
 
     channel: TextChannel = message.channel
     
@@ -47,25 +147,44 @@ async def clear_member(member: Member, message: Message, amount: int = 100) -> N
     # Initialize varaibles
     channel: TextChannel = message.channel
 
+    # Purge more than 100 messages in chunks
+    if amount > 100:
+        await purge.purge(message, [channel], amount, member)
+        return
+
     # Delete message of member
     await util.delete_message(message)
 
     # Delete one message at minimum
     if amount < 0:
         amount = 0
-    # Only delete 100 messages at maximum
-    if amount > 100:
-        amount = 100
 
-    # Delete the latest amount messages in the channel that are from the member
-    deleted = []
-    async for msg in channel.history(limit=50000):
-        if msg.author == member:
-            deleted.append(msg)
-            if len(deleted) == amount:
-                break
+    # Take the latest messages of the member out of the ring buffer
+    deleted = [channel.get_partial_message(m_id) for m_id in recent_message_ids(channel.id, member.id)
+               if m_id != message.id][:amount]
 
-    await channel.delete_messages(deleted)
+    # Only page through the history for messages older than the ones the buffer covers
+    if len(deleted) < amount:
+        before = _unseen_before(channel.id, member.id)
+        limit = purge.bulk_delete_limit()
+
+        if before > limit:
+            async for msg in channel.history(limit=50000, before=Object(before)):
+                if msg.id <= limit:
+                    # Messages older than 14 days cannot be deleted in bulk
+                    break
+                if msg.author == member:
+                    deleted.append(msg)
+                    if len(deleted) == amount:
+                        break
+
+    if len(deleted) == 1:
+        try:
+            await deleted[0].delete()
+        except NotFound:
+            pass
+    elif deleted:
+        await channel.delete_messages(deleted)
 
     # Send confirmation and delete it after time
     await moderation.chat_message(channel, f'Successfully deleted {len(deleted)} messages of {member.mention}',
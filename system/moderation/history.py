@@ -0,0 +1,187 @@
+import asyncio
+from collections import OrderedDict
+from typing import Union, Optional
+
+from discord import Message, Member, User, TextChannel, Guild, Embed, Object, Forbidden, NotFound
+
+from database import select
+from system import appearance
+from utilities import util, secret
+
+# Count of entries on one page of a history
+page_size = 5
+
+# The maximum count of histories that can be browsed at the same time (the oldest one is closed first)
+max_browsers = 200
+
+# Emojis to turn the pages
+previous_emoji = '◀️'
+next_emoji = '▶️'
+
+# Kinds of histories: title and label of the user who executed the operation
+kinds = {
+    'warns': ('Warns', 'Moderator'),
+    'reports': ('Reports', 'Reported by'),
+    'mutes': ('Mutes', 'Moderator'),
+    'bans': ('Bans', 'Moderator')
+}
+
+
+class Browser:
+    """
+    State of a history message that can be browsed with reactions.
+    Attributes:
+        kind              (str): Kind of the history ('warns', 'reports', 'mutes' or 'bans')
+        user  (Union[Member, User]): User the history belongs to
+        guild_id          (int): ID of the guild
+        moderator_id      (int): ID of the moderator who is allowed to turn the pages
+        count             (int): Total count of entries
+        pages (list[list[tuple]]): Pages that were already fetched
+        page              (int): Index of the shown page
+        message       (Message): The history message
+    """
+
+    def __init__(self, kind: str, user: Union[Member, User], guild_id: int, moderator_id: int, count: int):
+        self.kind = kind
+        self.user = user
+        self.guild_id = guild_id
+        self.moderator_id = moderator_id
+        self.count = count
+        self.pages: list[list[tuple]] = []
+        self.page = 0
+        self.message: Optional[Message] = None
+        self.lock = asyncio.Lock()
+
+    @property
+    def page_count(self) -> int:
+        """Count of pages of the history"""
+        return max(1, -(-self.count // page_size))
+
+    def fetch_page(self, index: int) -> list[tuple]:
+        """
+        Get a page of the history. Pages are fetched one after another and stay cached while the history is open.
+        :param index: Index of the page
+        :return: Entries on the page
+        """
+        while len(self.pages) <= index:
+            # Continue after the last entry of the previous page
+            after = None
+            if self.pages:
+                last = self.pages[-1][-1]
+                after = (last[3], last[0])
+
+            page = select.mod_operations_page(self.kind, self.user.id, self.guild_id, limit=page_size, after=after)
+            if not page:
+                break
+            self.pages.append(page)
+
+        return self.pages[index] if index < len(self.pages) else []
+
+    def embed(self) -> Embed:
+        """
+        Create the embed of the shown page
+        :return: Embed of the page
+        """
+        title, label = kinds[self.kind]
+        desc = f'{self.user.mention} has **{self.count} {self.kind}** total.'
+        if self.count > 0:
+            desc += '\n\u200b'
+
+        embed = Embed(title=f'{title} - {self.user.display_name}', description=desc,
+                      colour=appearance.moderation_color)
+
+        # Add entries to embed
+        for _, executor_id, reason, date, until_date in self.fetch_page(self.page):
+            value = f'• {label}: <@{executor_id}>'
+            if until_date:
+                value += f'\n• Until: {util.iso_to_datetime(until_date).strftime("%Y.%m.%d %H:%M")}'
+            if reason:
+                value += f'\n• Reason: {reason}'
+
+            embed.add_field(name=util.iso_to_datetime(date).strftime('%Y.%m.%d'), value=value, inline=False)
+
+        if self.page_count > 1:
+            embed.set_footer(text=f'Page {self.page + 1} of {self.page_count}')
+
+        return embed
+
+
+# Open histories by message ID (the least recently used ones are closed first)
+_browsers: OrderedDict[int, Browser] = OrderedDict()
+
+
+def count(kind: str, user_id: int, guild_id: int) -> int:
+    """
+    Count the entries of a history
+    :param kind: Kind of the history
+    :param user_id: ID of the user
+    :param guild_id: ID of the guild
+    :return: Count of entries
+    """
+    if kind == 'warns':
+        # Warns are counted by the warn counter
+        return select.count_warns(user_id, guild_id)
+
+    return select.count_mod_operations(kind, user_id, guild_id)
+
+
+async def history_cmd(message: Message, user: Union[Member, User], kind: str) -> None:
+    """
+    Send the history of mod operations of the user. The moderator can turn the pages with reactions.
+    :param message: Message of command execution
+    :param user: User to get the history of
+    :param kind: Kind of the history ('warns', 'reports', 'mutes' or 'bans')
+    """
+    # Initialize varaibles
+    channel: TextChannel = message.channel
+    guild: Guild = message.guild
+
+    # Delete message of member
+    await util.delete_message(message)
+
+    browser = Browser(kind, user, guild.id, message.author.id, count(kind, user.id, guild.id))
+    browser.message = await channel.send(embed=browser.embed())
+
+    if browser.page_count > 1:
+        # Register the history to turn the pages
+        _browsers[browser.message.id] = browser
+        while len(_browsers) > max_browsers:
+            _browsers.popitem(last=False)
+
+        await browser.message.add_reaction(previous_emoji)
+        await browser.message.add_reaction(next_emoji)
+
+
+async def turn_page(message_id: int, user_id: int, emoji: str) -> None:
+    """
+    Turn the page of a history if the moderator who requested it reacted
+    :param message_id: ID of the message the reaction was added to
+    :param user_id: ID of the user who reacted
+    :param emoji: Emoji of the reaction
+    """
+    browser = _browsers.get(message_id)
+    if not browser or emoji not in (previous_emoji, next_emoji) or user_id == secret.bot_id:
+        # Ignore other messages and the reactions of the bot
+        return
+
+    try:
+        # Remove the reaction so it can be used again
+        await browser.message.remove_reaction(emoji, Object(user_id))
+    except (Forbidden, NotFound):
+        pass
+
+    if user_id != browser.moderator_id:
+        return
+
+    _browsers.move_to_end(message_id)
+
+    async with browser.lock:
+        # Show the previous or next page and wrap around
+        step = -1 if emoji == previous_emoji else 1
+        browser.page = (browser.page + step) % browser.page_count
+
+        try:
+            await browser.message.edit(embed=browser.embed())
+        except NotFound:
+            # The history was deleted
+            _browsers.pop(message_id, None)
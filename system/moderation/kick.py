@@ -1,5 +1,5 @@
 from discord import Message, Member, TextChannel, Guild, Client
-from system import appearance, permission
+from system import appearance, permission, direct_messages
 from utilities import util, secret
 from system.moderation import moderation
 
@@ -14,9 +14,11 @@ async def kick(member: Member, moderator: Member, client: Client, reason: str =
     """
     guild: Guild = member.guild
     
-    # Send private message
+    # Send private message and wait for its delivery, since the member cannot receive it afterwards
     if permission.ban_kick_member(client, member):
-        await moderation.private_message(member, f'You got kicked from {guild.name}', None, moderator, Reason=reason)
+        delivery = await moderation.private_message(member, f'You got kicked from {guild.name}', None, moderator,
+                                                    Reason=reason)
+        await direct_messages.wait(delivery)
 
     # Kick member
     await guild.kick(member, reason=reason)
@@ -1,10 +1,37 @@
+import asyncio
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Union
 
-from discord import TextChannel, Member, Embed, Guild, User, Forbidden
+from discord import TextChannel, Member, Embed, Guild, User, Forbidden, NotFound
 
 from database import update, select
-from system import appearance
+from system import appearance, direct_messages
+
+# Seconds a log message waits in the buffer of its guild for further log messages
+log_flush_delay = 2
+
+# Count of buffered log messages that flushes the buffer of a guild immediately
+max_buffered_logs = 50
+
+# The maximum count of log messages packed into one embed (more are summarized)
+max_packed_logs = 10
+
+# Limits of Discord for the fields and the total characters of an embed
+max_embed_fields = 25
+max_embed_length = 6000
+
+# The maximum length of the list of users of an operation in a summary
+max_summary_value = 600
+
+# Buffered log embeds by guild ID in the order they were created
+_log_buffers: dict[int, list[Embed]] = {}
+
+# Tasks that flush the buffer of a guild after the delay by guild ID
+_log_timers: dict[int, asyncio.Task] = {}
+
+# Locks that keep the flushes of a guild in order by guild ID
+_log_locks: dict[int, asyncio.Lock] = {}
 
 
 def set_mod_log(guild: Guild, channel_id: int = None) -> None:
@@ -64,7 +91,180 @@ async def log_message(operation: str, member: Union[User, Member], moderator: Me
         if reason:
             log_embed.add_field(name='Reason', value=reason, inline=False)
 
-        await mod_log.send(embed=log_embed)
+        await _buffer_log(guild, log_embed)
+
+
+async def log_report(operation: str, members: list[Member], moderator: Member, guild: Guild, failed: int = 0,
+                     reason: str = None, color: hex = 0xa82020, **kwargs) -> None:
+    """
+    Create one log message for an operation on several members if the log message is set
+    :param operation: Operation that is logged
+    :param members: Members of operation
+    :param moderator: Moderator of operation
+    :param guild: Guild of operation
+    :param failed: Count of members the operation failed for
+    :param reason: Reason for operation
+    :param color: Color of embed
+    :param kwargs: Additional fields for embed
+    """
+    # Send log message in moderation log
+    mod_log: TextChannel = get_mod_log(guild)
+
+    if mod_log:
+        # Create embed and set up style
+        log_embed: Embed = Embed(colour=color, timestamp=datetime.utcnow())
+
+        log_embed.set_author(name=operation, icon_url=guild.icon_url)
+        log_embed.set_footer(text=moderator.display_name,
+                             icon_url=moderator.avatar_url)
+
+        log_embed.add_field(name='Users', value=str(len(members)), inline=True)
+        log_embed.add_field(
+            name='Moderator', value=moderator.mention, inline=True)
+
+        if failed:
+            log_embed.add_field(name='Failed', value=str(failed), inline=True)
+
+        for k, v in kwargs.items():
+            log_embed.add_field(name=k, value=v, inline=True)
+
+        # Add reason in case it was given
+        if reason:
+            log_embed.add_field(name='Reason', value=reason, inline=False)
+
+        # List as many members as fit into the description
+        lines = []
+        length = 0
+        for member in members:
+            line = f'{member.mention} ({member.id})'
+            if length + len(line) + 1 > 2000:
+                lines.append(f'and {len(members) - len(lines)} more')
+                break
+            lines.append(line)
+            length += len(line) + 1
+        log_embed.description = '\n'.join(lines)
+
+        await _buffer_log(guild, log_embed)
+
+
+async def _buffer_log(guild: Guild, embed: Embed) -> None:
+    """
+    Add a log embed to the buffer of the guild. The buffer is flushed after a short delay or when it is full.
+    :param guild: Guild of the log message
+    :param embed: Log embed
+    """
+    buffer = _log_buffers.setdefault(guild.id, [])
+    buffer.append(embed)
+
+    if len(buffer) >= max_buffered_logs:
+        # Flush a full buffer right away
+        timer = _log_timers.pop(guild.id, None)
+        if timer:
+            timer.cancel()
+        await flush_logs(guild)
+    elif guild.id not in _log_timers:
+        _log_timers[guild.id] = asyncio.create_task(_flush_logs_later(guild))
+
+
+async def _flush_logs_later(guild: Guild) -> None:
+    """
+    Flush the buffer of the guild after the delay
+    :param guild: Guild to flush the buffer of
+    """
+    await asyncio.sleep(log_flush_delay)
+    _log_timers.pop(guild.id, None)
+    await flush_logs(guild)
+
+
+async def flush_logs(guild: Guild) -> None:
+    """
+    Send the buffered log embeds of the guild. A single embed is sent as it is, up to max_packed_logs are packed into
+    one embed and larger bursts are summarized.
+    :param guild: Guild to flush the buffer of
+    """
+    async with _log_locks.setdefault(guild.id, asyncio.Lock()):
+        embeds = _log_buffers.pop(guild.id, [])
+        mod_log: TextChannel = get_mod_log(guild)
+
+        if not embeds or not mod_log:
+            return
+
+        if len(embeds) == 1:
+            embed = embeds[0]
+        elif len(embeds) <= max_packed_logs:
+            embed = _pack_logs(embeds)
+        else:
+            embed = _summarize_logs(embeds)
+
+        try:
+            await mod_log.send(embed=embed)
+        except (Forbidden, NotFound):
+            pass
+
+
+def _pack_logs(embeds: list[Embed]) -> Embed:
+    """
+    Pack several log embeds into one embed with a field per log message
+    :param embeds: Log embeds in the order they were created
+    :return: Packed embed
+    """
+    packed: Embed = Embed(colour=embeds[-1].colour, timestamp=embeds[-1].timestamp)
+    packed.set_author(name=f'{len(embeds)} Moderation Actions')
+
+    for embed in embeds:
+        # Join the fields of the log message into the value of its field
+        lines = [f'**{field.name}:** {field.value}' for field in embed.fields]
+        value = '\n'.join(lines)
+        if embed.description:
+            value = embed.description.split('\n')[0] + '\n' + value
+        if len(value) > 500:
+            value = value[:497] + '...'
+
+        packed.add_field(name=f'{embed.author.name} • {embed.timestamp.strftime("%H:%M:%S")}', value=value,
+                         inline=False)
+
+    return packed
+
+
+def _summarize_logs(embeds: list[Embed]) -> Embed:
+    """
+    Summarize a burst of log embeds in one embed with the count of each operation
+    :param embeds: Log embeds in the order they were created
+    :return: Summary embed
+    """
+    summary: Embed = Embed(colour=embeds[-1].colour, timestamp=embeds[-1].timestamp)
+    summary.set_author(name=f'{len(embeds)} Moderation Actions')
+    summary.description = (f'From {embeds[0].timestamp.strftime("%H:%M:%S")} '
+                           f'to {embeds[-1].timestamp.strftime("%H:%M:%S")} (UTC)')
+
+    # Count the operations in the order they first occured
+    operations = list(Counter(embed.author.name for embed in embeds).items())
+
+    # Characters left for the fields (keeps room for the field of the left out operations)
+    remaining = max_embed_length - len(summary.author.name) - len(summary.description) - 50
+
+    for index, (operation, count) in enumerate(operations):
+        # List the users of the operation
+        users = [field.value for embed in embeds if embed.author.name == operation
+                 for field in embed.fields if field.name == 'User']
+        value = ', '.join(users) or '\u200b'
+        if len(value) > max_summary_value:
+            # Cut after the last complete user (or hard if there is no comma)
+            cut = value.rfind(',', 0, max_summary_value - 20)
+            value = value[:cut if cut != -1 else max_summary_value - 20] + ', ...'
+
+        name = f'{operation} ({count})'
+        last_field = index == max_embed_fields - 1 and len(operations) > max_embed_fields
+        if last_field or len(name) + len(value) > remaining:
+            # Count the operations that don't fit into the embed
+            left_out = sum(count for _, count in operations[index:])
+            summary.add_field(name='More', value=f'{left_out} further actions', inline=False)
+            break
+
+        summary.add_field(name=name, value=value, inline=False)
+        remaining -= len(name) + len(value)
+
+    return summary
 
 
 async def chat_message(channel: TextChannel, text: str, color: hex, moderator: Member = None) -> None:
@@ -89,15 +289,16 @@ async def chat_message(channel: TextChannel, text: str, color: hex, moderator: M
 
 
 async def private_message(member: Member, title: str = None, description: str = None, moderator: Member = None,
-                          color: hex = appearance.moderation_color, **kwargs) -> None:
+                          color: hex = appearance.moderation_color, **kwargs) -> asyncio.Future:
     """
-    Send message in chat and delete it after 10 seconds
+    Queue a direct message to the member. The message is delivered in the background.
     :param member: Member to send message to
     :param title: Title of embed
     :param description: Description of embed
     :param moderator: Moderator of operation (added to footer)
     :param color: Color of embed
     :param kwargs: Fields
+    :return: Future that results in whether the message was delivered
     """
     # Create embed
     embed: Embed = Embed(title=title, description=description, colour=color)
@@ -112,11 +313,8 @@ async def private_message(member: Member, title: str = None, description: str =
         if value:
             embed.add_field(name=name, value=value)
 
-    # Try to send embed
-    try:
-        await member.send(embed=embed)
-    except Forbidden:
-        pass
+    # Queue embed for delivery in the background
+    return direct_messages.send(member, embed)
 
 
 def get_duration(duration_amount: int, duration_unit: str) -> tuple[timedelta, str]:
@@ -7,7 +7,7 @@ from database import delete, select, insert, update
 from database.manager import DatabaseEntryError
 from database.select import Mute
 from utilities import secret, util
-from system import appearance, permission
+from system import appearance, permission, coordination
 from system.moderation import moderation
 
 
@@ -269,8 +269,8 @@ async def check_expired(client: Client) -> None:
     Handles expired temporary mutes
     :param client: Bot client
     """
-    # Fetch expired mutes
-    expired_mutes: list[Mute] = select.expired_mutes()
+    # Fetch expired mutes on the guilds of this process
+    expired_mutes: list[Mute] = [m for m in select.expired_mutes() if coordination.owns(m.guild_id)]
 
     # Unmute them
     for mute_entry in expired_mutes:
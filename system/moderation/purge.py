@@ -0,0 +1,212 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from discord import Message, TextChannel, Embed, Member, Object, NotFound, Forbidden, HTTPException
+from discord.utils import time_snowflake
+
+from system import appearance
+from utilities import util
+
+# The maximum count of messages deleted by one purge per channel
+max_purge_amount = 10000
+
+# The maximum count of messages deleted with one bulk delete
+chunk_size = 100
+
+# The maximum count of channels purged at the same time
+max_concurrent_channels = 3
+
+# Seconds between two updates of the progress message
+progress_interval = 2
+
+# Emoji to cancel a purge
+cancel_emoji = '❌'
+
+# Running purges: ID of the moderator and cancel event by ID of the progress message
+_purges: dict[int, tuple[int, asyncio.Event]] = {}
+
+
+def bulk_delete_limit() -> int:
+    """
+    Get the lowest message ID that can still be deleted in bulk (messages are at most 14 days old)
+    :return: Snowflake of 14 days ago
+    """
+    return time_snowflake(datetime.utcnow() - timedelta(days=14))
+
+
+def cancel(message_id: int, user_id: int) -> bool:
+    """
+    Cancel a running purge. Only the moderator who started the purge can cancel it.
+    :param message_id: ID of the progress message
+    :param user_id: ID of the user who wants to cancel the purge
+    :return: Whether a purge was cancelled
+    """
+    purge = _purges.get(message_id)
+    if not purge or purge[0] != user_id:
+        return False
+
+    purge[1].set()
+    return True
+
+
+async def purge_channel(channel: TextChannel, amount: int, before: Message, progress: dict[int, int],
+                        cancelled: asyncio.Event, check: Callable[[Message], bool] = None) -> None:
+    """
+    Delete the latest amount messages in the channel. The history is paged lazily and deleted in chunks of bulk
+    deletes. Messages older than 14 days are deleted one by one.
+    :param channel: Channel to purge
+    :param amount: Amount of messages that should be deleted
+    :param before: Messages sent after this message are kept
+    :param progress: Count of deleted messages by channel ID (updated while purging)
+    :param cancelled: Event that stops the purge when set
+    :param check: Only delete the messages the check returns True for
+    """
+    limit = bulk_delete_limit()
+    chunk: list[Message] = []
+    found = 0
+
+    async def delete_chunk() -> None:
+        """Delete the collected chunk in bulk"""
+        if len(chunk) == 1:
+            await _delete_single(chunk[0])
+        elif chunk:
+            await channel.delete_messages(chunk)
+        progress[channel.id] += len(chunk)
+        chunk.clear()
+
+    async for msg in channel.history(limit=None, before=Object(before.id)):
+        if cancelled.is_set() or found == amount:
+            break
+
+        # Skip pinned messages and the messages that don't match the check
+        if msg.pinned or (check and not check(msg)):
+            continue
+        found += 1
+
+        if msg.id > limit:
+            # Collect messages that can be deleted in bulk
+            chunk.append(msg)
+            if len(chunk) == chunk_size:
+                await delete_chunk()
+        else:
+            # Delete the collected messages and delete old messages one by one
+            await delete_chunk()
+            await _delete_single(msg)
+            progress[channel.id] += 1
+
+    if not cancelled.is_set():
+        await delete_chunk()
+
+
+async def _delete_single(message: Message) -> None:
+    """
+    Delete a single message and ignore it if it was already deleted
+    :param message: Message to delete
+    """
+    try:
+        await message.delete()
+    except NotFound:
+        pass
+
+
+def _progress_embed(channels: list[TextChannel], progress: dict[int, int], status: str,
+                    member: Optional[Member]) -> Embed:
+    """
+    Create the embed that shows the progress of a purge
+    :param channels: Channels that are purged
+    :param progress: Count of deleted messages by channel ID
+    :param status: Status of the purge
+    :param member: Member whose messages are purged
+    :return: Progress embed
+    """
+    title = f'Purge of {member.display_name}' if member else 'Purge'
+    lines = [f'{channel.mention}: {progress[channel.id]} deleted' for channel in channels]
+
+    embed = Embed(title=title, description='\n'.join(lines), colour=appearance.moderation_color)
+    embed.set_footer(text=status)
+    return embed
+
+
+async def purge(message: Message, channels: list[TextChannel], amount: int, member: Member = None) -> None:
+    """
+    Delete the latest amount messages in each of the channels, posts the progress and can be cancelled with a
+    reaction by the moderator
+    :param message: Message of command call
+    :param channels: Channels to purge
+    :param amount: Amount of messages that should be deleted per channel
+    :param member: Only delete the messages of this member
+    """
+    # Delete message of member
+    await util.delete_message(message)
+
+    amount = max(0, min(amount, max_purge_amount))
+    check = (lambda m: m.author.id == member.id) if member else None
+
+    # Count of deleted messages by channel ID
+    progress = {channel.id: 0 for channel in channels}
+    cancelled = asyncio.Event()
+
+    # Send progress message which cancels the purge on reaction
+    progress_msg: Message = await message.channel.send(
+        embed=_progress_embed(channels, progress, f'Purging... React with {cancel_emoji} to cancel', member))
+    await progress_msg.add_reaction(cancel_emoji)
+    _purges[progress_msg.id] = (message.author.id, cancelled)
+
+    # Purge the channels concurrently under the limit
+    semaphore = asyncio.Semaphore(max_concurrent_channels)
+
+    async def run(channel: TextChannel) -> None:
+        """Purge a channel when the limit allows it"""
+        async with semaphore:
+            if not cancelled.is_set():
+                try:
+                    await purge_channel(channel, amount, message, progress, cancelled, check)
+                except HTTPException:
+                    # Stop the other channels before the failure is reported
+                    for other in channel_tasks:
+                        if other is not asyncio.current_task():
+                            other.cancel()
+                    raise
+
+    channel_tasks = [asyncio.create_task(run(channel)) for channel in channels]
+    task = asyncio.gather(*channel_tasks, return_exceptions=True)
+
+    # Update the progress message until the purge is done
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=progress_interval)
+            if not task.done():
+                try:
+                    await progress_msg.edit(embed=_progress_embed(
+                        channels, progress, f'Purging... React with {cancel_emoji} to cancel', member))
+                except NotFound:
+                    # The progress message was deleted, keep purging without it
+                    pass
+
+        status = 'Cancelled' if cancelled.is_set() else 'Done'
+        for result in task.result():
+            # Cancelled channels return a CancelledError, which isn't an Exception
+            if isinstance(result, Forbidden):
+                status = 'Stopped: I am missing permissions to delete messages'
+                break
+            elif isinstance(result, HTTPException):
+                status = 'Stopped: Discord refused to delete the messages'
+                break
+            elif isinstance(result, Exception):
+                raise result
+    finally:
+        _purges.pop(progress_msg.id, None)
+
+        # Stop the channels if the purge failed before they were done
+        if not task.done():
+            cancelled.set()
+            for channel_task in channel_tasks:
+                channel_task.cancel()
+
+    # Show the result
+    try:
+        await progress_msg.edit(embed=_progress_embed(channels, progress, status, member))
+        await progress_msg.clear_reactions()
+    except (Forbidden, NotFound):
+        pass
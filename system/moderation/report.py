@@ -1,11 +1,10 @@
-from discord import Message, Member, TextChannel, Guild, Embed, Client, User
+from discord import Message, Member, TextChannel, Guild, Embed
 from datetime import datetime
 
-from database.select import Report
 from utilities import util, secret
 from system import permission, appearance
-from system.moderation import moderation
-from database import insert, select
+from system.moderation import moderation, history
+from database import insert
 
 
 async def report_cmd(message: Message, member: Member, reason: str) -> None:
@@ -61,46 +60,14 @@ async def report_cmd(message: Message, member: Member, reason: str) -> None:
     await mod_log.send(embed=log_embed)
 
 
-async def reports_of_member_cmd(client: Client, message: Message, member: Member) -> None:
+async def reports_of_member_cmd(message: Message, member: Member) -> None:
     """
-    Get a list of the reports of the member on a guild
-    :param client: Bot client
+    Get the reports of the member on a guild. The moderator can turn the pages with reactions.
     :param message: Message of command execution
     :param member: Member to get reports of
     """
-    # Initialize varaibles
-    channel: TextChannel = message.channel
-    guild: Guild = message.guild
-    mod_log = moderation.get_mod_log(guild)
-
-    if not mod_log:
+    if not moderation.get_mod_log(message.guild):
         # Ignore if the moderation log is not set up
         raise Exception('Moderation log must be set up')
 
-    # Delete message of member
-    await util.delete_message(message)
-
-    # Get count of warns of member
-    count = select.count_reports(member.id, guild.id)
-
-    # Fetch warns
-    reports: list[Report] = select.reports_of_user(member.id, guild.id, limit=5)
-
-    # Create embed
-    desc = f'{member.mention} has **{count} reports** total.'
-    if count > 0:
-        desc += '\n\u200b'
-    if count > 5:
-        desc += '\n**Here are the latest 5 reports:**'
-
-    embed = Embed(title=f'Reports - {member.display_name}', description=desc, colour=appearance.moderation_color)
-
-    # Add reports to embed
-    for r in reports:
-        reported_by: User = await client.fetch_user(r.reporter_id)
-        date: datetime = r.date
-
-        embed.add_field(name=date.strftime("%Y.%m.%d"), value=f'• Moderator: {reported_by.mention}'
-                                                              f'\n• Reason: {r.reason}', inline=False)
-
-    await channel.send(embed=embed)
+    await history.history_cmd(message, member, 'reports')
@@ -2,8 +2,88 @@ from discord import Member, Client, Guild, Role
 from discord.ext.commands import Context
 
 from database import select
+from system import coordination
 from utilities import util, secret
 
+# The maximum count of memoized permission levels per guild
+max_levels = 1000
+
+# IDs of the roles in the database by type ('ADMIN', 'MODERATOR', 'SUPPORTER' or 'AUTOROLE') by guild ID
+_role_ids: dict[int, dict[str, frozenset[int]]] = {}
+
+# Memoized permission levels (0: none, 1: moderator role, 2: admin role) by guild ID and member ID and role IDs
+_levels: dict[int, dict[tuple[int, frozenset[int]], int]] = {}
+
+
+def role_ids(guild_id: int, type_: str) -> frozenset[int]:
+    """
+    Get the IDs of the roles of a type on the guild. All roles of the guild are loaded with one query and cached
+    until they are invalidated.
+    :param guild_id: ID of the guild
+    :param type_: Type of the roles ('ADMIN', 'MODERATOR', 'SUPPORTER' or 'AUTOROLE')
+    :return: IDs of the roles
+    """
+    if guild_id not in _role_ids:
+        roles: dict[str, set[int]] = {}
+        for role_id, role_type in select.roles_of_guild(guild_id):
+            roles.setdefault(role_type, set()).add(role_id)
+
+        _role_ids[guild_id] = {t: frozenset(ids) for t, ids in roles.items()}
+
+    return _role_ids[guild_id].get(type_, frozenset())
+
+
+def invalidate_roles(guild_id: int) -> None:
+    """
+    Drop the cached roles and permission levels of a guild. Has to be called whenever roles of the guild change in
+    the database.
+    :param guild_id: ID of the guild
+    """
+    _forget_roles(guild_id)
+    coordination.publish('roles', guild_id)
+
+
+def _forget_roles(guild_id: int) -> None:
+    """
+    Drop the cached roles and permission levels of a guild in this process
+    :param guild_id: ID of the guild
+    """
+    _role_ids.pop(guild_id, None)
+    _levels.pop(guild_id, None)
+
+
+coordination.register('roles', _forget_roles)
+
+
+def _role_level(member: Member) -> int:
+    """
+    Get the permission level the roles of the member grant on the guild
+    :param member: Member to get the level of
+    :return: 2 if the member has an admin role, 1 if the member has a moderator role and 0 else
+    """
+    guild_id = member.guild.id
+    member_role_ids = frozenset(role.id for role in member.roles)
+    key = (member.id, member_role_ids)
+
+    levels = _levels.setdefault(guild_id, {})
+    level = levels.get(key)
+
+    if level is None:
+        # Compute the level out of the cached roles of the guild
+        if member_role_ids & role_ids(guild_id, 'ADMIN'):
+            level = 2
+        elif member_role_ids & role_ids(guild_id, 'MODERATOR'):
+            level = 1
+        else:
+            level = 0
+
+        # Forget the memoized levels of the guild if there are too many
+        if len(levels) >= max_levels:
+            levels.clear()
+        levels[key] = level
+
+    return level
+
 
 def is_admin(ctx: Context = None, member: Member = None) -> bool:
     """
@@ -24,11 +104,8 @@ def is_admin(ctx: Context = None, member: Member = None) -> bool:
         return True
 
     # Check whether member has a role declared as admin
-    admin_roles = select.admin_roles(guild_id=member.guild.id)
-
-    for m_role in member.roles:
-        if m_role.id in admin_roles:
-            return True
+    if _role_level(member) == 2:
+        return True
     else:
         return member.id in secret.dev_ids
 
@@ -48,11 +125,8 @@ def is_mod(ctx: Context = None, member: Member = None) -> bool:
             None, 'Either ctx or member has to be given')
 
     # Check whether member has a role declared as mod
-    mod_roles = select.moderator_roles(guild_id=member.guild.id)
-
-    for m_role in member.roles:
-        if m_role.id in mod_roles:
-            return True
+    if _role_level(member) >= 1:
+        return True
     else:
         # Return whether the member is admin
         return is_admin(ctx=ctx, member=member)
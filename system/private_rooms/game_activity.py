@@ -0,0 +1,151 @@
+from collections import Counter
+from typing import Optional
+
+from discord import Member, VoiceChannel, Game
+
+# The games of the members in private rooms by room channel ID and member ID
+_member_games: dict[int, dict[int, tuple[str, ...]]] = {}
+
+# How many members play a game by room channel ID
+_game_counts: dict[int, Counter] = {}
+
+# The main game by room channel ID
+_main_games: dict[int, Optional[str]] = {}
+
+
+def get_games(member: Member) -> tuple[str, ...]:
+    """
+    Get the names of the games the member plays
+    :param member: Member to get the games of
+    :return: Names of the games
+    """
+    return tuple(sorted({a.name for a in member.activities if isinstance(a, Game)}))
+
+
+def is_tracked(channel_id: int) -> bool:
+    """
+    Check whether the game activity of a private room is tracked
+    :param channel_id: ID of the room channel
+    :return: Whether the room is tracked
+    """
+    return channel_id in _member_games
+
+
+def main_game(channel_id: int) -> Optional[str]:
+    """
+    Get the game most members of a private room play
+    :param channel_id: ID of the room channel
+    :return: Name of the main game
+    """
+    return _main_games.get(channel_id)
+
+
+def track_room(channel: VoiceChannel) -> None:
+    """
+    Start tracking the game activity of a private room with its current members
+    :param channel: Channel of the private room
+    """
+    _member_games[channel.id] = {}
+    _game_counts[channel.id] = Counter()
+    _main_games[channel.id] = None
+
+    for member in channel.members:
+        update_member(channel.id, member)
+
+
+def untrack_room(channel_id: int) -> None:
+    """
+    Stop tracking the game activity of a private room
+    :param channel_id: ID of the room channel
+    """
+    _member_games.pop(channel_id, None)
+    _game_counts.pop(channel_id, None)
+    _main_games.pop(channel_id, None)
+
+
+def add_member(channel: VoiceChannel, member: Member) -> bool:
+    """
+    Add a member to the game activity of a private room. Starts tracking the room if it isn't tracked yet.
+    :param channel: Channel of the private room
+    :param member: Member that joined the room
+    :return: Whether the main game of the room changed
+    """
+    if not is_tracked(channel.id):
+        track_room(channel)
+        return update_member(channel.id, member) or main_game(channel.id) is not None
+
+    return update_member(channel.id, member)
+
+
+def update_member(channel_id: int, member: Member) -> bool:
+    """
+    Refresh the games of a member in a tracked private room
+    :param channel_id: ID of the room channel
+    :param member: Member to refresh the games of
+    :return: Whether the main game of the room changed
+    """
+    if not is_tracked(channel_id):
+        # Ignore rooms that aren't tracked
+        return False
+
+    members = _member_games[channel_id]
+    games = get_games(member)
+
+    if member.id in members and members[member.id] == games:
+        # Ignore if the games have not changed
+        return False
+
+    # Replace the old games of the member in the counts
+    _remove_games(channel_id, members.get(member.id, ()))
+    _game_counts[channel_id].update(games)
+    members[member.id] = games
+
+    return _refresh_main_game(channel_id)
+
+
+def remove_member(channel_id: int, member_id: int) -> bool:
+    """
+    Remove a member from the game activity of a tracked private room
+    :param channel_id: ID of the room channel
+    :param member_id: ID of the member that left the room
+    :return: Whether the main game of the room changed
+    """
+    if not is_tracked(channel_id) or member_id not in _member_games[channel_id]:
+        return False
+
+    _remove_games(channel_id, _member_games[channel_id].pop(member_id))
+
+    return _refresh_main_game(channel_id)
+
+
+def _remove_games(channel_id: int, games: tuple[str, ...]) -> None:
+    """
+    Remove games from the counts of a private room
+    :param channel_id: ID of the room channel
+    :param games: Names of the games to remove
+    """
+    counts = _game_counts[channel_id]
+    for game in games:
+        counts[game] -= 1
+        if counts[game] <= 0:
+            del counts[game]
+
+
+def _refresh_main_game(channel_id: int) -> bool:
+    """
+    Refresh the main game of a private room. The current main game is kept on a tie.
+    :param channel_id: ID of the room channel
+    :return: Whether the main game changed
+    """
+    counts = _game_counts[channel_id]
+    current = _main_games[channel_id]
+
+    if not counts:
+        game = None
+    elif current in counts and counts[current] == max(counts.values()):
+        game = current
+    else:
+        game = max(counts, key=counts.get)
+
+    _main_games[channel_id] = game
+    return game != current
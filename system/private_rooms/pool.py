@@ -0,0 +1,154 @@
+import asyncio
+from typing import Optional
+
+from discord import Guild, VoiceChannel, CategoryChannel, PermissionOverwrite, Client, NotFound, Forbidden
+
+from database import select, insert, delete
+from system.private_rooms import private_rooms
+
+# The name of the hidden channels that wait in the pool
+pool_channel_name = 'Private Room'
+
+# The maximum count of channels in the pool of a guild
+max_pool_size = 10
+
+# IDs of the channels in the pool by guild ID (stored in pr_pool_channels to take them over after a restart)
+_pools: dict[int, list[int]] = {}
+
+# IDs of the guilds whose pool is refilled at the moment
+_refilling: set[int] = set()
+
+
+def get_pool_size(guild: Guild) -> int:
+    """
+    Get the configured size of the channel pool of a guild
+    :param guild: Guild to get the pool size of
+    :return: Size of the pool
+    """
+    return select.pr_pool_size(guild.id) or 0
+
+
+def is_pool_channel(channel: VoiceChannel) -> bool:
+    """
+    Check whether the channel waits in the pool of its guild
+    :param channel: Channel to check
+    :return: Whether the channel is in the pool
+    """
+    return channel.id in _pools.get(channel.guild.id, [])
+
+
+def claim_channel(guild: Guild) -> Optional[VoiceChannel]:
+    """
+    Take a channel out of the pool of the guild and refill the pool in the background
+    :param guild: Guild to claim a channel on
+    :return: The claimed channel or None if the pool is empty
+    """
+    pool = _pools.get(guild.id, [])
+
+    while pool:
+        channel_id = pool.pop(0)
+        delete.pool_channel(channel_id)
+
+        channel: VoiceChannel = guild.get_channel(channel_id)
+        if channel:
+            refill_pool(guild)
+            return channel
+
+    return None
+
+
+def discard_channel(channel: VoiceChannel) -> None:
+    """
+    Remove a channel out of the pool of its guild
+    :param channel: Channel to remove
+    """
+    pool = _pools.get(channel.guild.id, [])
+    if channel.id in pool:
+        pool.remove(channel.id)
+        delete.pool_channel(channel.id)
+
+
+def refill_pool(guild: Guild) -> None:
+    """
+    Refill the pool of the guild in the background
+    :param guild: Guild to refill the pool on
+    """
+    if guild.id not in _refilling:
+        _refilling.add(guild.id)
+        asyncio.create_task(fill_pool(guild))
+
+
+async def fill_pool(guild: Guild) -> None:
+    """
+    Create hidden channels until the pool of the guild has its configured size and delete the ones over the size
+    :param guild: Guild to fill the pool on
+    """
+    _refilling.add(guild.id)
+    pool = _pools.setdefault(guild.id, [])
+
+    try:
+        category: CategoryChannel = private_rooms.get_category(guild)
+        size = min(get_pool_size(guild), max_pool_size) if category else 0
+
+        # Hide the channels for everyone except the bot
+        overwrites = {guild.default_role: PermissionOverwrite(view_channel=False, connect=False),
+                      guild.me: PermissionOverwrite(view_channel=True, connect=True)}
+
+        # Create missing channels
+        while len(pool) < size:
+            channel: VoiceChannel = await guild.create_voice_channel(pool_channel_name, category=category,
+                                                                     overwrites=overwrites,
+                                                                     reason='Refilled private room pool')
+            pool.append(channel.id)
+            insert.pool_channel(channel.id, guild.id)
+
+        # Delete channels over the size
+        while len(pool) > size:
+            channel_id = pool.pop()
+            delete.pool_channel(channel_id)
+
+            channel: VoiceChannel = guild.get_channel(channel_id)
+            if channel:
+                await channel.delete(reason='Reduced private room pool')
+    except (NotFound, Forbidden):
+        pass
+    finally:
+        _refilling.discard(guild.id)
+
+
+async def clear_pool(guild: Guild) -> None:
+    """
+    Delete all channels in the pool of the guild
+    :param guild: Guild to clear the pool on
+    """
+    for channel_id in _pools.pop(guild.id, []):
+        delete.pool_channel(channel_id)
+
+        channel: VoiceChannel = guild.get_channel(channel_id)
+        try:
+            if channel:
+                await channel.delete(reason='Disabled private rooms')
+        except NotFound:
+            pass
+
+
+def load_pools(client: Client) -> None:
+    """
+    Take over the pooled channels that are left from before a restart and refill the pools of all guilds
+    :param client: Bot client
+    """
+    for category_id, guild_id in select.all_pr_categories():
+        guild: Guild = client.get_guild(guild_id)
+        category: CategoryChannel = guild.get_channel(category_id) if guild else None
+        if not category:
+            continue
+
+        # Only channels the pool created are taken over (channels deleted in the meantime are forgotten)
+        pool = _pools[guild.id] = []
+        for channel_id in select.pool_channels(guild.id):
+            if guild.get_channel(channel_id):
+                pool.append(channel_id)
+            else:
+                delete.pool_channel(channel_id)
+
+        refill_pool(guild)
@@ -11,7 +11,8 @@ from database import insert, update, select, delete
 from database.manager import connection, DatabaseEntryError
 from database.select import PrivateRoom
 from system import roles
-from system.private_rooms import settings
+from system.private_rooms import settings, game_activity, pool
+from system.setup import snapshot
 
 
 def get_category(guild: Guild) -> CategoryChannel:
@@ -112,6 +113,9 @@ async def setup_private_rooms(guild: Guild) -> None:
     # Setup settings channel
     await settings.setup_settings(guild)
 
+    # Create the channel pool in the background
+    pool.refill_pool(guild)
+
 
 async def disable(guild: Guild) -> None:
     """
@@ -123,6 +127,9 @@ async def disable(guild: Guild) -> None:
     cpr_channel: VoiceChannel = guild.get_channel(select.cpr_channel_id(guild.id))
     settings_channel: TextChannel = guild.get_channel(select.pr_settings_id(guild.id))
 
+    # Delete the channels of the pool
+    await pool.clear_pool(guild)
+
     # Delete channels if they exist
     try:
         if settings_channel:
@@ -147,6 +154,34 @@ async def disable(guild: Guild) -> None:
     update.cpr_channel_id(argument=guild.id, value=None)
     update.pr_settings_id(argument=guild.id, value=None)
     delete.default_pr_settings(guild.id)
+    snapshot.invalidate(guild.id)
+
+
+def get_room_overwrites(owner: Member, mod_roles: list[Role], locked: bool, hidden: bool) -> dict:
+    """
+    Create the permission overwrites of a new private room
+    :param owner: Owner of private room
+    :param mod_roles: Admin and moderator roles of the guild
+    :param locked: Whether the room is locked
+    :param hidden: Whether the room is hidden
+    :return: Permission overwrites by role or member
+    """
+    guild: Guild = owner.guild
+
+    # Add permissions for mod roles to the private room
+    overwrites = {}
+    for role in mod_roles:
+        overwrites[role] = PermissionOverwrite(view_channel=True, connect=True)
+
+    # Lock or hide the room for everyone else
+    if locked or hidden:
+        overwrites[guild.default_role] = PermissionOverwrite(connect=False if locked else None,
+                                                             view_channel=False if hidden else None)
+
+    # Add the permissions of the owner
+    overwrites[owner] = PermissionOverwrite(view_channel=True, connect=True, move_members=True)
+
+    return overwrites
 
 
 async def create_private_room(owner: Member) -> None:
@@ -158,47 +193,44 @@ async def create_private_room(owner: Member) -> None:
     guild: Guild = owner.guild
     category: CategoryChannel = get_category(guild)
 
+    # Fetch the default settings of the guild
+    locked = bool(select.default_pr_locked(guild.id))
+    hidden = bool(select.default_pr_hidden(guild.id))
+    show_game_activity = bool(select.default_pr_game_activity(guild.id))
+    user_limit = select.default_pr_user_limit(guild.id)
+
     # Get moderation and admin roles
     mod_roles: list[Role] = roles.get_admin_roles(guild)
     mod_roles.extend(roles.get_moderator_roles(guild))
 
-    # Add permissions for mod roles to the private room
-    pr_overwrites = {}
-    for role in mod_roles:
-        pr_overwrites[role] = PermissionOverwrite(view_channel=True, connect=True)
-
-    if select.default_pr_locked(guild.id) and select.default_pr_hidden(guild.id):
-        pr_overwrites[guild.default_role] = PermissionOverwrite(connect=False, view_channel=False)
-        pr_overwrites[owner] = PermissionOverwrite(connect=True, view_channel=True)
-    elif select.default_pr_locked(guild.id):
-        pr_overwrites[guild.default_role] = PermissionOverwrite(connect=False)
-        pr_overwrites[owner] = PermissionOverwrite(connect=True)
-    elif select.default_pr_hidden(guild.id):
-        pr_overwrites[guild.default_role] = PermissionOverwrite(view_channel=False)
-        pr_overwrites[owner] = PermissionOverwrite(view_channel=True)
+    # Compute all permissions of the room up front
+    pr_overwrites = get_room_overwrites(owner, mod_roles, locked, hidden)
 
     # Create name
     name = None
-    if select.default_pr_game_activity(guild.id):
-        if isinstance(owner.activity, Game):
-            name = f'Playing {owner.activity.name}'
-        else:
-            games = list(filter(lambda a: isinstance(a, Game), owner.activities))
-            if games:
-                name = f'Playing {games[0].name}'
+    if show_game_activity:
+        game = get_gameactivity(owner)
+        if game:
+            name = f'Playing {game.name}'
 
     if not name:
         name = settings.get_name(owner)
 
-    # Create private room
-    pr_channel = await guild.create_voice_channel(name=name, category=category,
-                                                  overwrites=pr_overwrites,
-                                                  user_limit=select.default_pr_user_limit(guild.id),
-                                                  reason='Created private room')
+    # Claim a channel out of the pool and set it up in a single edit or create a new one
+    pr_channel: VoiceChannel = pool.claim_channel(guild)
+    if pr_channel:
+        await pr_channel.edit(name=name, overwrites=pr_overwrites, user_limit=user_limit,
+                              reason='Created private room')
+    else:
+        pr_channel = await guild.create_voice_channel(name=name, category=category,
+                                                      overwrites=pr_overwrites,
+                                                      user_limit=user_limit,
+                                                      reason='Created private room')
 
     # Move owner into private room
     await owner.move_to(pr_channel, reason='Created private room')
 
+    text_channel: Optional[TextChannel] = None
     if select.pr_text_channel_activated(guild.id):
         # Create text channel
         text_overwrites = {guild.default_role: PermissionOverwrite(view_channel=False),
@@ -210,28 +242,23 @@ async def create_private_room(owner: Member) -> None:
                                                        overwrites=text_overwrites,
                                                        reason='Created private room')
 
-        # Insert into database
-        room_id = insert.private_room(room_channel_id=pr_channel.id, text_channel_id=text_channel.id, owner_id=owner.id,
-                                      guild_id=guild.id)
-    else:
-        room_id = insert.private_room(room_channel_id=pr_channel.id, owner_id=owner.id, guild_id=guild.id)
+    # Create the move channel of locked rooms
+    move_channel: Optional[VoiceChannel] = None
+    if locked:
+        move_channel = await settings.create_move_channel(guild, pr_channel, owner, hidden)
 
-    # Insert room settings into database
-    insert.pr_settings(room_id=room_id, hidden=select.default_pr_hidden(guild.id),
-                       user_limit=select.default_pr_user_limit(guild.id), locked=select.default_pr_locked(guild.id))
+    # Insert room and settings into database
+    room_id = insert.private_room(room_channel_id=pr_channel.id, owner_id=owner.id, guild_id=guild.id,
+                                  move_channel_id=move_channel.id if move_channel else None,
+                                  text_channel_id=text_channel.id if text_channel else None)
+    insert.pr_settings(room_id=room_id, game_activity=show_game_activity, locked=locked, user_limit=user_limit,
+                       hidden=hidden)
 
-    # Fetch database entry with settings
-    private_room: PrivateRoom = select.PrivateRoom(guild_id=guild.id, room_channel_id=pr_channel.id)
+    # Start tracking the game activity of the room
+    game_activity.add_member(pr_channel, owner)
 
-    if select.default_pr_locked(guild.id):
-        await settings.lock(guild, private_room)
-
-    if select.default_pr_game_activity(guild.id):
-        await settings.toggle_game_activity(guild, private_room)
-
-    await asyncio.sleep(0.1)
-    # Set the permissions for the owner
-    await set_owner_permissions(owner, private_room)
+    # Set the permissions for the owner in the settings and cpr channel
+    await set_owner_channel_permissions(owner)
 
 
 async def join_private_room(member: Member, channel: VoiceChannel) -> None:
@@ -251,6 +278,10 @@ async def join_private_room(member: Member, channel: VoiceChannel) -> None:
         except NotFound:
             pass
 
+    # Add the games of the member to the game activity of the room
+    if game_activity.add_member(channel, member):
+        await settings.refresh_name(guild, channel.id)
+
 
 async def leave_private_room(member: Member, channel: VoiceChannel) -> None:
     """
@@ -264,6 +295,9 @@ async def leave_private_room(member: Member, channel: VoiceChannel) -> None:
     private_room: PrivateRoom = select.PrivateRoom(guild_id=guild.id, room_channel_id=channel.id)
     owner_id = private_room.owner_id
 
+    # Remove the games of the member from the game activity of the room
+    main_game_changed = game_activity.remove_member(channel.id, member.id)
+
     # Check whether the owner left
     if member.id == owner_id:
         members: list[Member] = list(filter(lambda m: not m.bot, channel.members))
@@ -280,6 +314,8 @@ async def leave_private_room(member: Member, channel: VoiceChannel) -> None:
         owner = guild.get_member(owner_id)
         if owner:
             await remove_owner_permissions(owner, private_room)
+    elif main_game_changed:
+        await settings.refresh_name(guild, channel.id)
 
     if private_room.text_channel_id:
         text_channel: TextChannel = guild.get_channel(private_room.text_channel_id)
@@ -316,8 +352,29 @@ async def set_owner_permissions(owner: Member, private_room: PrivateRoom) -> Non
         pass
 
     # Set permissions for owner in settings and cpr channel
-    await get_settings_channel(guild).set_permissions(owner, view_channel=True)
-    await get_cpr_channel(guild).set_permissions(owner, connect=False)
+    await set_owner_channel_permissions(owner)
+
+
+async def set_owner_channel_permissions(owner: Member) -> None:
+    """
+    Set the permissions of the owner in the settings and cpr channel of the guild
+    :param owner: Owner to set permissions to
+    """
+    guild: Guild = owner.guild
+    settings_channel: TextChannel = get_settings_channel(guild)
+    cpr_channel: VoiceChannel = get_cpr_channel(guild)
+
+    # Both channels are edited at the same time
+    edits = []
+    if settings_channel:
+        edits.append(settings_channel.set_permissions(owner, view_channel=True))
+    if cpr_channel:
+        edits.append(cpr_channel.set_permissions(owner, connect=False))
+
+    try:
+        await asyncio.gather(*edits)
+    except NotFound:
+        pass
 
 
 async def remove_owner_permissions(owner: Member, private_room: PrivateRoom) -> None:
@@ -371,6 +428,9 @@ async def delete_private_room(guild: Guild, private_room: PrivateRoom) -> None:
     delete.private_room(private_room.room_id)
     delete.pr_settings(private_room.room_id)
 
+    # Stop tracking the game activity
+    game_activity.untrack_room(private_room.room_channel_id)
+
     await asyncio.sleep(0.3)
 
     # Fetch channels
@@ -415,8 +475,7 @@ async def set_owner(owner: Member, private_room: PrivateRoom) -> None:
     await set_owner_permissions(owner, private_room)
 
     # Edit the name of the private room
-    name = settings.get_name(owner)
-    await settings.set_name(name, guild, private_room)
+    await settings.refresh_name(guild, private_room.room_channel_id)
 
 
 async def delete_old_channels(message: Message, guild: Guild):
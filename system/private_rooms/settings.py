@@ -1,5 +1,6 @@
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 from discord import VoiceChannel, Guild, Role, PermissionOverwrite, CategoryChannel, Member, NotFound, TextChannel, \
     Embed, Message, Forbidden, Client, Game
@@ -7,13 +8,26 @@ from discord import VoiceChannel, Guild, Role, PermissionOverwrite, CategoryChan
 from database import update, select
 from database.manager import DatabaseEntryError
 from database.select import PrivateRoom
-from system import appearance, waiting_for_responses
-from system.private_rooms import private_rooms
+from system import appearance, waiting_for_responses, message_cache
+from system.private_rooms import private_rooms, game_activity
 from utilities import secret
 
 # The default name of private rooms
 default_name = f"<owner>'s Room"
 
+# Discord only allows a channel to be renamed twice within ten minutes
+rename_limit = 2
+rename_period = timedelta(minutes=10)
+
+# The dates of the latest renames by channel ID
+_renames: dict[int, list[datetime]] = {}
+
+# Guild IDs of private rooms whose rename was put off by room channel ID
+_pending_renames: dict[int, int] = {}
+
+# Count of renames that were avoided since the last game activity check
+_avoided_renames = 0
+
 
 def get_name(owner: Member) -> str:
     """
@@ -58,6 +72,8 @@ async def set_name(name: str, guild: Guild, private_room: PrivateRoom) -> None:
         await pr_channel.edit(name=name)
     except NotFound:
         pass
+    else:
+        _renames.setdefault(pr_channel.id, []).append(datetime.utcnow())
 
     if text_channel:
         try:
@@ -91,64 +107,141 @@ async def name_response(guild: Guild, private_room: PrivateRoom) -> None:
     update.pr_name(private_room.room_id, response)
 
 
-async def handle_game_activity(client: Client) -> None:
+def has_rename_budget(channel_id: int) -> bool:
     """
-    Refresh game activity for all active private rooms
-    :param client: Bot client
+    Check whether the channel can be renamed without running into the rate limit of Discord
+    :param channel_id: ID of the channel
+    :return: Whether the channel can be renamed
     """
-    # Get all active private rooms
-    rooms: list[PrivateRoom] = [PrivateRoom(guild_id=g_id, room_channel_id=pr_id)
-                                for pr_id, g_id
-                                in select.all_private_rooms()]
-    for room in rooms:
-        guild: Guild = client.get_guild(room.guild_id)
-        if room.game_activity:
-            # Refresh game activity
-            await check_game_activity(guild, room)
-        else:
-            # Set the name of the private room without game activity
-            if room.name:  # If there is a custom name for the private room
-                await set_name(room.name, guild, room)
-            else:
-                owner = guild.get_member(room.owner_id)
-                name = get_name(owner)
-                await set_name(name, guild, room)
+    now = datetime.utcnow()
 
+    # Forget renames that are older than the rate limit period
+    renames = [date for date in _renames.get(channel_id, []) if now - date < rename_period]
+    if renames:
+        _renames[channel_id] = renames
+    else:
+        _renames.pop(channel_id, None)
 
-async def check_game_activity(guild: Guild, private_room: PrivateRoom) -> None:
+    return len(renames) < rename_limit
+
+
+def get_main_game(guild: Guild, private_room: PrivateRoom) -> Optional[str]:
     """
-    Check the main game activity of the private room and refresh the name
+    Get the game that most members of the private room play
     :param guild: Guild of private room
     :param private_room: Private room to check game activity
+    :return: Name of the main game of the private room
     """
-    pr_channel: VoiceChannel = guild.get_channel(private_room.room_channel_id)
+    if not game_activity.is_tracked(private_room.room_channel_id):
+        # Start tracking the room with its current members
+        pr_channel: VoiceChannel = guild.get_channel(private_room.room_channel_id)
+        if not pr_channel:
+            return None
+        game_activity.track_room(pr_channel)
+
+    return game_activity.main_game(private_room.room_channel_id)
+
+
+def get_room_name(guild: Guild, private_room: PrivateRoom) -> Optional[str]:
+    """
+    Get the name the private room should have according to its settings and game activity
+    :param guild: Guild of private room
+    :param private_room: Private room to get the name of
+    :return: Name of the private room
+    """
+    if private_room.game_activity:
+        game = get_main_game(guild, private_room)
+        if game:
+            return f'Playing {game}'
+
+    if private_room.name:  # If there is a custom name for the private room
+        return private_room.name
+
     owner: Member = guild.get_member(private_room.owner_id)
+    if owner:
+        return get_name(owner)
+    return None
+
+
+async def refresh_name(guild: Guild, room_channel_id: int) -> None:
+    """
+    Rename the private room if its name changed. The rename is put off until the next game activity check if the
+    channel has no rename budget left.
+    :param guild: Guild of private room
+    :param room_channel_id: ID of the room channel
+    """
+    global _avoided_renames
+    _pending_renames.pop(room_channel_id, None)
 
-    # Create dict of games and how many members play them
-    games: dict[Game, float] = {}
-    for member in pr_channel.members:
-        for game in filter(lambda a: isinstance(a, Game), member.activities):
-            # Owner activities are more important
-            if owner.id == member.id:
-                if game in games:
-                    games[game] += 1.5
-                else:
-                    games[game] = 1.5
-            else:
-                if game in games:
-                    games[game] += 1.5
-                else:
-                    games[game] = 1.5
-
-    if games:
-        game: Game = max(games, key=games.get)
-        await set_name(f'Playing {game.name}', guild, private_room)
+    pr_channel: VoiceChannel = guild.get_channel(room_channel_id)
+    if not pr_channel:
+        # Ignore if channel does not exist anymore
+        return
+
+    try:
+        private_room = PrivateRoom(guild_id=guild.id, room_channel_id=room_channel_id)
+    except DatabaseEntryError:
+        return
+
+    name = get_room_name(guild, private_room)
+
+    if not name or pr_channel.name == name:
+        # Skip rooms whose name has not changed
+        _avoided_renames += 1
+    elif not has_rename_budget(room_channel_id):
+        # Put off the rename until the channel can be renamed again
+        _avoided_renames += 1
+        _pending_renames[room_channel_id] = guild.id
     else:
-        if private_room.name:
-            await set_name(private_room.name, guild, private_room)
+        await set_name(name, guild, private_room)
+
+
+def load_game_activity(client: Client) -> None:
+    """
+    Start tracking the game activity of all active private rooms and refresh their names with the next check
+    :param client: Bot client
+    """
+    for pr_id, g_id in select.all_private_rooms():
+        guild: Guild = client.get_guild(g_id)
+        pr_channel: VoiceChannel = guild.get_channel(pr_id) if guild else None
+
+        if pr_channel:
+            game_activity.track_room(pr_channel)
+            _pending_renames[pr_id] = g_id
+
+
+async def handle_game_activity(client: Client) -> int:
+    """
+    Retry the renames of private rooms that were put off because the channels had no rename budget left
+    :param client: Bot client
+    :return: Count of renames that were avoided since the last check
+    """
+    global _avoided_renames
+
+    for pr_id, g_id in list(_pending_renames.items()):
+        guild: Guild = client.get_guild(g_id)
+        if guild:
+            await refresh_name(guild, pr_id)
         else:
-            name = get_name(owner)
-            await set_name(name, guild, private_room)
+            _pending_renames.pop(pr_id, None)
+
+    # Forget the renames that are older than the rate limit period
+    for channel_id in list(_renames):
+        has_rename_budget(channel_id)
+
+    avoided_renames, _avoided_renames = _avoided_renames, 0
+    return avoided_renames
+
+
+async def check_game_activity(guild: Guild, private_room: PrivateRoom) -> None:
+    """
+    Check the main game activity of the private room and refresh the name
+    :param guild: Guild of private room
+    :param private_room: Private room to check game activity
+    """
+    name = get_room_name(guild, private_room)
+    if name:
+        await set_name(name, guild, private_room)
 
 
 async def toggle_game_activity(guild: Guild, private_room: PrivateRoom) -> None:
@@ -169,6 +262,30 @@ async def toggle_game_activity(guild: Guild, private_room: PrivateRoom) -> None:
     else:
         # Enable game activity
         update.pr_game_activity(argument=private_room.room_id, value=True)
+        await refresh_name(guild, private_room.room_channel_id)
+
+
+async def create_move_channel(guild: Guild, pr_channel: VoiceChannel, owner: Member, hidden: bool) -> VoiceChannel:
+    """
+    Create the channel below a locked private room in which members wait to be moved
+    :param guild: Guild of private room
+    :param pr_channel: Channel of the private room
+    :param owner: Owner of the private room
+    :param hidden: Whether the private room is hidden
+    :return: The move channel
+    """
+    default_role: Role = guild.default_role
+    pr_category: CategoryChannel = pr_channel.category
+
+    # Set perms for the owner and everyone else
+    perms = {owner: PermissionOverwrite(connect=False, move_members=True),
+             default_role: PermissionOverwrite(speak=False)}
+
+    if hidden:
+        perms[default_role] = PermissionOverwrite(view_channel=False)
+
+    return await guild.create_voice_channel(f'↑ Waiting for move ↑', category=pr_category, overwrites=perms,
+                                            position=pr_channel.position + 1, reason='Locked private room')
 
 
 async def lock(guild: Guild, private_room: PrivateRoom) -> None:
@@ -180,9 +297,7 @@ async def lock(guild: Guild, private_room: PrivateRoom) -> None:
     pr_channel: VoiceChannel = guild.get_channel(private_room.room_channel_id)
     default_role: Role = guild.default_role
 
-    # Fetch category and owner
-    pr_category: CategoryChannel = guild.get_channel(
-        select.pr_categroy_id(guild.id))
+    # Fetch owner
     pr_owner: Member = guild.get_member(private_room.owner_id)
 
     await asyncio.sleep(0.2)
@@ -196,17 +311,8 @@ async def lock(guild: Guild, private_room: PrivateRoom) -> None:
     overwrite.update(connect=False)
     await pr_channel.set_permissions(default_role, overwrite=overwrite)
 
-    # Create move channel and set perms
-    perms = {pr_owner: PermissionOverwrite(connect=False, move_members=True),
-             default_role: PermissionOverwrite(speak=False)}
-
-    if private_room.hidden:
-        perms[default_role] = PermissionOverwrite(view_channel=False)
-
-    move_channel: VoiceChannel = await guild.create_voice_channel(f'↑ Waiting for move ↑', category=pr_category,
-                                                                  overwrites=perms,
-                                                                  reason='Locked private room')
-    await move_channel.edit(position=pr_channel.position + 1)
+    # Create move channel
+    move_channel: VoiceChannel = await create_move_channel(guild, pr_channel, pr_owner, private_room.hidden)
 
     # Update database
     update.pr_locked(private_room.room_id, value=True)
@@ -449,6 +555,7 @@ async def setup_settings(guild: Guild) -> None:
     await asyncio.sleep(0.2)
 
     if old_channel:
+        message_cache.remove_channel(old_channel.id)
         try:
             await old_channel.delete()
         except NotFound:
@@ -462,6 +569,8 @@ async def setup_settings(guild: Guild) -> None:
                                                                 'via dm')
 
         settings_msg: Message = await settings_channel.send(embed=settings_emebd)
+
+        message_cache.add(settings_msg, 'SETTINGS')
         await settings_msg.add_reaction(emoji='ℹ️')
 
         if select.pr_change_name(guild.id):
@@ -475,6 +584,8 @@ async def setup_settings(guild: Guild) -> None:
                                                                     'your room is shown in the name', inline=False)
 
             lock_msg: Message = await settings_channel.send(embed=lock_embed)
+
+            message_cache.add(lock_msg, 'SETTINGS')
             await lock_msg.add_reaction(emoji='🪧')
             await lock_msg.add_reaction(emoji='🎮')
 
@@ -487,6 +598,8 @@ async def setup_settings(guild: Guild) -> None:
                 name='Toggle Privacy', value='React with 🔒 to lock or unlock your private room')
 
             lock_msg: Message = await settings_channel.send(embed=lock_embed)
+
+            message_cache.add(lock_msg, 'SETTINGS')
             await lock_msg.add_reaction(emoji='🔒')
 
         if select.pr_change_limit(guild.id):
@@ -500,6 +613,8 @@ async def setup_settings(guild: Guild) -> None:
                                   inline=False)
 
             limit_msg: Message = await settings_channel.send(embed=limit_embed)
+
+            message_cache.add(limit_msg, 'SETTINGS')
             await limit_msg.add_reaction(emoji='🔄')
             await limit_msg.add_reaction(emoji='🔢')
 
@@ -511,6 +626,8 @@ async def setup_settings(guild: Guild) -> None:
                 name='Toggle Visibility', value='React with 👀 to lock or unlock your private room')
 
             hide_msg: Message = await settings_channel.send(embed=hide_embed)
+
+            message_cache.add(hide_msg, 'SETTINGS')
             await hide_msg.add_reaction(emoji='👀')
     except NotFound:
         return
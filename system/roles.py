@@ -1,5 +1,6 @@
 from discord import Guild, Role, Member
-from database import insert, delete, select
+from database import insert, delete
+from system import permission
 
 
 def add_admin_role(guild: Guild, role: Role) -> None:
@@ -16,11 +17,12 @@ def add_admin_role(guild: Guild, role: Role) -> None:
         raise Exception('Cannot add default role')
 
     # Ignore if the role is already marked as an admin role
-    if role.id in select.admin_roles(guild.id):
+    if role.id in permission.role_ids(guild.id, 'ADMIN'):
         return
 
     # Insert role to database
     insert.role(role.id, 'ADMIN', guild.id)
+    permission.invalidate_roles(guild.id)
     
 
 def remove_admin_role(role: Role) -> None:
@@ -30,6 +32,7 @@ def remove_admin_role(role: Role) -> None:
     """
     # Delete role from database
     delete.role(role.id, type='ADMIN')
+    permission.invalidate_roles(role.guild.id)
 
 
 def get_admin_roles(guild: Guild) -> list:
@@ -39,7 +42,7 @@ def get_admin_roles(guild: Guild) -> list:
     :return: List of all admin roles on the guild
     """
     # Get all IDs of admin roles
-    role_ids = select.admin_roles(guild.id)
+    role_ids = permission.role_ids(guild.id, 'ADMIN')
 
     # Create list of all roles
     roles = []
@@ -63,11 +66,12 @@ def add_moderator_role(guild: Guild, role: Role) -> None:
         raise Exception('Cannot add default role')
 
     # Ignore if the role is already marked as a moderator role
-    if role.id in select.moderator_roles(guild.id):
+    if role.id in permission.role_ids(guild.id, 'MODERATOR'):
         return
 
     # Insert role to database
     insert.role(role.id, 'MODERATOR', guild.id)
+    permission.invalidate_roles(guild.id)
 
 
 def remove_moderator_role(role: Role) -> None:
@@ -77,6 +81,7 @@ def remove_moderator_role(role: Role) -> None:
     """
     # Delete role from database
     delete.role(role.id, type='MODERATOR')
+    permission.invalidate_roles(role.guild.id)
 
 
 def get_moderator_roles(guild: Guild) -> list:
@@ -86,7 +91,7 @@ def get_moderator_roles(guild: Guild) -> list:
     :return: List of all moderator roles on the guild
     """
     # Get all IDs of moderator roles
-    role_ids = select.moderator_roles(guild.id)
+    role_ids = permission.role_ids(guild.id, 'MODERATOR')
 
     # Create list of all roles
     roles = []
@@ -157,11 +162,12 @@ def add_auto_role(guild: Guild, role: Role) -> None:
         raise Exception('Cannot add default role')
 
     # Ignore if the role is already marked as a support role
-    if role.id in select.support_roles(guild.id):
+    if role.id in permission.role_ids(guild.id, 'SUPPORTER'):
         return
 
     # Insert role to database
     insert.role(role.id, 'AUTOROLE', guild.id)
+    permission.invalidate_roles(guild.id)
 
 
 def remove_auto_role(role: Role) -> None:
@@ -171,6 +177,7 @@ def remove_auto_role(role: Role) -> None:
     """
     # Delete role from database
     delete.role(role.id, type='AUTOROLE')
+    permission.invalidate_roles(role.guild.id)
 
 
 def get_auto_roles(guild: Guild) -> list:
@@ -180,7 +187,7 @@ def get_auto_roles(guild: Guild) -> list:
     :return: List of all auto roles on the guild
     """
     # Get all IDs of support roles
-    role_ids = select.auto_roles(guild.id)
+    role_ids = permission.role_ids(guild.id, 'AUTOROLE')
 
     # Create list of all roles
     roles = []
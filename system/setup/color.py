@@ -1,6 +1,7 @@
 from discord import TextChannel, Guild, Embed, Message
 
-from system import appearance, description
+from system import appearance, description, message_cache
+from system.setup import snapshot
 from utilities import util
 
 
@@ -11,15 +12,16 @@ async def color_page(channel: TextChannel, guild: Guild) -> None:
     :param channel: TextChannel to send the message to
     """
     # Initialize important values
-    prefix = appearance.get_prefix(guild.id)
+    snap = snapshot.get(guild.id)
+    prefix = snapshot.prefix(snap)
 
     # Setup appearance of the embed
     embed: Embed = Embed(title=f'{appearance.bot_name} Setup - Color',
                          description='Setup your custom color!')
-    embed.colour = appearance.get_color(guild.id)
+    embed.colour = snapshot.color(snap)
 
     # Fetch colorand format to hex color code
-    color = hex(appearance.get_color(guild.id))
+    color = hex(snapshot.color(snap))
     color = '#' + str(color)[2:]
 
     # Setup the fields
@@ -32,6 +34,7 @@ async def color_page(channel: TextChannel, guild: Guild) -> None:
 
     # Send embed and add reactions
     message = await channel.send(embed=embed)
+    message_cache.add(message, 'SETUP')
     await message.add_reaction(emoji='🟧')
 
 
@@ -61,12 +64,14 @@ async def setup_color(channel: TextChannel, guild: Guild, message: Message = Non
 
             # Set primary color of the server
             appearance.set_color(guild_id=guild.id, color=color)
+            snapshot.patch(guild.id, color=color)
         except TypeError:
             raise util.InvalidInputError(
                 color, "color has to be an hex-code or integer")
     else:
         # Set color to default
         appearance.set_color(guild.id)
+        snapshot.patch(guild.id, color=None)
 
     # Send response to command
     await channel.send(embed=Embed(description="The **color** was updated",
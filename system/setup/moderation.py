@@ -1,7 +1,10 @@
 from discord import TextChannel, Guild, Embed, Role, Message
 
-from system import appearance, description
-from system.moderation import moderation as mod, mute
+from database import update
+from database.manager import latest_warn_dates
+from system import appearance, description, message_cache
+from system.moderation import moderation as mod, mute, automod
+from system.setup import snapshot
 from utilities import util
 
 
@@ -12,17 +15,18 @@ async def moderation_page(channel: TextChannel, guild: Guild):
     :param channel: TextChannel to send the message to
     """
     # Initialize important values
-    prefix = appearance.get_prefix(guild.id)
+    snap = snapshot.get(guild.id)
+    prefix = snapshot.prefix(snap)
 
     # Setup appearance of the embed
     embed: Embed = Embed(title=f'{appearance.bot_name} Setup - Moderation',
                          description='Setup the moderation system!',
-                         colour=appearance.get_color(guild.id))
+                         colour=snapshot.color(snap))
 
     # Add information about moderation roles
     embed.add_field(name='Set Moderation Roles', value=f'React with 👥', inline=False)
 
-    mod_log: TextChannel = mod.get_mod_log(guild)
+    mod_log: TextChannel = guild.get_channel(snap['mod_log_id'])
     # Add information about the current moderation log
     embed.add_field(name='\u200b', value='\u200b', inline=False)
 
@@ -42,9 +46,20 @@ async def moderation_page(channel: TextChannel, guild: Guild):
 
     # Add information about the warn system
     embed.add_field(name='\u200b', value='\u200b', inline=False)
+    mute_threshold, kick_threshold = snap['warn_mute_threshold'] or 3, snap['warn_kick_threshold'] or 4
     embed.add_field(name='Warn Punishment', value=f'• **1 warn:**  20 min mute\n'
-                                                  f'• **3 warns within two weeks:**  2h mute\n'
-                                                  f'• **4 warns within one month:**  24h mute & kick')
+                                                  f'• **{mute_threshold} warns within one week:**  2h mute\n'
+                                                  f'• **{kick_threshold} warns within one month:**  24h mute & kick\n'
+                                                  f'`{prefix}{description.get_command("moderation warns").syntax}`')
+
+    # Add information about automod
+    embed.add_field(name='\u200b', value='\u200b', inline=False)
+    embed.add_field(name='Automod Set Up?', value='✅' if snap['automod'] else '❌', inline=True)
+    embed.add_field(name='Toggle Automod', value='React with 🛡️', inline=True)
+    embed.add_field(name='Automod', value=f'Mutes members for {automod.mute_duration[0]} who send more than '
+                                          f'{automod.max_messages} messages within {automod.message_window} seconds, '
+                                          f'repeat a message more than {automod.max_duplicates} times or mention more '
+                                          f'than {automod.max_mentions} users', inline=False)
 
     # Add information about mute
     mute_role: Role = await mute.get_mute_role(guild)
@@ -53,9 +68,11 @@ async def moderation_page(channel: TextChannel, guild: Guild):
 
     # Send embed
     msg = await channel.send(embed=embed)
+    message_cache.add(msg, 'SETUP')
 
     # Add reactions
     await msg.add_reaction('👥')
+    await msg.add_reaction('🛡️')
     if mod_log:
         await msg.add_reaction('📪')
 
@@ -79,6 +96,7 @@ async def setup_moderation_log(channel: TextChannel, guild: Guild, message: Mess
 
         # Set moderation log
         mod.set_mod_log(guild, mod_log.id)
+        snapshot.patch(guild.id, mod_log_id=mod_log.id)
 
         # Send response to command
         await channel.send(embed=Embed(description=f'The **moderation log** was set to {mod_log.mention}',
@@ -86,7 +104,54 @@ async def setup_moderation_log(channel: TextChannel, guild: Guild, message: Mess
     else:
         # Deactivate moderation log
         mod.set_mod_log(guild, None)
+        snapshot.patch(guild.id, mod_log_id=None)
 
         # Send response to command
         await channel.send(embed=Embed(description='The **moderation log** was deactivated',
                                        colour=appearance.get_color(guild.id)))
+
+
+async def toggle_automod(guild: Guild, setup_message: Message) -> None:
+    """
+    Toggles automod
+    :param guild: Guild of the call
+    :param setup_message: The message where the reaction was edited
+    """
+    new_status = automod.toggle(guild)
+    snapshot.patch(guild.id, automod=new_status)
+
+    # Change status within the embed
+    embed = setup_message.embeds[0]
+    for index, field in enumerate(embed.fields):
+        if field.name == 'Automod Set Up?':
+            embed.set_field_at(index, name=field.name, value='✅' if new_status else '❌', inline=True)
+    await setup_message.edit(embed=embed)
+
+
+async def setup_warn_thresholds(channel: TextChannel, guild: Guild, message: Message, mute_threshold: int,
+                                kick_threshold: int) -> None:
+    """
+    Set up the warn counts that escalate warns on the server
+    :param channel: Channel of message
+    :param guild: Guild to set the thresholds for
+    :param message: Message of the command call
+    :param mute_threshold: Count of warns within a week that mute for 2 hours
+    :param kick_threshold: Count of warns within a month that kick
+    """
+    # Delete message of member
+    await util.delete_message(message)
+
+    # Only the latest warns are counted, so the thresholds are limited
+    for threshold in (mute_threshold, kick_threshold):
+        if not 2 <= threshold <= latest_warn_dates:
+            raise util.InvalidInputError(threshold, f'The counts must be integers from 2 to {latest_warn_dates}')
+
+    # Update thresholds
+    update.warn_mute_threshold(argument=guild.id, value=mute_threshold)
+    update.warn_kick_threshold(argument=guild.id, value=kick_threshold)
+    snapshot.patch(guild.id, warn_mute_threshold=mute_threshold, warn_kick_threshold=kick_threshold)
+
+    # Send response to command
+    await channel.send(embed=Embed(description=f'Members are now muted for 2h after **{mute_threshold} warns** within '
+                                               f'one week and kicked after **{kick_threshold} warns** within one month',
+                                   colour=appearance.get_color(guild.id)))
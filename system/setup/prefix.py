@@ -1,5 +1,6 @@
 from discord import TextChannel, Guild, Embed, Message
-from system import appearance, description
+from system import appearance, description, message_cache
+from system.setup import snapshot
 from utilities import util
 
 
@@ -10,12 +11,13 @@ async def prefix_page(channel: TextChannel, guild: Guild) -> None:
     :param channel: TextChannel to send the message to
     """
     # Initialize important values
-    prefix = appearance.get_prefix(guild.id)
+    snap = snapshot.get(guild.id)
+    prefix = snapshot.prefix(snap)
 
     # Setup appearance of the embed
     embed: Embed = Embed(title=f'{appearance.bot_name} Setup - Prefix',
                          description='Setup your custom prefix!')
-    embed.colour = appearance.get_color(guild.id)
+    embed.colour = snapshot.color(snap)
 
     # Setup the fields
     embed.add_field(name='Current Prefix', value=f'`{prefix}`', inline=False)
@@ -26,6 +28,7 @@ async def prefix_page(channel: TextChannel, guild: Guild) -> None:
 
     # Send embed and add reactions
     message = await channel.send(embed=embed)
+    message_cache.add(message, 'SETUP')
     await message.add_reaction(emoji='❗')
 
 
@@ -42,6 +45,7 @@ async def setup_prefix(channel: TextChannel, guild: Guild, message: Message = No
     await util.delete_message(message)
 
     appearance.set_prefix(guild_id=guild.id, prefix=prefix)
+    snapshot.patch(guild.id, prefix=prefix)
 
     # Send response to command
     await channel.send(embed=Embed(description=f"The **prefix** was set to `{appearance.get_prefix(guild.id)}`",
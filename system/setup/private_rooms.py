@@ -1,9 +1,11 @@
 from discord import TextChannel, Guild, Embed, Message, Member
 
-from database import select, update
+from database import update
 from database.select import PrivateRoom
-from system import appearance
-from system.private_rooms import private_rooms, settings as pr_settings, settings
+from system import appearance, description, message_cache
+from system.private_rooms import private_rooms, pool, settings as pr_settings, settings
+from system.setup import snapshot
+from utilities import util
 
 
 async def private_rooms_page(channel: TextChannel, guild: Guild) -> None:
@@ -14,20 +16,21 @@ async def private_rooms_page(channel: TextChannel, guild: Guild) -> None:
     """
 
     # Initialize important values
-    prefix = appearance.get_prefix(guild.id)
+    snap = snapshot.get(guild.id)
+    prefix = snapshot.prefix(snap)
 
     # Setup appearance of the embed
     embed: Embed = Embed(title=f'{appearance.bot_name} Setup - Private Rooms',
                          description='Setup private rooms!')
-    embed.colour = appearance.get_color(guild.id)
+    embed.colour = snapshot.color(snap)
 
     # Emojis whether private rooms are setup
-    set_up_emoji = '✅' if select.cpr_channel_id(guild.id) is not None else '❌'
-    text_channel_emoji = '✅' if select.pr_text_channel_activated(guild.id) else '❌'
-    name_emoji = '✅' if select.pr_change_name(guild.id) else '❌'
-    privacy_emoji = '✅' if select.pr_change_privacy(guild.id) else '❌'
-    limit_emoji = '✅' if select.pr_change_limit(guild.id) else '❌'
-    visibility_emoji = '✅' if select.pr_change_visibility(guild.id) else '❌'
+    set_up_emoji = '✅' if snap['cpr_channel_id'] is not None else '❌'
+    text_channel_emoji = '✅' if snap['pr_text_channel'] else '❌'
+    name_emoji = '✅' if snap['pr_name'] else '❌'
+    privacy_emoji = '✅' if snap['pr_privacy'] else '❌'
+    limit_emoji = '✅' if snap['pr_limit'] else '❌'
+    visibility_emoji = '✅' if snap['pr_visibility'] else '❌'
 
     # Setup the fields
     embed.add_field(name='Private Rooms Set Up?', value=set_up_emoji, inline=True)
@@ -58,8 +61,23 @@ async def private_rooms_page(channel: TextChannel, guild: Guild) -> None:
 
     embed.add_field(name='\u200b', value='\u200b', inline=True)
 
+    embed.add_field(name='\u200b', value='\u200b', inline=False)
+
+    embed.add_field(name='Channel Pool', value=f'`{snap["pr_pool_size"] or 0}` channels are created in advance\n'
+                                               f'`{prefix}{description.get_command("private rooms pool").syntax}`',
+                    inline=False)
+
+    # Add the current default settings
+    if snap['default_pr_locked'] is not None:
+        limit = snap['default_pr_user_limit'] or 'no limit'
+        embed.add_field(name='Current Default Settings',
+                        value=f'Game activity {"shown" if snap["default_pr_game_activity"] else "hidden"}, '
+                              f'{"locked" if snap["default_pr_locked"] else "unlocked"}, limit: {limit}, '
+                              f'{"hidden" if snap["default_pr_hidden"] else "visible"}', inline=False)
+
     # Send embed and add reactions
     message = await channel.send(embed=embed)
+    message_cache.add(message, 'SETUP')
 
     await message.add_reaction(emoji='🔉')
     await message.add_reaction(emoji='⚙️')
@@ -76,7 +94,7 @@ async def toggle_private_rooms(guild: Guild, setup_message: Message) -> None:
     :param guild: Guild of the call
     :param setup_message: The message where the reaction was edited
     """
-    is_set_up = select.cpr_channel_id(guild.id) is not None
+    is_set_up = snapshot.get(guild.id)['cpr_channel_id'] is not None
     new_status = not is_set_up
 
     # Setup or disable the private rooms on guild
@@ -85,6 +103,9 @@ async def toggle_private_rooms(guild: Guild, setup_message: Message) -> None:
     else:
         await private_rooms.disable(guild)
 
+    # The private rooms category and channels changed
+    snapshot.invalidate(guild.id)
+
     # Change status within the embed
     embed = setup_message.embeds[0]
     embed_name = embed.fields[0].name
@@ -102,10 +123,11 @@ async def toggle_text_channel(guild: Guild, setup_message: Message) -> None:
     :param guild: Guild of the call
     :param setup_message: The message where the reaction was edited
     """
-    new_status = not select.pr_text_channel_activated(guild.id)
+    new_status = not snapshot.get(guild.id)['pr_text_channel']
 
     # Setup or disable the private rooms on guild
     update.pr_text_channel_activated(argument=guild.id, value=new_status)
+    snapshot.patch(guild.id, pr_text_channel=new_status)
 
     # Change status within the embed
     embed = setup_message.embeds[0]
@@ -124,10 +146,11 @@ async def toggle_name(guild: Guild, setup_message: Message) -> None:
     :param guild: Guild of the call
     :param setup_message: The message where the reaction was edited
     """
-    new_status = not select.pr_change_name(guild.id)
+    new_status = not snapshot.get(guild.id)['pr_name']
 
     # Setup or disable the private rooms on guild
     update.pr_change_name(argument=guild.id, value=new_status)
+    snapshot.patch(guild.id, pr_name=new_status)
 
     # Change status within the embed
     embed = setup_message.embeds[0]
@@ -148,9 +171,10 @@ async def toggle_privacy(guild: Guild, setup_message: Message) -> None:
     :param guild: Guild of the call
     :param setup_message: The message where the reaction was edited
     """
-    new_status = not select.pr_change_privacy(guild.id)
+    new_status = not snapshot.get(guild.id)['pr_privacy']
     # Setup or disable the private rooms on guild
     update.pr_change_privacy(argument=guild.id, value=new_status)
+    snapshot.patch(guild.id, pr_privacy=new_status)
 
     # Change status within the embed
     embed = setup_message.embeds[0]
@@ -171,10 +195,11 @@ async def toggle_limit(guild: Guild, setup_message: Message) -> None:
     :param guild: Guild of the call
     :param setup_message: The message where the reaction was edited
     """
-    new_status = not select.pr_change_limit(guild.id)
+    new_status = not snapshot.get(guild.id)['pr_limit']
 
     # Setup or disable the private rooms on guild
     update.pr_change_limit(argument=guild.id, value=new_status)
+    snapshot.patch(guild.id, pr_limit=new_status)
 
     # Change status within the embed
     embed = setup_message.embeds[0]
@@ -195,10 +220,11 @@ async def toggle_visibility(guild: Guild, setup_message: Message) -> None:
     :param guild: Guild of the call
     :param setup_message: The message where the reaction was edited
     """
-    new_status = not select.pr_change_visibility(guild.id)
+    new_status = not snapshot.get(guild.id)['pr_visibility']
 
     # Setup or disable the private rooms on guild
     update.pr_change_visibility(argument=guild.id, value=new_status)
+    snapshot.patch(guild.id, pr_visibility=new_status)
 
     # Change status within the embed
     embed = setup_message.embeds[0]
@@ -213,6 +239,31 @@ async def toggle_visibility(guild: Guild, setup_message: Message) -> None:
     await settings.setup_settings(guild)
 
 
+async def setup_pool_size(channel: TextChannel, guild: Guild, message: Message, size: int) -> None:
+    """
+    Command for setting the size of the private room pool on the guild
+    :param channel: TextChannel to send the message to
+    :param guild: Guild of call
+    :param message: Message that called the command
+    :param size: The given pool size
+    :raises InvalidInputError: When the size is out of range
+    """
+    # Delete message of member
+    await util.delete_message(message)
+
+    if not 0 <= size <= pool.max_pool_size:
+        raise util.InvalidInputError(size, f'The size must be an integer from 0 to {pool.max_pool_size}')
+
+    # Update the pool size and refill the pool in the background
+    update.pr_pool_size(argument=guild.id, value=size)
+    snapshot.patch(guild.id, pr_pool_size=size)
+    pool.refill_pool(guild)
+
+    # Send response to command
+    await channel.send(embed=Embed(description=f'The **private room pool** was set to `{size}` channels',
+                                   colour=appearance.get_color(guild.id)))
+
+
 async def set_default_settings(member: Member, channel: TextChannel) -> None:
     """
 
@@ -231,6 +282,7 @@ async def set_default_settings(member: Member, channel: TextChannel) -> None:
     private_room: PrivateRoom = PrivateRoom(guild_id=guild.id, owner_id=member.id)
 
     pr_settings.set_default(guild, private_room)
+    snapshot.invalidate(guild.id)
     embed: Embed = Embed(title='Updated Default Private Room Settings', colour=appearance.get_color(guild.id))
 
     # Add information about game activity
@@ -1,6 +1,7 @@
 from discord import TextChannel, Guild, Embed, Role, Message
 
-from system import appearance, roles, description
+from system import appearance, roles, description, autoroles
+from system.setup import snapshot
 from utilities import util
 
 
@@ -11,18 +12,23 @@ async def roles_page(channel: TextChannel, guild: Guild) -> None:
     :param channel: TextChannel to send the message to
     """
     # Initialize important values
-    prefix = appearance.get_prefix(guild.id)
+    snap = snapshot.get(guild.id)
+    prefix = snapshot.prefix(snap)
 
     # Setup appearance of the embed
     embed: Embed = Embed(title=f'{appearance.bot_name} Setup - Roles',
                          description='Setup the roles!',
-                         colour=appearance.get_color(guild.id))
+                         colour=snapshot.color(snap))
+
+    def mentions(type_: str) -> str:
+        # Mention the existing roles of the type
+        return '\n'.join(role.mention for role in map(guild.get_role, snapshot.role_ids(snap, type_)) if role)
 
     # Get existing roles
-    admin_roles = '\n'.join(map(lambda r: r.mention, roles.get_admin_roles(guild)))
-    moderator_roles = '\n'.join(map(lambda r: r.mention, roles.get_moderator_roles(guild)))
-    # support_roles = '\n'.join(map(lambda r: r.mention, roles.get_support_roles(guild)))
-    auto_roles = '\n'.join(map(lambda r: r.mention, roles.get_auto_roles(guild)))
+    admin_roles = mentions('ADMIN')
+    moderator_roles = mentions('MODERATOR')
+    # support_roles = mentions('SUPPORTER')
+    auto_roles = mentions('AUTOROLE')
 
     # Add information about the roles already existing to embed
     if admin_roles:
@@ -43,6 +49,8 @@ async def roles_page(channel: TextChannel, guild: Guild) -> None:
     embed.add_field(name='Remove Roles', value=f'`{prefix}{description.get_command("roles remove").syntax}`'
                                                f'\nThe type is either *admin*, *moderator* or *autorole*.',
                     inline=False)
+    embed.add_field(name='Give Autoroles To All Members',
+                    value=f'`{prefix}{description.get_command("roles backfill").syntax}`', inline=False)
 
     await channel.send(embed=embed)
 
@@ -71,6 +79,7 @@ async def add_role(guild: Guild, role: Role, type_: str, channel: TextChannel, m
         roles.add_auto_role(guild, role)
     else:
         raise Exception('Invalid type')
+    snapshot.invalidate(guild.id)
 
     # Send message
     if type_ == 'autorole':
@@ -107,6 +116,7 @@ async def remove_role(guild: Guild, role: Role, type_: str, channel: TextChannel
         roles.remove_auto_role(role)
     else:
         raise Exception('Invalid type')
+    snapshot.invalidate(guild.id)
 
     # Send message
     if type_ == 'autorole':
@@ -116,3 +126,25 @@ async def remove_role(guild: Guild, role: Role, type_: str, channel: TextChannel
         embed: Embed = Embed(description=f'Removed {role.mention} from **{type_} roles**',
                              colour=appearance.get_color(guild.id))
     await channel.send(embed=embed)
+
+
+async def backfill_auto_roles(guild: Guild, channel: TextChannel, message: Message) -> None:
+    """
+    Give the autoroles to all members of the server
+    :param guild: Guild of the call
+    :param channel: Channel of message
+    :param message: Message of the command call
+    """
+    # Delete message of member
+    await util.delete_message(message)
+
+    if not roles.get_auto_roles(guild):
+        raise Exception('There are no autoroles set up: No autoroles')
+
+    autoroles.start_backfill(guild)
+
+    # Send message
+    embed: Embed = Embed(description=f'Giving the **autoroles** to {autoroles.pending(guild.id)} members. '
+                                     f'This continues in the background, even after a restart.',
+                         colour=appearance.get_color(guild.id))
+    await channel.send(embed=embed)
@@ -1,9 +1,9 @@
 import asyncio
 
 from discord import Member, Embed, TextChannel, Guild, Message
-from system import appearance, roles, welcome as welcome_sys, permission
+from system import appearance, roles, welcome as welcome_sys, permission, message_cache
 from utilities import secret
-from system.setup import prefix, color, welcome, roles, moderation, private_rooms
+from system.setup import prefix, color, welcome, roles, moderation, private_rooms, snapshot
 
 
 async def check_reactions(member: Member, guild: Guild, channel: TextChannel, message: Message, emoji: str,
@@ -89,6 +89,9 @@ async def check_reactions(member: Member, guild: Guild, channel: TextChannel, me
             elif emoji == '🚶‍♂️':
                 # Toggle the leave messages
                 await welcome.toggle_leave_messages(channel, guild, message)
+            elif emoji == '🖼️':
+                # Toggle the welcome cards
+                await welcome.toggle_welcome_cards(channel, guild, message)
             elif emoji == '📄':
                 # Send the welcome DM text
                 await welcome_sys.welcome_dm(member, channel=channel, force=True)
@@ -99,6 +102,9 @@ async def check_reactions(member: Member, guild: Guild, channel: TextChannel, me
             elif emoji == '👥':
                 # Call roles page
                 await roles.roles_page(channel, guild)
+            elif emoji == '🛡️':
+                # Toggle automod
+                await moderation.toggle_automod(guild, message)
         elif title == f'{bot_name} Setup - Private Rooms':
             await asyncio.sleep(1)
             if emoji == '🔉':
@@ -124,12 +130,13 @@ async def setup_page(channel: TextChannel, guild: Guild) -> None:
     :param channel: TextChannel to send the message to
     """
     # Initialize important values
-    guild_prefix = appearance.get_prefix(guild.id)
+    snap = snapshot.get(guild.id)
+    guild_prefix = snapshot.prefix(snap)
 
     # Setup appearance of the embed
     embed: Embed = Embed(title=f'{appearance.bot_name} - Setup',
                          description='Use the following commands or react.')
-    embed.colour = appearance.get_color(guild.id)
+    embed.colour = snapshot.color(snap)
 
     # Setup the command descriptions
     embed.add_field(name='Prefix ❗', value=f'`{guild_prefix}setup prefix`', inline=True)
@@ -141,6 +148,7 @@ async def setup_page(channel: TextChannel, guild: Guild) -> None:
 
     # Send embed and add reactions
     message = await channel.send(embed=embed)
+    message_cache.add(message, 'SETUP')
     await message.add_reaction(emoji='❗')
     await message.add_reaction(emoji='🟧')
     await message.add_reaction(emoji='👥')
@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+
+from database import select
+from system import appearance, coordination
+
+# The maximum count of cached snapshots (the least recently used ones are dropped first)
+max_snapshots = 500
+
+# Seconds a snapshot is used before it is read again (covers changes that don't invalidate it)
+snapshot_ttl = 300
+
+# Setup snapshots and the time they were read by guild ID
+_snapshots: OrderedDict[int, tuple[dict, float]] = OrderedDict()
+
+
+def get(guild_id: int) -> dict:
+    """
+    Get the setup snapshot of a guild. It is read with a single query and cached.
+    :param guild_id: ID of the guild
+    :return: Dict of the columns of select.setup_snapshot and values
+    """
+    entry = _snapshots.get(guild_id)
+    if entry and time.monotonic() - entry[1] < snapshot_ttl:
+        _snapshots.move_to_end(guild_id)
+        return entry[0]
+
+    snapshot = select.setup_snapshot(guild_id)
+    _snapshots[guild_id] = (snapshot, time.monotonic())
+    _snapshots.move_to_end(guild_id)
+
+    # Drop the least recently used snapshots
+    while len(_snapshots) > max_snapshots:
+        _snapshots.popitem(last=False)
+
+    return snapshot
+
+
+def patch(guild_id: int, **values) -> None:
+    """
+    Update values of a cached snapshot after they were changed in the database
+    :param guild_id: ID of the guild
+    :param values: New values by column
+    """
+    entry = _snapshots.get(guild_id)
+    if entry:
+        entry[0].update(values)
+
+    # Other processes read the snapshot again
+    coordination.publish('setup', guild_id)
+
+
+def invalidate(guild_id: int) -> None:
+    """
+    Forget the snapshot of a guild, so it is read again (in all bot processes)
+    :param guild_id: ID of the guild
+    """
+    _forget(guild_id)
+    coordination.publish('setup', guild_id)
+
+
+def _forget(guild_id: int) -> None:
+    """
+    Forget the snapshot of a guild in this process
+    :param guild_id: ID of the guild
+    """
+    _snapshots.pop(guild_id, None)
+
+
+coordination.register('setup', _forget)
+
+
+def prefix(snapshot: dict) -> str:
+    """
+    Get the prefix of the snapshot or the default one
+    :param snapshot: Setup snapshot
+    :return: Prefix of the guild
+    """
+    return snapshot['prefix'] or appearance.default_prefix
+
+
+def color(snapshot: dict) -> int:
+    """
+    Get the color of the snapshot or the default one
+    :param snapshot: Setup snapshot
+    :return: Color of the guild
+    """
+    return snapshot['color'] or appearance.default_color
+
+
+def role_ids(snapshot: dict, type_: str) -> list[int]:
+    """
+    Get the IDs of the roles of a type in the snapshot
+    :param snapshot: Setup snapshot
+    :param type_: Type of the roles ('ADMIN', 'MODERATOR', 'AUTOROLE' or 'SUPPORTER')
+    :return: IDs of the roles
+    """
+    return [role_id for role_id, t in snapshot['roles'] if t == type_]
@@ -1,7 +1,7 @@
 from discord import TextChannel, Guild, Embed, Message
 
-from database import select
-from system import appearance, description, welcome as welcome_sys
+from system import appearance, description, welcome as welcome_sys, message_cache, welcome_cards
+from system.setup import snapshot
 from utilities import util
 
 
@@ -13,20 +13,22 @@ async def welcome_page(channel: TextChannel, guild: Guild) -> None:
     """
 
     # Initialize important values
-    prefix = appearance.get_prefix(guild.id)
+    snap = snapshot.get(guild.id)
+    prefix = snapshot.prefix(snap)
 
     # Setup appearance of the embed
     embed: Embed = Embed(title=f'{appearance.bot_name} Setup - Welcome',
                          description='Setup the welcome system!')
-    embed.colour = appearance.get_color(guild.id)
+    embed.colour = snapshot.color(snap)
 
     # Emojis whether welcome/leave is setup
-    welcome_dm_emoji = '✅' if select.welcome_dms(guild.id) else '❌'
-    welcome_emoji = '✅' if select.welcome_messages(guild.id) else '❌'
-    leave_emoji = '✅' if select.leave_messages(guild.id) else '❌'
+    welcome_dm_emoji = '✅' if snap['welcome_dms'] else '❌'
+    welcome_emoji = '✅' if snap['welcome_messages'] else '❌'
+    leave_emoji = '✅' if snap['leave_messages'] else '❌'
+    welcome_cards_emoji = '✅' if snap['welcome_cards'] else '❌'
 
-    welcome_channel: TextChannel = guild.get_channel(select.welcome_channel_id(guild.id))
-    welcome_dm = select.welcome_dm(guild.id)
+    welcome_channel: TextChannel = guild.get_channel(snap['welcome_channel_id'])
+    welcome_dm = snap['welcome_dm']
 
     # Setup the fields
     embed.add_field(name='Welcome Messages Set Up?', value=welcome_emoji, inline=True)
@@ -42,6 +44,11 @@ async def welcome_page(channel: TextChannel, guild: Guild) -> None:
     embed.add_field(name='Welcome DMs Set Up?', value=welcome_dm_emoji, inline=True)
     embed.add_field(name='Toggle Welcome DMs', value='React with 📩', inline=True)
 
+    embed.add_field(name='\u200b', value='\u200b', inline=True)
+
+    embed.add_field(name='Welcome Cards Set Up?', value=welcome_cards_emoji, inline=True)
+    embed.add_field(name='Toggle Welcome Cards', value='React with 🖼️', inline=True)
+
     embed.add_field(name='\u200b', value='\u200b', inline=True)
     embed.add_field(name='\u200b', value='\u200b', inline=False)
 
@@ -63,10 +70,12 @@ async def welcome_page(channel: TextChannel, guild: Guild) -> None:
 
     # Send embed and add reactions
     message = await channel.send(embed=embed)
+    message_cache.add(message, 'SETUP')
 
     await message.add_reaction(emoji='👋')
     await message.add_reaction(emoji='🚶‍♂️')
     await message.add_reaction(emoji='📩')
+    await message.add_reaction(emoji='🖼️')
     if welcome_dm:
         await message.add_reaction(emoji='📄')
 
@@ -84,6 +93,7 @@ async def setup_welcome_channel(channel: TextChannel, guild: Guild, message: Mes
     await util.delete_message(message)
 
     welcome_sys.set_welcome_channel(guild, welcome_channel.id)
+    snapshot.patch(guild.id, welcome_channel_id=welcome_channel.id)
 
     # Send response to command
     await channel.send(embed=Embed(description=f"The **welcome channel** was set to {welcome_channel.mention}",
@@ -97,9 +107,10 @@ async def toggle_welcome_messages(channel: TextChannel, guild: Guild, setup_mess
     :param guild: Guild of the call
     :param setup_message: The message where the reaction was edited
     """
-    if not select.welcome_channel_id(guild.id) and not select.welcome_messages(guild.id):
+    snap = snapshot.get(guild.id)
+    if not snap['welcome_channel_id'] and not snap['welcome_messages']:
         # The welcome_channel has to be set first before enabling welcome messages
-        prefix = appearance.get_prefix(guild.id)
+        prefix = snapshot.prefix(snap)
         # Send error message and delete it
         error_embed: Embed = Embed(title='Welcome channel has to be set',
                                    description=f'Set the welcome channel first using `{prefix}'
@@ -109,8 +120,8 @@ async def toggle_welcome_messages(channel: TextChannel, guild: Guild, setup_mess
         await error_message.delete(delay=10)
     else:
         # Toggle the welcome messages
-        welcome_sys.toggle_welcome(guild)
-        new_status = select.welcome_messages(guild.id)
+        new_status = welcome_sys.toggle_welcome(guild)
+        snapshot.patch(guild.id, welcome_messages=new_status)
 
         # Change status within the embed
         embed = setup_message.embeds[0]
@@ -130,9 +141,10 @@ async def toggle_leave_messages(channel: TextChannel, guild: Guild, setup_messag
     :param guild: Guild of the call
     :param setup_message: The message where the reaction was edited
     """
-    if not select.welcome_channel_id(guild.id) and not select.leave_messages(guild.id):
+    snap = snapshot.get(guild.id)
+    if not snap['welcome_channel_id'] and not snap['leave_messages']:
         # The welcome_channel has to be set first before enabling leave messages
-        prefix = appearance.get_prefix(guild.id)
+        prefix = snapshot.prefix(snap)
         # Send error message and delete it
         error_embed: Embed = Embed(title='Welcome channel has to be set',
                                    description=f'Set the welcome channel first using `{prefix}'
@@ -142,8 +154,8 @@ async def toggle_leave_messages(channel: TextChannel, guild: Guild, setup_messag
         await error_message.delete(delay=10)
     else:
         # Toggle the leave messages
-        welcome_sys.toggle_leave(guild)
-        new_status = select.leave_messages(guild.id)
+        new_status = welcome_sys.toggle_leave(guild)
+        snapshot.patch(guild.id, leave_messages=new_status)
 
         # Change status within the embed
         embed = setup_message.embeds[0]
@@ -163,9 +175,10 @@ async def toggle_welcome_dms(channel: TextChannel, guild: Guild, setup_message:
     :param guild: Guild of the call
     :param setup_message: The message where the reaction was edited
     """
-    if not select.welcome_dm(guild.id) and not select.welcome_dms(guild.id):
+    snap = snapshot.get(guild.id)
+    if not snap['welcome_dm'] and not snap['welcome_dms']:
         # The welcome dm has to be set first before enabling welcome dms
-        prefix = appearance.get_prefix(guild.id)
+        prefix = snapshot.prefix(snap)
         # Send error message and delete it
         error_embed: Embed = Embed(title='Welcome DM text has to be set',
                                    description=f'Set the welcome DM text first using `{prefix}'
@@ -175,8 +188,8 @@ async def toggle_welcome_dms(channel: TextChannel, guild: Guild, setup_message:
         await error_message.delete(delay=10)
     else:
         # Toggle the welcome dms
-        welcome_sys.toggle_welcome_dm(guild)
-        new_status = select.welcome_dms(guild.id)
+        new_status = welcome_sys.toggle_welcome_dm(guild)
+        snapshot.patch(guild.id, welcome_dms=new_status)
 
         # Change status within the embed
         embed = setup_message.embeds[0]
@@ -189,6 +202,33 @@ async def toggle_welcome_dms(channel: TextChannel, guild: Guild, setup_message:
             await setup_message.edit(embed=embed)
 
 
+async def toggle_welcome_cards(channel: TextChannel, guild: Guild, setup_message: Message) -> None:
+    """
+    Toggles welcome cards
+    :param channel: Channel of the call
+    :param guild: Guild of the call
+    :param setup_message: The message where the reaction was edited
+    """
+    snap = snapshot.get(guild.id)
+    if not welcome_cards.is_available() and not snap['welcome_cards']:
+        # Cards cannot be rendered without Pillow
+        error_embed: Embed = Embed(title='Welcome cards are not available',
+                                   description='The image library Pillow has to be installed on the bot host.',
+                                   colour=appearance.error_color)
+        error_message = await channel.send(embed=error_embed)
+        await error_message.delete(delay=10)
+    else:
+        # Toggle the welcome cards
+        new_status = welcome_sys.toggle_welcome_cards(guild)
+        snapshot.patch(guild.id, welcome_cards=new_status)
+
+        # Change status within the embed
+        embed = setup_message.embeds[0]
+        embed_name = embed.fields[9].name
+        embed.set_field_at(9, name=embed_name, value='✅' if new_status else '❌', inline=True)
+        await setup_message.edit(embed=embed)
+
+
 async def setup_welcome_dm_text(channel: TextChannel, guild: Guild, message: Message, text: str) -> None:
     """
     Sets up the welcome dm text for the server.
@@ -201,6 +241,7 @@ async def setup_welcome_dm_text(channel: TextChannel, guild: Guild, message: Mes
     await util.delete_message(message)
 
     welcome_sys.set_welcome_dm(guild, text)
+    snapshot.patch(guild.id, welcome_dm=text)
 
     # Send response to command
     await channel.send(embed=Embed(description=f"The text for **welcome DMs** was set to:\n*'{text}'*",
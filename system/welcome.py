@@ -1,8 +1,30 @@
 from database import update, select
-from system import description, appearance
+from system import description, appearance, direct_messages, welcome_cards
 from utilities import secret, util
-from discord import Member, Guild, TextChannel, Embed, Forbidden
+from discord import Member, Guild, TextChannel, Embed, HTTPException
+from collections import deque
+import asyncio
 import random
+import time
+
+# Count of joins within burst_window seconds that start the join burst mode of a guild
+burst_threshold = 10
+burst_window = 10
+
+# Seconds between two batched welcome messages during a join burst
+batch_interval = 5
+
+# The maximum count of members mentioned in one batched welcome message
+max_batch_mentions = 40
+
+# Times of the latest joins by guild ID
+_joins: dict[int, deque] = {}
+
+# Members waiting for a batched welcome message by guild ID
+_pending: dict[int, list[Member]] = {}
+
+# Tasks that send the batched welcome messages by guild ID
+_batchers: dict[int, asyncio.Task] = {}
 
 
 async def welcome_message(member: Member) -> None:
@@ -37,6 +59,93 @@ async def welcome_message(member: Member) -> None:
     # Setup embed style
     embed.colour = appearance.get_color(guild.id)
 
+    # Attach the welcome card if it is activated and can be rendered right now
+    card = None
+    if select.welcome_cards(guild.id):
+        card = await welcome_cards.render(member, embed.colour.value)
+        if card:
+            embed.set_image(url=f'attachment://{welcome_cards.file_name}')
+
+    # Send embed to welcome_channel
+    await welcome_channel.send(embed=embed, file=card)
+
+
+def record_join(guild: Guild) -> bool:
+    """
+    Remember the join of a member and check whether the guild is in join burst mode
+    :param guild: Guild the member joined
+    :return: Whether members join too fast to welcome them one by one
+    """
+    joins = _joins.get(guild.id)
+    if joins is None:
+        joins = _joins[guild.id] = deque(maxlen=burst_threshold)
+
+    now = time.monotonic()
+    joins.append(now)
+
+    # The burst lasts until no member joined for burst_window seconds
+    return guild.id in _batchers or (len(joins) == burst_threshold and now - joins[0] <= burst_window)
+
+
+def queue_welcome_message(member: Member) -> None:
+    """
+    Welcome the member with the next batched welcome message of the join burst
+    :param member: Member joined
+    """
+    guild: Guild = member.guild
+    _pending.setdefault(guild.id, []).append(member)
+
+    if guild.id not in _batchers:
+        _batchers[guild.id] = asyncio.create_task(_send_batches(guild))
+
+
+async def _send_batches(guild: Guild) -> None:
+    """
+    Send the batched welcome messages of a guild until the join burst is over
+    :param guild: Guild of the join burst
+    """
+    try:
+        while True:
+            await asyncio.sleep(batch_interval)
+
+            members = _pending.pop(guild.id, [])
+            if members:
+                try:
+                    await welcome_batch(guild, members)
+                except HTTPException:
+                    # Keep batching when a message cannot be sent
+                    pass
+            elif time.monotonic() - _joins[guild.id][-1] > burst_window:
+                # No member joined recently
+                return
+    finally:
+        del _batchers[guild.id]
+
+
+async def welcome_batch(guild: Guild, members: list[Member]) -> None:
+    """
+    Sends one welcome message for several members
+    :param guild: Guild the members joined
+    :param members: Members joined
+    """
+    if not select.welcome_messages(guild.id):
+        # Only send welcome messages when they are enabled on guild
+        return
+
+    # Get welcome channel
+    welcome_channel: TextChannel = guild.get_channel(select.welcome_channel_id(guild.id))
+    if not welcome_channel:
+        return
+
+    # Mention the first members and count the others
+    mentions = ', '.join(member.mention for member in members[:max_batch_mentions])
+    if len(members) > max_batch_mentions:
+        mentions += f' and {len(members) - max_batch_mentions} more'
+
+    # Setup embed
+    embed: Embed = Embed(title=f'{len(members)} members joined', description=f'Welcome {mentions}!',
+                         colour=appearance.get_color(guild.id))
+
     # Send embed to welcome_channel
     await welcome_channel.send(embed=embed)
 
@@ -68,36 +177,53 @@ async def leave_message(member: Member) -> None:
     await welcome_channel.send(embed=embed)
 
 
-def toggle_welcome(guild: Guild, disable: bool = False) -> None:
+def toggle_welcome(guild: Guild, disable: bool = False) -> bool:
     """
     Toggles welcome messages on the guild.
     :param guild: Guild ID to toggle welcome messages
     :param disable: Force to disable leave messages
+    :return: Whether welcome messages are enabled now
     :raises Exception: if welcome messages are being enabled and the welcome channel is not set up
     """
     if select.welcome_messages(guild.id) or disable:
         update.welcome_messages(argument=guild.id, value=False)
+        return False
     else:
-        if not select.welcome_channel_id:
+        if not select.welcome_channel_id(guild.id):
             raise Exception('Welcome Channel is not set up')
         else:
             update.welcome_messages(argument=guild.id, value=True)
+            return True
 
 
-def toggle_leave(guild: Guild, disable: bool = False) -> None:
+def toggle_leave(guild: Guild, disable: bool = False) -> bool:
     """
     Toggles leave messages on the guild.
     :param guild: Guild ID to toggle leave messages
     :param disable: Force to disable leave messages
+    :return: Whether leave messages are enabled now
     :raises Exception: if leave messages are being enabled and the welcome channel is not set up
     """
     if select.leave_messages(guild.id) or disable:
         update.leave_messages(argument=guild.id, value=False)
+        return False
     else:
-        if not select.welcome_channel_id:
+        if not select.welcome_channel_id(guild.id):
             raise Exception('Welcome Channel is not set up')
         else:
             update.leave_messages(argument=guild.id, value=True)
+            return True
+
+
+def toggle_welcome_cards(guild: Guild) -> bool:
+    """
+    Toggles the image cards of welcome messages on the guild.
+    :param guild: Guild ID to toggle welcome cards
+    :return: Whether welcome cards are enabled now
+    """
+    activated = not select.welcome_cards(guild.id)
+    update.welcome_cards(argument=guild.id, value=activated)
+    return activated
 
 
 def set_welcome_channel(guild: Guild, channel_id: int = None) -> None:
@@ -143,28 +269,28 @@ async def welcome_dm(member: Member, channel: TextChannel = None, force: bool =
     embed.set_footer(text=f'Use {appearance.get_prefix(guild.id)}help on {guild.name}',
                      icon_url=guild.get_member(secret.bot_id).avatar_url)
 
-    # Send direct message or in channel if dm is forbidden
-    try:
-        await member.send(embed=embed)
-    except Forbidden:
-        if channel and force:
-            await channel.send(embed=embed)
+    # Queue direct message or send it in channel if dm is forbidden
+    on_forbidden = (lambda: channel.send(embed=embed)) if channel and force else None
+    direct_messages.send(member, embed, on_forbidden)
 
 
-def toggle_welcome_dm(guild: Guild, disable: bool = False) -> None:
+def toggle_welcome_dm(guild: Guild, disable: bool = False) -> bool:
     """
     Toggles welcome dms on the guild.
     :param guild: Guild ID to toggle welcome messages
     :param disable: Force to disable leave messages
+    :return: Whether welcome dms are enabled now
     :raises Exception: if welcome messages are being enabled and the welcome channel is not set up
     """
     if select.welcome_dms(guild.id) or disable:
         update.welcome_dms(argument=guild.id, value=False)
+        return False
     else:
-        if not select.welcome_dm:
+        if not select.welcome_dm(guild.id):
             raise Exception('Welcome dm text is not set up')
         else:
             update.welcome_dms(argument=guild.id, value=True)
+            return True
 
 
 def set_welcome_dm(guild: Guild, text: str = None) -> None:
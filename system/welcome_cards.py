@@ -0,0 +1,228 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Optional
+
+from discord import Member, Guild, File, HTTPException
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageOps
+except ModuleNotFoundError:
+    # Pillow is optional, welcome messages stay plain embeds without it
+    Image = None
+
+# Size of a welcome card in pixels
+card_size = (1024, 320)
+
+# Size of the avatar on a welcome card in pixels
+avatar_size = 200
+
+# Count of processes that render welcome cards
+max_workers = 2
+
+# The maximum count of cards rendered at the same time (further members get a plain welcome message)
+max_pending_renders = 8
+
+# Seconds a card may take to render before the plain welcome message is sent
+render_timeout = 5
+
+# The maximum count of avatars kept downloaded in the bot and decoded in every render process
+max_avatars = 256
+
+# The maximum count of guild backgrounds kept decoded in every render process
+max_backgrounds = 64
+
+# File name of the card attached to the welcome message
+file_name = 'welcome.png'
+
+# Pool of the render processes (started on the first render)
+_executor: Optional[ProcessPoolExecutor] = None
+
+# Count of cards that are rendered right now
+_pending = 0
+
+# Downloaded avatars by avatar URL (the least recently used ones are dropped first)
+_avatar_bytes: OrderedDict[str, bytes] = OrderedDict()
+
+# Downloaded banners by guild ID: banner URL and image
+_background_bytes: dict[int, tuple[str, bytes]] = {}
+
+# Decoded images and fonts of a render process
+_backgrounds: OrderedDict[str, 'Image.Image'] = OrderedDict()
+_avatars: OrderedDict[str, 'Image.Image'] = OrderedDict()
+_fonts: dict[int, 'ImageFont.ImageFont'] = {}
+
+
+def is_available() -> bool:
+    """
+    Check whether welcome cards can be rendered
+    :return: Whether Pillow is installed
+    """
+    return Image is not None
+
+
+def _font(size: int) -> 'ImageFont.ImageFont':
+    """
+    Get a font of the size (cached per render process)
+    :param size: Font size in pixels
+    :return: The font
+    """
+    if size not in _fonts:
+        try:
+            _fonts[size] = ImageFont.truetype('DejaVuSans-Bold.ttf', size)
+        except OSError:
+            # The font is not installed
+            _fonts[size] = ImageFont.load_default()
+
+    return _fonts[size]
+
+
+def _background(key: str, image: Optional[bytes], color: int) -> 'Image.Image':
+    """
+    Get the decoded background of a guild (cached per render process)
+    :param key: Key of the background (changes with the banner)
+    :param image: Banner of the guild or None to use the color
+    :param color: Color of the guild
+    :return: Background in card size
+    """
+    background = _backgrounds.get(key)
+    if background is None:
+        if image:
+            # Fit the banner into the card and darken it, so the text stays readable
+            background = ImageOps.fit(Image.open(BytesIO(image)).convert('RGB'), card_size)
+            background = Image.blend(background, Image.new('RGB', card_size), 0.4)
+        else:
+            background = Image.new('RGB', card_size, ((color >> 16) & 255, (color >> 8) & 255, color & 255))
+
+        _backgrounds[key] = background
+        while len(_backgrounds) > max_backgrounds:
+            _backgrounds.popitem(last=False)
+
+    _backgrounds.move_to_end(key)
+    return background
+
+
+def _avatar(key: str, image: bytes) -> 'Image.Image':
+    """
+    Get the round avatar thumbnail (cached per render process)
+    :param key: URL of the avatar
+    :param image: Avatar of the member
+    :return: Round avatar in avatar size
+    """
+    avatar = _avatars.get(key)
+    if avatar is None:
+        avatar = Image.open(BytesIO(image)).convert('RGBA').resize((avatar_size, avatar_size))
+
+        # Cut the avatar round
+        mask = Image.new('L', avatar.size)
+        ImageDraw.Draw(mask).ellipse((0, 0, avatar_size, avatar_size), fill=255)
+        avatar.putalpha(mask)
+
+        _avatars[key] = avatar
+        while len(_avatars) > max_avatars:
+            _avatars.popitem(last=False)
+
+    _avatars.move_to_end(key)
+    return avatar
+
+
+def render_card(background_key: str, background: Optional[bytes], color: int, avatar_key: str, avatar: bytes,
+                title: str, subtitle: str) -> bytes:
+    """
+    Render a welcome card (runs in a render process)
+    :param background_key: Key of the background (changes with the banner)
+    :param background: Banner of the guild or None to use the color
+    :param color: Color of the guild
+    :param avatar_key: URL of the avatar
+    :param avatar: Avatar of the member
+    :param title: Large text on the card
+    :param subtitle: Small text below the title
+    :return: Card as PNG
+    """
+    card = _background(background_key, background, color).copy()
+    thumbnail = _avatar(avatar_key, avatar)
+
+    # Paste avatar and write the text next to it
+    top = (card_size[1] - avatar_size) // 2
+    card.paste(thumbnail, (top, top), thumbnail)
+
+    draw = ImageDraw.Draw(card)
+    left = avatar_size + 2 * top
+    draw.text((left, top + 40), title, font=_font(52), fill=(255, 255, 255))
+    draw.text((left, top + 115), subtitle, font=_font(34), fill=(220, 220, 220))
+
+    output = BytesIO()
+    card.save(output, 'PNG', compress_level=1)
+    return output.getvalue()
+
+
+async def _download_avatar(member: Member) -> tuple[str, bytes]:
+    """
+    Get the avatar of the member (the latest ones are kept)
+    :param member: Member to get the avatar of
+    :return: URL and image of the avatar
+    """
+    asset = member.avatar_url_as(format='png', size=256)
+    key = str(asset)
+
+    if key not in _avatar_bytes:
+        _avatar_bytes[key] = await asset.read()
+        while len(_avatar_bytes) > max_avatars:
+            _avatar_bytes.popitem(last=False)
+
+    _avatar_bytes.move_to_end(key)
+    return key, _avatar_bytes[key]
+
+
+async def _download_background(guild: Guild) -> tuple[str, Optional[bytes]]:
+    """
+    Get the banner of the guild (kept until it changes)
+    :param guild: Guild to get the banner of
+    :return: Key and image of the background
+    """
+    if not guild.banner:
+        return f'{guild.id}', None
+
+    asset = guild.banner_url_as(format='png')
+    key = str(asset)
+
+    cached = _background_bytes.get(guild.id)
+    if not cached or cached[0] != key:
+        cached = _background_bytes[guild.id] = (key, await asset.read())
+
+    return cached
+
+
+async def render(member: Member, color: int) -> Optional[File]:
+    """
+    Render the welcome card of the member without blocking the bot
+    :param member: Member joined
+    :param color: Color of the guild
+    :return: Card as file or None if it cannot be rendered right now
+    """
+    global _executor, _pending
+
+    if not is_available() or _pending >= max_pending_renders:
+        # Send the plain welcome message when Pillow is missing or too many cards are rendered
+        return None
+
+    _pending += 1
+    try:
+        guild: Guild = member.guild
+        avatar_key, avatar = await _download_avatar(member)
+        background_key, background = await _download_background(guild)
+
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=max_workers)
+
+        card = await asyncio.wait_for(asyncio.get_event_loop().run_in_executor(
+            _executor, render_card, background_key, background, color, avatar_key, avatar,
+            f'Welcome {member.display_name[:20]}', f'Member #{guild.member_count} of {guild.name[:30]}'),
+            render_timeout)
+    except (HTTPException, asyncio.TimeoutError, OSError):
+        return None
+    finally:
+        _pending -= 1
+
+    return File(BytesIO(card), filename=file_name)
@@ -0,0 +1,53 @@
+import asyncio
+import os
+import random
+import time
+
+from system import coordination
+
+# Count of fake guilds spread over all shards
+guild_count = int(os.environ.get('FRYSEL_FAKE_GUILDS', 1000))
+
+# Seconds a fake bot process runs
+duration = int(os.environ.get('FRYSEL_FAKE_SECONDS', 20))
+
+
+def guild_ids() -> list[int]:
+    """
+    Create the IDs of the fake guilds. They are the same in all processes.
+    :return: Snowflakes of the fake guilds
+    """
+    generator = random.Random(guild_count)
+    # The shard of a guild depends on the creation time (in ms) within its snowflake
+    return [(generator.randrange(10 ** 11) << 22) | i for i in range(guild_count)]
+
+
+async def run() -> None:
+    """
+    Run a bot process against fake guilds instead of the Discord gateway. Only the guilds of the shards of this
+    process are handled and their config changes invalidate the caches of the other processes.
+    """
+    shards = f'Shards {coordination.shard_ids} of {coordination.shard_count}'
+    owned = [guild_id for guild_id in guild_ids() if coordination.owns(guild_id)]
+    print(f'{shards}: {len(owned)} of {guild_count} guilds')
+
+    # Guilds whose cache entries were dropped
+    invalidated: list[int] = []
+    coordination.register('fake', invalidated.append)
+    coordination.sync()
+
+    published = 0
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        if owned:
+            # Change the config of a guild of this process
+            coordination.publish('fake', random.choice(owned))
+            published += 1
+
+        coordination.sync()
+        await asyncio.sleep(coordination.poll_interval)
+
+    # Invalidations of guilds of other processes show that the caches are shared
+    foreign = [guild_id for guild_id in invalidated if not coordination.owns(guild_id)]
+    print(f'{shards}: published {published} changes, dropped {len(foreign)} cache entries of other processes '
+          f'(from shards {sorted({coordination.shard_of(guild_id) for guild_id in foreign})})')
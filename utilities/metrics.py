@@ -0,0 +1,312 @@
+import logging
+import os
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Iterator, Optional
+
+from aiohttp import web
+from discord import HTTPException
+from discord.ext.commands import Bot, Context
+
+# Upper bounds of the histogram buckets in seconds
+default_buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Address of the exposition endpoint (only reachable from the host)
+host = '127.0.0.1'
+
+# Port of the exposition endpoint (launcher.py gives every bot process its own port)
+port_variable = 'FRYSEL_METRICS_PORT'
+port = int(os.environ.get(port_variable, 9100))
+
+# Content type of the Prometheus text format
+content_type = 'text/plain; version=0.0.4'
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = '') -> str:
+    """
+    Format the labels of a sample
+    :param names: Names of the labels
+    :param values: Values of the labels
+    :param extra: Further formatted label (e.g. the bucket bound)
+    :return: Labels in braces or an empty string without labels
+    """
+    # Escape backslashes, quotes and line breaks within the values
+    pairs = [f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+             for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Histogram:
+    """
+    Counts observed values (usually durations) in buckets, like a Prometheus histogram.
+    Args:
+        name           (str): Name of the metric
+        documentation  (str): Description of the metric
+        labels       (tuple): Names of the labels
+        buckets      (tuple): Upper bounds of the buckets
+    Attributes:
+        name           (str): Name of the metric
+        documentation  (str): Description of the metric
+        labels       (tuple): Names of the labels
+        buckets      (tuple): Upper bounds of the buckets
+    """
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = default_buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+
+        # Count per bucket (the last one is +Inf), sum and count by label values
+        self._series: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        """
+        Count a value
+        :param value: Observed value
+        :param label_values: Values of the labels
+        """
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    @contextmanager
+    def time(self, *label_values) -> Iterator[None]:
+        """
+        Observe the duration of a block
+        :param label_values: Values of the labels
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, *label_values)
+
+    def count(self) -> int:
+        """
+        Count the observed values of all label values
+        :return: Count of observed values
+        """
+        return sum(sum(counts) for counts, _ in self._series.values())
+
+    def expose(self) -> list[str]:
+        """
+        Format the metric in the Prometheus text format
+        :return: Lines of the metric
+        """
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                bucket = 'le="' + str(bound) + '"'
+                lines.append(f'{self.name}_bucket{_labels(self.labels, label_values, bucket)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labels, label_values)} {total[0]}')
+            lines.append(f'{self.name}_count{_labels(self.labels, label_values)} {cumulative}')
+        return lines
+
+
+class Counter:
+    """
+    Counts events, like a Prometheus counter.
+    Args:
+        name           (str): Name of the metric (should end with _total)
+        documentation  (str): Description of the metric
+        labels       (tuple): Names of the labels
+    Attributes:
+        name           (str): Name of the metric
+        documentation  (str): Description of the metric
+        labels       (tuple): Names of the labels
+    """
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+
+        # Counts by label values
+        self._counts: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        """
+        Count an event
+        :param label_values: Values of the labels
+        :param amount: How often the event is counted
+        """
+        self._counts[label_values] = self._counts.get(label_values, 0) + amount
+
+    def expose(self) -> list[str]:
+        """
+        Format the metric in the Prometheus text format
+        :return: Lines of the metric
+        """
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for label_values, count in sorted(self._counts.items()):
+            lines.append(f'{self.name}{_labels(self.labels, label_values)} {count}')
+        return lines
+
+
+class Gauge:
+    """
+    Value that is read when the metrics are scraped, like a Prometheus gauge.
+    Args:
+        name           (str): Name of the metric
+        documentation  (str): Description of the metric
+        labels       (tuple): Names of the labels
+    Attributes:
+        name           (str): Name of the metric
+        documentation  (str): Description of the metric
+        labels       (tuple): Names of the labels
+    """
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+
+        # Functions that return the value by label values
+        self._functions: dict[tuple, Callable[[], float]] = {}
+
+    def set_function(self, function: Callable[[], float], *label_values) -> None:
+        """
+        Set the function that returns the value
+        :param function: Function that is called on every scrape
+        :param label_values: Values of the labels
+        """
+        self._functions[label_values] = function
+
+    def expose(self) -> list[str]:
+        """
+        Format the metric in the Prometheus text format
+        :return: Lines of the metric
+        """
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        for label_values, function in sorted(self._functions.items()):
+            lines.append(f'{self.name}{_labels(self.labels, label_values)} {function()}')
+        return lines
+
+
+# Latencies of the bot
+event_latency = Histogram('fryselbot_event_seconds', 'Duration of event handlers', ('event', 'handler'))
+command_latency = Histogram('fryselbot_command_seconds', 'Duration of commands including checks and errors',
+                            ('command',))
+query_latency = Histogram('fryselbot_query_seconds', 'Duration of database functions including the connection',
+                          ('function',))
+api_latency = Histogram('fryselbot_api_seconds', 'Duration of Discord API requests including rate limit waits',
+                        ('method', 'route'))
+
+# Discord API requests and rate limits
+api_requests = Counter('fryselbot_api_requests_total', 'Discord API requests by result', ('method', 'route', 'status'))
+rate_limit_waits = Histogram('fryselbot_rate_limit_wait_seconds', 'Waits after Discord answered with 429',
+                             ('scope',), buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+
+# Stalls of the event loop (measured by system/loop_monitor.py)
+loop_lag = Histogram('fryselbot_loop_lag_seconds', 'Delay of the event loop waking up')
+slow_callbacks = Histogram('fryselbot_slow_callback_seconds', 'Callbacks that blocked the event loop by culprit',
+                           ('culprit',))
+
+# State of the bot (the functions are set by bot.py)
+private_rooms = Gauge('fryselbot_private_rooms', 'Active private rooms')
+pending_expiries = Gauge('fryselbot_pending_expiries', 'Temporary mutes and bans that did not expire yet', ('kind',))
+
+# Delivery of direct messages (the functions are set by system/direct_messages.py)
+direct_messages = Counter('fryselbot_direct_messages_total',
+                          'Direct messages by result (queued, sent, retried, closed, skipped, dropped or failed)',
+                          ('result',))
+direct_message_queue = Gauge('fryselbot_direct_message_queue', 'Direct messages waiting for delivery')
+closed_direct_messages = Gauge('fryselbot_closed_direct_messages', 'Users skipped because of closed direct messages')
+
+# All metrics in the order they are exposed
+registry = [event_latency, command_latency, query_latency, api_latency, api_requests, rate_limit_waits, loop_lag,
+            slow_callbacks, private_rooms, pending_expiries, direct_messages, direct_message_queue,
+            closed_direct_messages]
+
+# Runner of the exposition endpoint (None until it is started)
+_runner: Optional[web.AppRunner] = None
+
+
+def expose() -> str:
+    """
+    Format all metrics in the Prometheus text format
+    :return: The metrics
+    """
+    return '\n'.join(line for metric in registry for line in metric.expose()) + '\n'
+
+
+async def _handle_metrics(_: web.Request) -> web.Response:
+    """Answer a scrape of the exposition endpoint"""
+    return web.Response(body=expose().encode(), headers={'Content-Type': content_type})
+
+
+async def serve() -> None:
+    """
+    Start the exposition endpoint at http://127.0.0.1:<port>/metrics (only once)
+    """
+    global _runner
+
+    if _runner:
+        return
+
+    app = web.Application()
+    app.router.add_get('/metrics', _handle_metrics)
+
+    _runner = web.AppRunner(app, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+
+
+class _RateLimitHandler(logging.Handler):
+    """Observes the rate limit waits discord.py logs"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.msg.startswith('We are being rate limited'):
+            rate_limit_waits.observe(record.args[0], 'bucket')
+        elif record.msg.startswith('Global rate limit has been hit'):
+            rate_limit_waits.observe(record.args[0], 'global')
+
+
+def instrument(client: Bot) -> None:
+    """
+    Measure the event handlers, commands and API requests of the client
+    :param client: Bot client
+    """
+    run_event = client._run_event
+    invoke = client.invoke
+    request = client.http.request
+
+    async def timed_run_event(coro, event_name: str, *args, **kwargs) -> None:
+        # Every listener of an event runs in its own task
+        with event_latency.time(event_name, coro.__qualname__):
+            await run_event(coro, event_name, *args, **kwargs)
+
+    async def timed_invoke(ctx: Context) -> None:
+        if not ctx.command:
+            await invoke(ctx)
+            return
+
+        with command_latency.time(ctx.command.qualified_name):
+            await invoke(ctx)
+
+    async def timed_request(route, **kwargs):
+        status = 'ok'
+        try:
+            with api_latency.time(route.method, route.path):
+                return await request(route, **kwargs)
+        except HTTPException as error:
+            status = str(error.status)
+            raise
+        finally:
+            api_requests.inc(route.method, route.path, status)
+
+    client._run_event = timed_run_event
+    client.invoke = timed_invoke
+    client.http.request = timed_request
+
+    logging.getLogger('discord.http').addHandler(_RateLimitHandler(logging.WARNING))
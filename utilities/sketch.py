@@ -0,0 +1,118 @@
+import time
+from array import array
+from typing import Hashable
+
+
+class SlidingCountMinSketch:
+    """
+    Count-min sketch that counts keys within a sliding time window. The window is split into slots that are reset
+    when they expire, so the memory is fixed and counting a key costs the same no matter how many keys are counted.
+    Counts are never underestimated, but keys sharing all their cells overestimate each other. Counts are updated
+    conservatively, which keeps the overestimation low while the sketch is wide enough for the traffic.
+    Args:
+        window     (float): Length of the window in seconds
+        width        (int): Count of cells per row
+        depth        (int): Count of rows (hash functions)
+        slots        (int): Count of slots the window is split into
+    Attributes:
+        window     (float): Length of the window in seconds
+        width        (int): Count of cells per row
+        depth        (int): Count of rows (hash functions)
+        slots        (int): Count of slots the window is split into
+    """
+
+    def __init__(self, window: float, width: int = 16384, depth: int = 4, slots: int = 5):
+        self.window = window
+        self.width = width
+        self.depth = depth
+        self.slots = slots
+
+        self._slot_length = window / slots
+        # One table of depth * width counters per slot (16 bit, counts saturate at 65535)
+        self._tables = [array('H', bytes(2 * depth * width)) for _ in range(slots)]
+        # Number of the time slot every table currently counts
+        self._epochs = [-1] * slots
+        # Offsets of the rows within a table
+        self._rows = range(0, depth * width, width)
+
+    def _cells(self, key: Hashable) -> list[int]:
+        """
+        Get the index of the cell of the key in every row
+        :param key: Key to count
+        :return: Indexes of the cells
+        """
+        h = hash(key)
+        # Derive the hashes of the rows from two halves of one hash (double hashing)
+        h1, h2 = h & 0xffffffff, (h >> 32) | 1
+        return [row + (h1 + i * h2) % self.width for i, row in enumerate(self._rows)]
+
+    def _current(self, now: float) -> int:
+        """
+        Get the number of the current slot and reset its table if it counted an expired slot
+        :param now: Current time in seconds
+        :return: Number of the current slot
+        """
+        epoch = int(now / self._slot_length)
+        index = epoch % self.slots
+
+        if self._epochs[index] != epoch:
+            # Forget the counts of the expired slot
+            self._tables[index] = array('H', bytes(2 * self.depth * self.width))
+            self._epochs[index] = epoch
+
+        return epoch
+
+    def _estimate(self, cells: list[int], epoch: int) -> int:
+        """
+        Sum the counts of the cells over the slots within the window and take the lowest one
+        :param cells: Indexes of the cells of the key
+        :param epoch: Number of the current slot
+        :return: Estimated count of the key
+        """
+        tables = self._live_tables(epoch)
+        return min(sum(table[cell] for table in tables) for cell in cells)
+
+    def _live_tables(self, epoch: int) -> list[array]:
+        """
+        Get the tables of the slots within the window
+        :param epoch: Number of the current slot
+        :return: Tables within the window
+        """
+        return [table for table, e in zip(self._tables, self._epochs) if epoch - self.slots < e <= epoch]
+
+    def add(self, key: Hashable, count: int = 1, now: float = None) -> int:
+        """
+        Count a key
+        :param key: Key to count
+        :param count: How often the key is counted
+        :param now: Current time in seconds (time.monotonic() if not given)
+        :return: Estimated count of the key within the window including this one
+        """
+        epoch = self._current(time.monotonic() if now is None else now)
+        cells = self._cells(key)
+        tables = self._live_tables(epoch)
+        sums = [sum(table[cell] for table in tables) for cell in cells]
+        estimate = min(sums) + count
+
+        # Conservative update: only raise the cells that are below the new estimate of the key
+        table = self._tables[epoch % self.slots]
+        for cell, cell_sum in zip(cells, sums):
+            if cell_sum < estimate:
+                table[cell] = min(table[cell] + estimate - cell_sum, 0xffff)
+
+        return estimate
+
+    def count(self, key: Hashable, now: float = None) -> int:
+        """
+        Get the count of a key within the window
+        :param key: Key to get the count of
+        :param now: Current time in seconds (time.monotonic() if not given)
+        :return: Estimated count of the key
+        """
+        epoch = self._current(time.monotonic() if now is None else now)
+        return self._estimate(self._cells(key), epoch)
+
+    @property
+    def size(self) -> int:
+        """Count of bytes used by the counters"""
+        return sum(table.itemsize * len(table) for table in self._tables)